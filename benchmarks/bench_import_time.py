@@ -0,0 +1,56 @@
+"""Cold import time of the package and its entry points, each in a fresh interpreter.
+
+Exits non-zero when `import cherry_algo_framework` takes longer than
+`--target_ms` (median over `--runs`) or pulls in a heavy dependency.
+
+Usage:
+    python benchmarks/bench_import_time.py --runs 10 --target_ms 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+MODULES = ("cherry_algo_framework", "cherry_algo_framework.main_backtest_runner",
+           "cherry_algo_framework.optimization.parameter_sweep")
+HEAVY = ("loguru", "pandas", "numpy", "torch", "matplotlib", "plotly", "scipy")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+print(json.dumps({{'ms': (time.perf_counter() - t0) * 1e3, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def cold_import(module: str) -> dict:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target_ms", type=float, default=20.0, help="budget for the bare package import")
+    args = parser.parse_args()
+
+    ok = True
+    for module in MODULES:
+        probes = [cold_import(module) for _ in range(args.runs)]
+        median_ms = statistics.median(p["ms"] for p in probes)
+        heavy = probes[0]["heavy"]
+        print(f"{module:<52} {median_ms:8.1f} ms  heavy: {', '.join(heavy) or '-'}")
+        if module == MODULES[0] and (median_ms > args.target_ms or heavy):
+            ok = False
+    print(f"package import {'within' if ok else 'OVER'} target of {args.target_ms:.0f} ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Throughput of the batched Monte Carlo validator.
+
+Usage:
+    python benchmarks/bench_monte_carlo.py --simulations 10000 --trades 250
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.risk_mgt.risk_mgt.monte_carlo_validator import MonteCarloValidator  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--simulations", type=int, default=10_000)
+    parser.add_argument("--trades", type=int, default=250)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    pnls = np.random.default_rng(args.seed).normal(15.0, 120.0, args.trades)
+    for method in ("bootstrap", "reshuffle"):
+        validator = MonteCarloValidator(initial_equity=25_000.0, n_simulations=args.simulations, seed=args.seed)
+        start = time.perf_counter()
+        result = validator.run(pnls, method=method)
+        elapsed = time.perf_counter() - start
+        print(f"{method:<10} {args.simulations} x {args.trades} trades: {elapsed:.3f}s  "
+              f"ruin={result.ruin_probability:.4f}  "
+              f"median max DD={result.metrics['max_drawdown_pct']['quantiles']['p50']:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
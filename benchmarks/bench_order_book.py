@@ -0,0 +1,83 @@
+"""Per-bar cost of resting stop/limit orders: naive scan vs SimulatedBroker's price-indexed book.
+
+Usage:
+    python benchmarks/bench_order_book.py --symbols 200 --orders 20000 --bars 500
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.core.event import MarketBarEvent, OrderEvent  # noqa: E402
+from cherry_algo_framework.execution_mgt.simulated_broker import SimulatedBroker  # noqa: E402
+
+T0 = datetime(2023, 3, 1, 14, 30, tzinfo=timezone.utc)
+
+
+def _naive_on_market(resting, bar):
+    # The per-bar scan the book replaced: every resting order for the symbol is checked.
+    filled = []
+    for order in resting.get(bar.symbol, ()):
+        if order.order_type == 'STP':
+            hit = order.stop_price >= bar.low if order.direction == 'SELL' else order.stop_price <= bar.high
+        else:
+            hit = order.limit_price >= bar.low if order.direction == 'BUY' else order.limit_price <= bar.high
+        if hit:
+            filled.append(order)
+    for order in filled:
+        resting[bar.symbol].remove(order)
+    return filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=20000, help="resting orders kept across the universe")
+    parser.add_argument("--bars", type=int, default=500, help="bars per symbol")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(5)
+    symbols = [f"S{i}" for i in range(args.symbols)]
+    paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (args.bars, args.symbols)), axis=0))
+    bars = [MarketBarEvent(sym, T0 + timedelta(minutes=t), p, p * 1.001, p * 0.999, p, 100)
+            for t, row in enumerate(paths.tolist()) for sym, p in zip(symbols, row)]
+
+    def make_order(j):
+        sym = j % args.symbols
+        # Far from the market (protective stops / resting entries), so few trigger.
+        level = 100 * float(rng.choice([0.6, 1.6])) * (1 + float(rng.normal(0, 0.05)))
+        kind = 'STP' if j % 2 else 'LMT'
+        direction = 'SELL' if (kind == 'STP') == (level < 100) else 'BUY'
+        kw = {'stop_price': level} if kind == 'STP' else {'limit_price': level}
+        return OrderEvent(symbols[sym], T0, kind, direction, 10, order_id=j + 1, **kw)
+
+    orders = [make_order(j) for j in range(args.orders)]
+
+    naive = {}
+    for order in orders:
+        naive.setdefault(order.symbol, []).append(order)
+    start = time.perf_counter()
+    naive_fills = sum(len(_naive_on_market(naive, bar)) for bar in bars)
+    naive_time = time.perf_counter() - start
+
+    broker = SimulatedBroker(commission_per_share=0.0, commission_min_per_order=0.0, slippage_pct=0.0)
+    for order in orders:
+        broker.execute_order(order)
+    start = time.perf_counter()
+    book_fills = sum(len(broker.on_market(bar)) for bar in bars)
+    book_time = time.perf_counter() - start
+
+    per_bar = 1e6 / len(bars)
+    print(f"{args.orders} resting orders over {args.symbols} symbols, {len(bars)} bars "
+          f"({naive_fills} / {book_fills} fills)")
+    print(f"naive scan  : {naive_time * per_bar:7.2f} us/bar")
+    print(f"price book  : {book_time * per_bar:7.2f} us/bar ({naive_time / book_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
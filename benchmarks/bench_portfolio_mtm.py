@@ -0,0 +1,64 @@
+"""Mark-to-market cost per timestamp: per-object loop vs PositionLedger arrays.
+
+Usage:
+    python benchmarks/bench_portfolio_mtm.py --symbols 500 --steps 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.portfolio_mgt.position_ledger import PositionLedger  # noqa: E402
+
+
+class _ObjectPosition:
+    # The per-object layout the ledger replaced.
+    __slots__ = ("quantity", "avg_cost", "max_price", "min_price")
+
+    def __init__(self, quantity, avg_cost):
+        self.quantity, self.avg_cost = quantity, avg_cost
+        self.max_price = self.min_price = avg_cost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    qty = rng.integers(0, 2, args.symbols) * rng.integers(1, 500, args.symbols).astype(float)
+    cost = rng.uniform(1.0, 30.0, args.symbols)
+    closes = cost * np.exp(np.cumsum(rng.normal(0, 0.002, (args.steps, args.symbols)), axis=0))
+
+    objects = [_ObjectPosition(q, c) for q, c in zip(qty.tolist(), cost.tolist())]
+    start = time.perf_counter()
+    for row in closes.tolist():
+        for pos, price in zip(objects, row):
+            if pos.quantity:
+                pos.max_price = max(pos.max_price, price)
+                pos.min_price = min(pos.min_price, price)
+        sum(pos.quantity * price for pos, price in zip(objects, row))
+    per_object = (time.perf_counter() - start) / args.steps
+
+    ledger = PositionLedger([f"S{i}" for i in range(args.symbols)])
+    ids = np.arange(args.symbols)
+    for i in np.flatnonzero(qty):
+        ledger.apply_fill(int(i), "BUY", float(qty[i]), float(cost[i]), 0.0)
+    start = time.perf_counter()
+    for row in closes:
+        ledger.mark_many(ids, row)
+        ledger.holdings_value()
+    vectorised = (time.perf_counter() - start) / args.steps
+
+    print(f"{args.symbols} symbols, {int((qty != 0).sum())} open")
+    print(f"per-object loop : {per_object * 1e6:8.1f} us/timestamp")
+    print(f"ledger arrays   : {vectorised * 1e6:8.1f} us/timestamp ({per_object / vectorised:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Per-bar latency of RiskEngine.evaluate_batch vs one evaluate() per signal.
+
+Usage:
+    python benchmarks/bench_risk_engine.py --candidates 200 --bars 500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.risk_mgt.risk_mgt.risk_engine import RiskEngine, RiskState  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=500)
+    parser.add_argument("--max_positions", type=int, default=50)
+    parser.add_argument("--backend", default=None, choices=["torch", "numpy"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    entry = rng.uniform(1.0, 30.0, (args.bars, args.candidates)).round(2)
+    stop = (entry * (1 - rng.uniform(0.005, 0.08, entry.shape))).round(2)
+    engine = RiskEngine(max_open_positions=args.max_positions, backend=args.backend)
+
+    start = time.perf_counter()
+    for e, s in zip(entry, stop):
+        state = RiskState(25_000.0, 25_000.0)
+        for price, stop_price in zip(e.tolist(), s.tolist()):
+            engine.evaluate(price, stop_price, state)
+    per_signal = (time.perf_counter() - start) / args.bars
+
+    for e, s in zip(entry, stop):
+        engine.evaluate_batch(e, s, RiskState(25_000.0, 25_000.0))
+    summary = engine.latency_summary()
+    print(f"backend={engine.backend} candidates/bar={args.candidates}")
+    print(f"per-signal : {per_signal * 1e6:9.1f} us/bar")
+    print(f"batch      : {summary['mean_us']:9.1f} us/bar (p50 {summary['p50_us']:.1f}, p99 {summary['p99_us']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
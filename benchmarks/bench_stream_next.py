@@ -0,0 +1,72 @@
+"""Replay throughput of CSVDataHandler.stream_next, iterrows vs columnar.
+
+Usage:
+    python benchmarks/bench_stream_next.py --symbols 5 --bars 20000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler  # noqa: E402
+from cherry_algo_framework.utils.logging_setup import disable_logging  # noqa: E402
+
+
+def write_sample_csv(path: Path, n_symbols: int, n_bars: int, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2023-01-03 09:30", periods=n_bars, freq="1min", tz="UTC")
+    frames = []
+    symbols = [f"SYM{i:03d}" for i in range(n_symbols)]
+    for symbol in symbols:
+        close = 10.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, n_bars)))
+        open_ = np.concatenate(([close[0]], close[:-1]))
+        spread = np.abs(rng.normal(0.0, 0.003, n_bars)) * close
+        frames.append(pd.DataFrame({
+            "datetime": index,
+            "symbol": symbol,
+            "open": open_.round(4),
+            "high": (np.maximum(open_, close) + spread).round(4),
+            "low": (np.minimum(open_, close) - spread).round(4),
+            "close": close.round(4),
+            "volume": rng.integers(1_000, 50_000, n_bars),
+        }))
+    pd.concat(frames).sort_values(["datetime", "symbol"]).to_csv(path, index=False)
+    return symbols
+
+
+def time_replay(csv_path: Path, symbols: list, replay_mode: str) -> tuple:
+    handler = CSVDataHandler(csv_path, symbols, symbol_column="symbol", replay_mode=replay_mode)
+    n_events = 0
+    t0 = time.perf_counter()
+    for _ in handler.stream_next():
+        n_events += 1
+    return n_events, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=5)
+    parser.add_argument("--bars", type=int, default=20000, help="bars per symbol")
+    args = parser.parse_args()
+
+    disable_logging()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "bars.csv"
+        symbols = write_sample_csv(csv_path, args.symbols, args.bars)
+        results = {mode: time_replay(csv_path, symbols, mode) for mode in ("iterrows", "columnar")}
+
+    for mode, (n_events, elapsed) in results.items():
+        print(f"{mode:>9}: {n_events} bars in {elapsed:.3f}s -> {n_events / elapsed:,.0f} bars/sec")
+    speedup = results["iterrows"][1] / results["columnar"][1]
+    print(f"  speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Throughput and peak memory of TickDataHandler's chunked tick-to-bar aggregation.
+
+Aggregates tick files of increasing length with the same chunk size. Peak
+traced memory should stay roughly constant as the file grows.
+
+Usage:
+    python benchmarks/bench_tick_aggregation.py --ticks 500000 --chunk_size 100000
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.data_mgt.tick_data_handler import TickDataHandler  # noqa: E402
+from cherry_algo_framework.utils.logging_setup import disable_logging  # noqa: E402
+
+
+def write_tick_csv(path: Path, n_ticks: int, n_symbols: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-02 09:00", tz="UTC")
+    written, elapsed = 0, 0.0
+    with open(path, "w") as f:
+        f.write("datetime,symbol,price,size\n")
+        # Generated in blocks so the writer itself stays small.
+        while written < n_ticks:
+            n = min(200_000, n_ticks - written)
+            seconds = elapsed + np.cumsum(rng.exponential(0.05, n))
+            elapsed = seconds[-1]
+            pd.DataFrame({
+                "datetime": start + pd.to_timedelta(seconds, unit="s"),
+                "symbol": rng.integers(0, n_symbols, n).astype(str),
+                "price": np.round(10 + rng.normal(0, 0.05, n), 2),
+                "size": rng.integers(1, 1_000, n),
+            }).to_csv(f, header=False, index=False)
+            written += n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=500_000, help="ticks in the smallest file")
+    parser.add_argument("--sizes", type=int, default=3, help="files of ticks, 2x ticks, 4x ticks, ...")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--chunk_size", type=int, default=100_000)
+    parser.add_argument("--interval", default="1min")
+    args = parser.parse_args()
+
+    disable_logging()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for k in range(args.sizes):
+            n_ticks = args.ticks * 2 ** k
+            path = Path(tmp) / f"ticks_{n_ticks}.csv"
+            write_tick_csv(path, n_ticks, args.symbols)
+            handler = TickDataHandler(path, args.interval, symbol_column="symbol", chunk_size=args.chunk_size)
+            t0 = time.perf_counter()
+            n_bars = sum(len(codes) for _, codes, _ in handler.iter_bar_batches())
+            elapsed = time.perf_counter() - t0
+            # Second pass under tracemalloc, which would distort the timing.
+            tracemalloc.start()
+            for _ in handler.iter_bar_batches():
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{n_ticks:>10} ticks -> {n_bars:>7} bars: {n_ticks / elapsed:>12,.0f} ticks/s, "
+                  f"peak {peak / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
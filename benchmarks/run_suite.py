@@ -0,0 +1,186 @@
+"""Reproducible benchmark suite over seeded synthetic market data.
+
+Runs each case (CSV load, stream_next replay, strategy step, full event
+backtest, risk batch evaluation, Monte Carlo, metrics) `--repeats` times on
+the same synthetic data, writes the results as JSON and, given a baseline,
+fails when a case's best time is more than `--threshold` slower. A baseline
+is only compared against runs over the same data (`--symbols`, `--bars`,
+`--seed`); anything else is refused rather than reported as a regression.
+
+Usage:
+    python benchmarks/run_suite.py --output bench_results.json --baseline benchmarks/baseline.json
+    python benchmarks/run_suite.py --save_baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.data_mgt.array_data_handler import ArrayDataHandler  # noqa: E402
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler  # noqa: E402
+from cherry_algo_framework.main_backtest_runner import run_backtest  # noqa: E402
+from cherry_algo_framework.performance_mgt.metrics_calculator import compute_metrics  # noqa: E402
+from cherry_algo_framework.risk_mgt.risk_mgt.monte_carlo_validator import MonteCarloValidator  # noqa: E402
+from cherry_algo_framework.risk_mgt.risk_mgt.risk_engine import RiskEngine, RiskState  # noqa: E402
+from cherry_algo_framework.strategy.example_momentum_strategy import ExampleMomentumStrategy  # noqa: E402
+from cherry_algo_framework.utils.logging_setup import disable_logging  # noqa: E402
+
+from synthetic_data import write_csv  # noqa: E402
+
+PARAMS = {"lookback_bars": 5, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100}
+BROKER = {"initial_equity": 25_000.0, "commission_per_share": 0.005,
+          "commission_min_per_order": 1.0, "slippage_pct": 0.0005}
+
+# A case returns (items processed, seconds); most time their whole body.
+Case = Callable[[], Tuple[int, float]]
+
+
+def _timed(fn: Callable[[], int]) -> Tuple[int, float]:
+    t0 = time.perf_counter()
+    items = fn()
+    return items, time.perf_counter() - t0
+
+
+def build_cases(csv_path: Path, symbols: list, seed: int) -> Dict[str, Case]:
+    loaded = CSVDataHandler(csv_path, symbols, symbol_column="symbol")
+    bars = loaded.columnar_data
+    n_bars = sum(len(b) for b in bars.values())
+    events = list(ArrayDataHandler(bars, loaded.column_map).stream_next())
+    reference = run_backtest(ArrayDataHandler(bars, loaded.column_map), "example_momentum", PARAMS, **BROKER)
+
+    rng = np.random.default_rng(seed)
+    entry = rng.uniform(1.0, 30.0, (500, 200)).round(2)
+    stop = (entry * (1 - rng.uniform(0.005, 0.08, entry.shape))).round(2)
+    pnls = rng.normal(15.0, 120.0, 250)
+
+    def data_load():
+        return sum(len(b) for b in CSVDataHandler(csv_path, symbols, symbol_column="symbol").columnar_data.values())
+
+    def stream_next():
+        return sum(1 for _ in ArrayDataHandler(bars, loaded.column_map).stream_next())
+
+    def strategy_step():
+        # Only calculate_signals is timed; the event list is built once above.
+        strategy = ExampleMomentumStrategy(symbols, params=PARAMS)
+        calculate, queue = strategy.calculate_signals, strategy.event_queue
+        t0 = time.perf_counter()
+        for event in events:
+            calculate(event)
+            queue.clear()
+        return len(events), time.perf_counter() - t0
+
+    def backtest_event():
+        run_backtest(ArrayDataHandler(bars, loaded.column_map), "example_momentum", PARAMS, **BROKER)
+        return n_bars
+
+    def risk_evaluate_batch():
+        engine = RiskEngine(max_open_positions=50, backend="numpy")
+        for e, s in zip(entry, stop):
+            engine.evaluate_batch(e, s, RiskState(25_000.0, 25_000.0))
+        return entry.size
+
+    def monte_carlo():
+        MonteCarloValidator(initial_equity=25_000.0, n_simulations=10_000, seed=seed).run(pnls, method="bootstrap")
+        return 10_000
+
+    def metrics():
+        compute_metrics(reference.equity_curve, reference.fills, BROKER["initial_equity"], bars, loaded.column_map)
+        return n_bars
+
+    timed = {"data_load": data_load, "stream_next": stream_next, "backtest_event": backtest_event,
+             "risk_evaluate_batch": risk_evaluate_batch, "monte_carlo": monte_carlo, "metrics": metrics}
+    cases: Dict[str, Case] = {name: (lambda fn=fn: _timed(fn)) for name, fn in timed.items()}
+    cases["strategy_step"] = strategy_step
+    return dict(sorted(cases.items()))
+
+
+def run_suite(n_symbols: int, n_bars: int, seed: int = 42, repeats: int = 5, only: Optional[list] = None) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "bars.csv"
+        symbols = write_csv(csv_path, n_symbols, n_bars, seed)
+        cases = build_cases(csv_path, symbols, seed)
+        results = {}
+        for name, case in cases.items():
+            if only and name not in only:
+                continue
+            case()  # warm-up
+            runs = [case() for _ in range(repeats)]
+            items = runs[0][0]
+            seconds = [elapsed for _, elapsed in runs]
+            results[name] = {"items": items, "min_s": min(seconds), "median_s": statistics.median(seconds),
+                             "items_per_s": items / min(seconds)}
+    return {
+        "meta": {"symbols": n_symbols, "bars": n_bars, "seed": seed, "repeats": repeats,
+                 "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                 "platform": platform.platform(), "machine": platform.machine()},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2) -> Dict[str, dict]:
+    """Per-case min-time ratio against the baseline; `regressed` when it exceeds 1 + threshold."""
+    report = {}
+    for name, base in baseline.get("results", {}).items():
+        now = current["results"].get(name)
+        if now is None:
+            continue
+        ratio = now["min_s"] / base["min_s"] if base["min_s"] else float("inf")
+        report[name] = {"baseline_s": base["min_s"], "current_s": now["min_s"], "ratio": ratio,
+                        "regressed": ratio > 1 + threshold}
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--bars", type=int, default=5000, help="minute bars per symbol before gaps")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--cases", default=None, help="comma-separated subset of cases")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a case fails")
+    parser.add_argument("--save_baseline", default=None, help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        meta = baseline.get("meta", {})
+        # Case times scale with the data, so a different size or seed is not comparable.
+        recorded = {key: meta.get(key) for key in ("symbols", "bars", "seed")}
+        requested = {"symbols": args.symbols, "bars": args.bars, "seed": args.seed}
+        if recorded != requested:
+            parser.error(f"baseline {args.baseline} was recorded with {recorded}, not {requested}; "
+                         "rerun with its settings or record a new baseline")
+
+    disable_logging()
+
+    current = run_suite(args.symbols, args.bars, args.seed, args.repeats, args.cases.split(",") if args.cases else None)
+    for name, r in current["results"].items():
+        print(f"{name:<20} {r['min_s'] * 1e3:10.2f} ms min  {r['median_s'] * 1e3:10.2f} ms median  "
+              f"{r['items_per_s']:14,.0f} items/s")
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+
+    if baseline is None:
+        return 0
+    report = compare(current, baseline, args.threshold)
+    for name, r in report.items():
+        flag = "REGRESSION" if r["regressed"] else "ok"
+        print(f"{name:<20} {r['ratio']:6.2f}x baseline  {flag}")
+    return 1 if any(r["regressed"] for r in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Seeded synthetic minute bars for benchmarks.
+
+N symbols x M regular-session minute bars (14:30-21:00 UTC, 390 per day),
+with staggered listing dates, randomly missing bars, overnight price gaps
+and volume spikes, interleaved by timestamp like a consolidated feed. The
+same arguments always produce the same frame.
+
+Usage:
+    python benchmarks/synthetic_data.py --symbols 20 --bars 5000 --output /tmp/bars.csv
+"""
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+BARS_PER_SESSION = 390
+
+
+def session_index(n_bars: int, start: str = "2024-01-02") -> pd.DatetimeIndex:
+    days = pd.bdate_range(start, periods=-(-n_bars // BARS_PER_SESSION), tz="UTC")
+    minutes = pd.to_timedelta(np.arange(BARS_PER_SESSION), unit="min") + pd.Timedelta(hours=14, minutes=30)
+    return pd.DatetimeIndex((days.values[:, None] + minutes.values[None, :]).ravel()[:n_bars], tz="UTC")
+
+
+def generate_bars(n_symbols: int, n_bars: int, seed: int = 42, missing_pct: float = 0.02,
+                  spike_pct: float = 0.01, gap_sigma: float = 0.04) -> Dict[str, pd.DataFrame]:
+    """Per-symbol OHLCV frames indexed by UTC timestamp."""
+    rng = np.random.default_rng(seed)
+    index = session_index(n_bars)
+    session_start = np.r_[True, np.diff(index.normalize().asi8) > 0]
+    frames = {}
+    for k in range(n_symbols):
+        returns = rng.normal(0.0, 0.002, n_bars)
+        returns[session_start] += rng.normal(0.0, gap_sigma, int(session_start.sum()))  # overnight gaps
+        close = rng.uniform(2.0, 30.0) * np.exp(np.cumsum(returns))
+        open_ = np.r_[close[0], close[:-1]] * np.exp(rng.normal(0.0, 0.0005, n_bars))
+        wick = np.abs(rng.normal(0.0, 0.001, n_bars))
+        volume = rng.lognormal(8.0, 0.6, n_bars)
+        spikes = rng.random(n_bars) < spike_pct
+        volume[spikes] *= rng.uniform(10.0, 50.0, int(spikes.sum()))
+        keep = rng.random(n_bars) >= missing_pct
+        keep[:rng.integers(0, max(1, n_bars // 20))] = False  # staggered first bar
+        frames[f"SYM{k:04d}"] = pd.DataFrame({
+            "open": open_.round(4),
+            "high": (np.maximum(open_, close) * (1 + wick)).round(4),
+            "low": (np.minimum(open_, close) * (1 - wick)).round(4),
+            "close": close.round(4),
+            "volume": volume.round(),
+        }, index=index)[keep]
+    return frames
+
+
+def interleaved_frame(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """One long frame sorted by (datetime, symbol), as a multi-symbol CSV holds it."""
+    long = pd.concat({symbol: frame for symbol, frame in frames.items()}, names=["symbol", "datetime"]).reset_index()
+    long = long.sort_values(["datetime", "symbol"], kind="stable")
+    return long[["datetime", "symbol", "open", "high", "low", "close", "volume"]]
+
+
+def write_csv(path: Path, n_symbols: int, n_bars: int, seed: int = 42) -> list:
+    frames = generate_bars(n_symbols, n_bars, seed)
+    interleaved_frame(frames).to_csv(path, index=False)
+    return list(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--bars", type=int, default=5000, help="minute bars per symbol before gaps")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    symbols = write_csv(Path(args.output), args.symbols, args.bars, args.seed)
+    print(f"Wrote {len(symbols)} symbols to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
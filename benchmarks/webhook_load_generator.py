@@ -0,0 +1,108 @@
+"""Local load generator for the asyncio WebhookListener: opening-bell alert bursts over HTTP.
+
+Starts a listener in-process on a free localhost port (no external service),
+fires bursts of alerts over keep-alive connections, some of them duplicates
+and malformed, and reports the 202/409/400/429 split plus the listener's
+p50/p99 ingest-to-order latency.
+
+Usage:
+    python benchmarks/webhook_load_generator.py --alerts 20000 --connections 50 --queue_size 500
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cherry_algo_framework.execution_mgt.webhook_listener import WebhookListener  # noqa: E402
+from cherry_algo_framework.risk_mgt.risk_mgt.risk_engine import RiskEngine, RiskState  # noqa: E402
+
+
+def _payloads(n: int, duplicate_rate: float, invalid_rate: float, seed: int):
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        draw = rng.random()
+        if draw < invalid_rate:
+            out.append({'ticker': f"S{i % 500}", 'action': 'buy', 'price': 'n/a'})
+        elif draw < invalid_rate + duplicate_rate and i:
+            out.append(out[int(rng.integers(0, len(out)))])
+        else:
+            price = float(rng.uniform(2.0, 30.0))
+            out.append({'id': f"alert-{i}", 'ticker': f"S{i % 500}", 'action': 'buy',
+                        'price': round(price, 2), 'stop': round(price * 0.93, 2)})
+    return out
+
+
+async def _client(port: int, payloads, statuses: Counter, round_trips: list):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for payload in payloads:
+            body = json.dumps(payload).encode()
+            start = time.perf_counter()
+            writer.write(b"POST /webhook HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            round_trips.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def main(args):
+    orders = []
+    # Budgets wide open so every valid alert becomes an order: this measures the pipeline, not the rules.
+    engine = RiskEngine(max_open_positions=10 ** 9, portfolio_liquidity_cap_usd=1e12, backend=args.backend)
+    listener = WebhookListener(engine, lambda: RiskState(equity=1e9, cash=1e12), orders.append,
+                               queue_size=args.queue_size, batch_size=args.batch_size, batch_window_ms=args.batch_window_ms, secret='')
+    server = await listener.serve('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    payloads = _payloads(args.alerts, args.duplicate_rate, args.invalid_rate, args.seed)
+    statuses, round_trips = Counter(), []
+    start = time.perf_counter()
+    per_client = np.array_split(np.arange(len(payloads)), args.connections)
+    await asyncio.gather(*(_client(port, [payloads[i] for i in idx], statuses, round_trips)
+                           for idx in per_client))
+    await listener.drain()
+    elapsed = time.perf_counter() - start
+    await listener.stop()
+
+    rt = np.array(round_trips) * 1e6
+    summary = listener.latency_summary()
+    print(f"{args.alerts} alerts over {args.connections} connections in {elapsed:.2f}s "
+          f"({args.alerts / elapsed:,.0f} alerts/s)")
+    print(f"HTTP statuses       : {dict(sorted(statuses.items()))}")
+    print(f"orders emitted      : {len(orders)} (mean batch {summary.get('mean_batch', 0):.1f})")
+    print(f"HTTP round trip     : p50 {np.percentile(rt, 50):8.1f} us   p99 {np.percentile(rt, 99):8.1f} us")
+    if 'p50_us' in summary:
+        print(f"ingest -> order     : p50 {summary['p50_us']:8.1f} us   p99 {summary['p99_us']:8.1f} us")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=20000)
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--queue_size', type=int, default=1000)
+    parser.add_argument('--batch_size', type=int, default=64)
+    parser.add_argument('--batch_window_ms', type=float, default=2.0)
+    parser.add_argument('--duplicate_rate', type=float, default=0.05)
+    parser.add_argument('--invalid_rate', type=float, default=0.01)
+    parser.add_argument('--backend', default='numpy', choices=['torch', 'numpy'])
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -1,11 +1,24 @@
 # CherryAlgo-Framework Core Package
 # This file makes 'cherry_algo_framework' a Python package.
 
-__version__ = "0.2.0" 
+__version__ = "0.2.0"
 
-from .utils.config_loader import app_config
-from .utils.logging_setup import logger # Assuming logger is exposed from logging_setup
+# Nothing heavy runs at import: configuration is parsed on first lookup, the
+# log sinks are opened on first use, and the names below are imported when
+# they are first accessed.
+_LAZY_ATTRS = {
+    'app_config': 'utils.config_loader',
+    'Settings': 'utils.config_loader',
+    'logger': 'utils.logging_setup',
+}
+_SUBPACKAGES = ('core', 'data_mgt', 'execution_mgt', 'optimization', 'performance_mgt', 'portfolio_mgt',
+                'risk_mgt', 'strategy', 'utils')
 
-# Example: Make key components easily accessible (optional, once they are defined)
-# from .core.event import Event, EventType
-# from .backtester.engine import BacktestEngine # Placeholder
+
+def __getattr__(name):
+    import importlib
+    if name in _LAZY_ATTRS:
+        return getattr(importlib.import_module(f'.{_LAZY_ATTRS[name]}', __name__), name)
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
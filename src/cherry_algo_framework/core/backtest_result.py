@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+FILL_COLUMNS = ['datetime', 'symbol', 'direction', 'quantity', 'fill_price', 'commission']
+
+
+class BacktestResult:
+    """Outputs shared by the event-driven and vectorized engines."""
+
+    def __init__(self, equity_curve: pd.Series, fills: pd.DataFrame,
+                 final_cash: float, final_positions: Dict[str, float],
+                 initial_equity: float, mode: str):
+        self.equity_curve = equity_curve
+        self.fills = fills
+        self.final_cash = final_cash
+        self.final_positions = final_positions
+        self.initial_equity = initial_equity
+        self.mode = mode
+        self.metrics: Optional[Dict[str, Any]] = None
+        self.handler_profile: Optional[pd.DataFrame] = None  # EventBus.profile_report() when profiled
+        self.telemetry: Optional[Dict[str, Any]] = None      # Telemetry.snapshot() when enabled
+
+    @property
+    def final_equity(self) -> float:
+        return float(self.equity_curve.iloc[-1]) if len(self.equity_curve) else self.initial_equity
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'initial_equity': self.initial_equity,
+            'final_equity': self.final_equity,
+            'total_return_pct': (self.final_equity / self.initial_equity - 1) * 100 if self.initial_equity else None,
+            'num_fills': int(len(self.fills)),
+            'total_commission': float(self.fills['commission'].sum()) if len(self.fills) else 0.0,
+            'final_cash': self.final_cash,
+            'open_positions': self.final_positions,
+            **({'metrics': self.metrics} if self.metrics is not None else {}),
+        }
+
+
+def fills_frame(records: Optional[list] = None) -> pd.DataFrame:
+    return pd.DataFrame(records or [], columns=FILL_COLUMNS)
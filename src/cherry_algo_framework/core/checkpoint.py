@@ -0,0 +1,135 @@
+import pickle
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from ..data_mgt.bar_history import _to_ns
+from ..data_mgt.columnar_bars import ColumnarBars, ns_to_datetime
+from ..data_mgt.market_data_feed import MarketDataFeed
+from ..execution_mgt.simulated_broker import SimulatedBroker
+from ..performance_mgt.metrics_calculator import StreamingMetrics
+from ..portfolio_mgt.portfolio import Portfolio
+from ..strategy.base_strategy import BaseStrategy
+
+CHECKPOINT_VERSION = 1
+_HEADER = struct.Struct('<8sH')  # magic, format version; a zlib-compressed pickle follows
+_MAGIC = b'CHERRYCK'
+
+
+def consumed_bars(bars_by_symbol: Dict[str, ColumnarBars], as_of_ns: int) -> Dict[str, Tuple[int, str]]:
+    """Per symbol, the number of bars at or before `as_of_ns` and a digest of them."""
+    consumed = {}
+    for symbol, bars in bars_by_symbol.items():
+        n = bars.index_range(None, as_of_ns)[1]
+        consumed[symbol] = (n, bars.digest(n))
+    return consumed
+
+
+def run_settings(data_handler: MarketDataFeed, strategy: BaseStrategy, portfolio: Portfolio,
+                 broker: SimulatedBroker) -> Dict[str, Any]:
+    """What a resumed run must share with the checkpointed one to reproduce a full replay."""
+    return {
+        'strategy': type(strategy).__name__,
+        'params': dict(strategy.params),
+        'symbols': list(portfolio.symbol_list),
+        'initial_equity': portfolio.initial_equity,
+        'commission_per_share': broker.commission_per_share,
+        'commission_min_per_order': broker.commission_min_per_order,
+        'slippage_pct': broker.slippage_pct,
+        'history_capacity': data_handler.history_capacity,
+    }
+
+
+@dataclass
+class BacktestCheckpoint:
+    """Event-engine state after every bar up to `as_of_ns`, for resuming a replay.
+
+    `state` is the pickled strategy (with its indicator state), portfolio,
+    broker (resting orders and brackets), optional StreamingMetrics and the
+    feed's latest-bar state and bar history, taken at capture time. The
+    equity curve is stored as epoch-ns and value arrays. `consumed` records
+    how many bars of each symbol were replayed and a digest of them, so a
+    resume against data whose history has changed is refused rather than
+    producing a result a full replay would not.
+    """
+    as_of_ns: int
+    settings: Dict[str, Any]
+    consumed: Dict[str, Tuple[int, str]]
+    state: bytes
+    version: int = CHECKPOINT_VERSION
+
+    @classmethod
+    def capture(cls, as_of_ns: int, data_handler: MarketDataFeed, strategy: BaseStrategy, portfolio: Portfolio,
+                broker: SimulatedBroker, metrics: Optional[StreamingMetrics] = None) -> "BacktestCheckpoint":
+        curve = portfolio.equity_curve
+        feed = strategy.data_feed
+        # The feed is rebound on restore and the curve travels as arrays.
+        strategy.data_feed, portfolio.equity_curve = None, {}
+        try:
+            state = pickle.dumps({
+                'strategy': strategy, 'portfolio': portfolio, 'broker': broker, 'metrics': metrics,
+                'equity_ns': np.fromiter((_to_ns(dt) for dt in curve), dtype=np.int64, count=len(curve)),
+                'equity': np.fromiter(curve.values(), dtype=np.float64, count=len(curve)),
+                'latest_symbol_data': data_handler.latest_symbol_data,
+                'latest_bar_holders': data_handler._latest_bar_holders,
+                'bar_history': data_handler.bar_history,
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            strategy.data_feed, portfolio.equity_curve = feed, curve
+        return cls(int(as_of_ns), run_settings(data_handler, strategy, portfolio, broker),
+                   consumed_bars(data_handler.columnar_data, as_of_ns), state)
+
+    def verify(self, data_handler: MarketDataFeed, strategy: BaseStrategy, portfolio: Portfolio,
+               broker: SimulatedBroker):
+        """Raise ValueError unless this run and its data can continue the checkpointed one."""
+        settings = run_settings(data_handler, strategy, portfolio, broker)
+        changed = sorted(k for k in self.settings.keys() | settings.keys()
+                         if self.settings.get(k) != settings.get(k))
+        if changed:
+            raise ValueError(f"Checkpoint was taken with different settings: {', '.join(changed)}.")
+        if list(data_handler.columnar_data) != list(self.consumed) or \
+                consumed_bars(data_handler.columnar_data, self.as_of_ns) != self.consumed:
+            raise ValueError("Market data up to the checkpoint differs from the checkpointed run; "
+                             "run a full replay instead.")
+
+    def restore(self, data_handler: MarketDataFeed) -> Tuple[BaseStrategy, Portfolio, SimulatedBroker,
+                                                             Optional[StreamingMetrics]]:
+        """Fresh engine objects in the checkpointed state, with the feed's bar state restored."""
+        state = pickle.loads(self.state)
+        strategy, portfolio = state['strategy'], state['portfolio']
+        strategy.data_feed = data_handler
+        portfolio.equity_curve = dict(zip(map(ns_to_datetime, state['equity_ns'].tolist()),
+                                          state['equity'].tolist()))
+        data_handler.latest_symbol_data = state['latest_symbol_data']
+        data_handler._latest_bar_holders = state['latest_bar_holders']
+        data_handler.bar_history = state['bar_history']
+        return strategy, portfolio, state['broker'], state['metrics']
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = pickle.dumps({'as_of_ns': self.as_of_ns, 'settings': self.settings,
+                                'consumed': self.consumed, 'state': self.state},
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(_HEADER.pack(_MAGIC, self.version) + zlib.compress(payload, 6))
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BacktestCheckpoint":
+        raw = Path(path).read_bytes()
+        if len(raw) < _HEADER.size:
+            raise ValueError(f"{path} is not a backtest checkpoint.")
+        magic, version = _HEADER.unpack_from(raw)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a backtest checkpoint.")
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {path} has format version {version}; "
+                             f"this build reads version {CHECKPOINT_VERSION}.")
+        payload = pickle.loads(zlib.decompress(raw[_HEADER.size:]))
+        return cls(payload['as_of_ns'], payload['settings'], payload['consumed'], payload['state'], version)
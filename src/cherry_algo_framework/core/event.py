@@ -1,5 +1,6 @@
+from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 class EventType(Enum):
     MARKET = 1          # New market data (e.g., bar, tick)
@@ -13,19 +14,229 @@ class EventType(Enum):
     STRATEGY_PARAM_UPDATE = 9 # For dynamic strategy adjustments
 
 class Event:
+    __slots__ = ("type", "_data")
+
     def __init__(self, event_type: EventType, data: Optional[Dict[str, Any]] = None):
         self.type: EventType = event_type
-        self.data: Dict[str, Any] = data if data is not None else {}
- 
+        self._data: Optional[Dict[str, Any]] = data if data is not None else {}
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self._data
+
+    @data.setter
+    def data(self, value: Dict[str, Any]):
+        self._data = value
+
     def __str__(self) -> str:
         return f"Event(type={self.type.name}, data={self.data})"
 
+
+class _TypedEvent(Event):
+    # Fields live in __slots__; `data` is a compatibility view built on first
+    # access and cached, so code written against the dict payload keeps working.
+    # Writes through `data[...]` are not reflected back into the fields.
+    __slots__ = ()
+    _fields: tuple = ()
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self.to_dict()
+        return self._data
+
+    @data.setter
+    def data(self, value: Dict[str, Any]):
+        for key, val in value.items():
+            if key in self._fields:
+                setattr(self, key, val)
+        self._data = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+
+class MarketBarEvent(_TypedEvent):
+    __slots__ = ("symbol", "datetime", "open", "high", "low", "close", "volume", "extras", "_released")
+    _fields = ("symbol", "datetime", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbol: str, datetime: datetime,
+                 open: Any = None, high: Any = None, low: Any = None, close: Any = None, volume: Any = None,
+                 extras: Optional[Dict[str, Any]] = None):
+        self.type = EventType.MARKET
+        self._data = None
+        self.symbol = symbol
+        self.datetime = datetime
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.extras = extras  # pass-through CSV columns beyond OHLCV, or None
+        self._released = False  # set by MarketBarEventPool.release until the event is handed out again
+
+    def to_dict(self) -> Dict[str, Any]:
+        bar = {
+            'symbol': self.symbol,
+            'datetime': self.datetime,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }
+        if self.extras:
+            bar.update(self.extras)
+        return bar
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Field reads skip building the compatibility dict.
+        if self._data is None and key in self._fields and not (self.extras and key in self.extras):
+            return getattr(self, key)
+        return self.data.get(key, default)
+
+    def copy_from(self, other: "MarketBarEvent"):
+        self._data = None
+        self.symbol = other.symbol
+        self.datetime = other.datetime
+        self.open = other.open
+        self.high = other.high
+        self.low = other.low
+        self.close = other.close
+        self.volume = other.volume
+        self.extras = other.extras
+
+
+class SignalEvent(_TypedEvent):
+    __slots__ = ("symbol", "datetime", "signal_type", "strength", "strategy_id", "quantity", "stop_price")
+    _fields = __slots__
+
+    def __init__(self, symbol: str, datetime: datetime, signal_type: str,
+                 strength: float = 1.0, strategy_id: Optional[str] = None,
+                 quantity: Optional[float] = None, stop_price: Optional[float] = None):
+        self.type = EventType.SIGNAL
+        self._data = None
+        self.symbol = symbol
+        self.datetime = datetime
+        self.signal_type = signal_type  # 'LONG', 'SHORT' or 'EXIT'
+        self.strength = strength
+        self.strategy_id = strategy_id
+        self.quantity = quantity
+        self.stop_price = stop_price
+
+
+class OrderEvent(_TypedEvent):
+    __slots__ = ("symbol", "datetime", "order_type", "direction", "quantity",
+                 "limit_price", "stop_price", "order_id", "trail_pct")
+    _fields = __slots__
+
+    def __init__(self, symbol: str, datetime: datetime, order_type: str, direction: str, quantity: float,
+                 limit_price: Optional[float] = None, stop_price: Optional[float] = None,
+                 order_id: Optional[int] = None, trail_pct: Optional[float] = None):
+        self.type = EventType.ORDER
+        self._data = None
+        self.symbol = symbol
+        self.datetime = datetime
+        self.order_type = order_type  # 'MKT', 'LMT', 'STP', 'TRAIL'
+        self.direction = direction    # 'BUY' or 'SELL'
+        self.quantity = quantity
+        self.limit_price = limit_price
+        self.stop_price = stop_price
+        self.order_id = order_id
+        self.trail_pct = trail_pct    # TRAIL: stop follows the best price by this fraction
+
+
+class FillEvent(_TypedEvent):
+    __slots__ = ("symbol", "datetime", "direction", "quantity", "fill_price",
+                 "commission", "slippage", "exchange", "order_id")
+    _fields = __slots__
+
+    def __init__(self, symbol: str, datetime: datetime, direction: str, quantity: float, fill_price: float,
+                 commission: float = 0.0, slippage: float = 0.0, exchange: str = 'SIMULATED',
+                 order_id: Optional[int] = None):
+        self.type = EventType.FILL
+        self._data = None
+        self.symbol = symbol
+        self.datetime = datetime
+        self.direction = direction
+        self.quantity = quantity
+        self.fill_price = fill_price
+        self.commission = commission
+        self.slippage = slippage  # cost in currency versus the reference price
+        self.exchange = exchange
+        self.order_id = order_id
+
+
+class PortfolioUpdateEvent(_TypedEvent):
+    __slots__ = ("datetime", "equity", "cash")
+    _fields = __slots__
+
+    def __init__(self, datetime: datetime, equity: float, cash: Optional[float] = None):
+        self.type = EventType.PORTFOLIO_UPDATE
+        self._data = None
+        self.datetime = datetime
+        self.equity = equity
+        self.cash = cash
+
+
+class MarketBarEventPool:
+    """Free list of MarketBarEvent objects for tight replay loops.
+
+    A feed constructed with a pool hands out recycled events; the consumer
+    must call `release()` exactly once when it has finished with an event
+    (a second release raises ValueError) and must not keep references to it
+    afterwards. The feed's latest-bar state is copied into
+    per-symbol holders, so it is never affected by recycling.
+    """
+
+    __slots__ = ("_free", "max_size", "allocated")
+
+    def __init__(self, max_size: int = 1024):
+        self._free: List[MarketBarEvent] = []
+        self.max_size = max_size
+        self.allocated = 0
+
+    def acquire(self, symbol: str, datetime: datetime,
+                open: Any = None, high: Any = None, low: Any = None, close: Any = None, volume: Any = None,
+                extras: Optional[Dict[str, Any]] = None) -> MarketBarEvent:
+        if not self._free:
+            self.allocated += 1
+            return MarketBarEvent(symbol, datetime, open, high, low, close, volume, extras)
+        event = self._free.pop()
+        event._released = False
+        event._data = None
+        event.symbol = symbol
+        event.datetime = datetime
+        event.open = open
+        event.high = high
+        event.low = low
+        event.close = close
+        event.volume = volume
+        event.extras = extras
+        return event
+
+    def release(self, event: Event):
+        if not isinstance(event, MarketBarEvent):
+            return
+        # A second release would put the event on the free list twice and two
+        # later acquire() calls would share it.
+        if event._released:
+            raise ValueError(f"MarketBarEvent for {event.symbol} at {event.datetime} was already released.")
+        event._released = True
+        if len(self._free) < self.max_size:
+            self._free.append(event)
+
+    def __len__(self) -> int:
+        return len(self._free)
+
 # Example Usage (typically not here, but for understanding)
 # if __name__ == '__main__':
 #     market_event_data = {'ticker': 'AAPL', 'price': 150.00, 'volume': 100000}
 #     market_event = Event(EventType.MARKET, market_event_data)
 #     print(market_event)
 
-#     signal_event_data = {'ticker': 'AAPL', 'signal_type': 'BUY', 'strength': 0.75}
-#     signal_event = Event(EventType.SIGNAL, signal_event_data)
-#     print(signal_event)
+#     signal_event = SignalEvent('AAPL', datetime.now(), 'LONG', strength=0.75)
+#     print(signal_event.signal_type, signal_event.data['strength'])
@@ -0,0 +1,206 @@
+from collections import deque
+from time import perf_counter_ns
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .event import Event, EventType
+
+Handler = Callable[[Event], Any]
+BatchHandler = Callable[[List[Event]], Any]
+
+
+class _Subscription:
+    __slots__ = ("handler", "priority", "seq", "name", "calls", "total_ns")
+
+    def __init__(self, handler: Callable, priority: int, seq: int, name: str):
+        self.handler = handler
+        self.priority = priority
+        self.seq = seq
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+
+
+def _handler_name(handler: Callable) -> str:
+    owner = getattr(handler, '__self__', None)
+    name = getattr(handler, '__name__', type(handler).__name__)
+    return f"{type(owner).__name__}.{name}" if owner is not None else getattr(handler, '__qualname__', name)
+
+
+class EventBus:
+    """Routes events to the handlers subscribed to their EventType.
+
+    Subscriptions live in a table indexed by `EventType.value` and run in
+    ascending `priority`, then subscription order. Whatever a handler
+    returns (an Event, an iterable of events, or None) is dispatched
+    straight away, before the next handler sees the current event, so a
+    broker's fills reach the portfolio before it is marked. Events put on
+    the queue with `publish()` (or appended to a queue passed in, such as a
+    strategy's `event_queue`) are delivered FIFO by `drain()`.
+
+    `run(events)` dispatches a feed's events one at a time, draining the
+    queue after each. Batch handlers (`subscribe_batch`) additionally get
+    the list of MARKET events sharing a timestamp, once per timestamp. The
+    list is only complete when the first bar of the next timestamp has
+    been read, so the feed's latest-bar state is one bar ahead while they
+    run; they should use the bars they are given.
+
+    With `profile=True` every handler call is timed and `profile_report()`
+    shows calls, cumulative and per-call time, and time per market event
+    for each handler.
+    """
+
+    def __init__(self, profile: bool = False, queue: Optional[Deque[Event]] = None):
+        self.profile = profile
+        self.queue: Deque[Event] = queue if queue is not None else deque()
+        size = max(t.value for t in EventType) + 1
+        self._subscriptions: List[List[_Subscription]] = [[] for _ in range(size)]
+        # Sorted snapshots per type: subscriptions for profiling, bare callables otherwise.
+        self._subscriptions_by_type: List[tuple] = [() for _ in range(size)]
+        self._handlers: List[tuple] = [() for _ in range(size)]
+        self._batch_subscriptions: List[_Subscription] = []
+        self.event_counts: List[int] = [0] * size  # dispatches per EventType.value, counted when profiling
+        self._seq = 0
+        self.market_events = 0
+        self.market_timestamps = 0
+
+    # ------------------------------------------------------------ subscribing
+    def _new_subscription(self, handler: Callable, priority: int, name: Optional[str]) -> _Subscription:
+        self._seq += 1
+        return _Subscription(handler, priority, self._seq, name or _handler_name(handler))
+
+    def _refresh(self, value: int):
+        self._subscriptions_by_type[value] = tuple(self._subscriptions[value])
+        self._handlers[value] = tuple(s.handler for s in self._subscriptions[value])
+
+    def subscribe(self, event_type: EventType, handler: Handler, priority: int = 0,
+                  name: Optional[str] = None) -> _Subscription:
+        subscriptions = self._subscriptions[event_type.value]
+        subscription = self._new_subscription(handler, priority, name)
+        subscriptions.append(subscription)
+        subscriptions.sort(key=lambda s: (s.priority, s.seq))
+        self._refresh(event_type.value)
+        return subscription
+
+    def subscribe_batch(self, handler: BatchHandler, priority: int = 0, name: Optional[str] = None) -> _Subscription:
+        """`handler(bars)` once per timestamp with all MARKET events of that timestamp (from `run`)."""
+        subscription = self._new_subscription(handler, priority, name)
+        self._batch_subscriptions.append(subscription)
+        self._batch_subscriptions.sort(key=lambda s: (s.priority, s.seq))
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription):
+        for value, subscriptions in enumerate(self._subscriptions):
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+                self._refresh(value)
+        if subscription in self._batch_subscriptions:
+            self._batch_subscriptions.remove(subscription)
+
+    # ------------------------------------------------------------ dispatching
+    def _deliver(self, out: Any):
+        if isinstance(out, Event):
+            self.dispatch(out)
+        else:
+            for event in out:
+                self.dispatch(event)
+
+    def _call_profiled(self, subscription: _Subscription, arg: Any):
+        t0 = perf_counter_ns()
+        out = subscription.handler(arg)
+        subscription.total_ns += perf_counter_ns() - t0
+        subscription.calls += 1
+        if out is not None:
+            self._deliver(out)
+
+    def dispatch(self, event: Event):
+        """Deliver `event` to its handlers now."""
+        if self.profile:
+            self.event_counts[event.type.value] += 1
+            for subscription in self._subscriptions_by_type[event.type.value]:
+                self._call_profiled(subscription, event)
+            return
+        for handler in self._handlers[event.type.value]:
+            out = handler(event)
+            if out is not None:
+                self._deliver(out)
+
+    def publish(self, event: Event):
+        self.queue.append(event)
+
+    def drain(self):
+        queue = self.queue
+        while queue:
+            self.dispatch(queue.popleft())
+
+    def _flush_batch(self, batch: List[Event], release: Optional[Callable[[Event], None]]):
+        self.market_timestamps += 1
+        for subscription in self._batch_subscriptions:
+            if self.profile:
+                self._call_profiled(subscription, batch)
+            else:
+                out = subscription.handler(batch)
+                if out is not None:
+                    self._deliver(out)
+        self.drain()
+        if release is not None:
+            for event in batch:
+                release(event)
+
+    def run(self, events: Iterable[Event], release: Optional[Callable[[Event], None]] = None):
+        """Dispatch a stream of events; `release` (e.g. an event pool's) is called once each is done with."""
+        batching = bool(self._batch_subscriptions)
+        batch: List[Event] = []
+        batch_dt = None
+        dispatch, queue, market = self.dispatch, self.queue, EventType.MARKET
+        for event in events:
+            is_market = event.type is market
+            if is_market:
+                self.market_events += 1
+                if batching and batch and event.datetime != batch_dt:
+                    self._flush_batch(batch, release)
+                    batch = []
+            dispatch(event)
+            if queue:
+                self.drain()
+            if is_market and batching:
+                batch_dt = event.datetime
+                batch.append(event)
+            elif release is not None:
+                release(event)
+        if batch:
+            self._flush_batch(batch, release)
+
+    # -------------------------------------------------------------- profiling
+    def reset_profile(self):
+        for _, subscription in self._all_subscriptions():
+            subscription.calls = 0
+            subscription.total_ns = 0
+        self.market_events = 0
+        self.market_timestamps = 0
+        self.event_counts = [0] * len(self.event_counts)
+
+    def _all_subscriptions(self) -> List[tuple]:
+        # (event type name, subscription); index 0 of the table is unused.
+        rows = [(EventType(value).name, s) for value, subs in enumerate(self._subscriptions) if value for s in subs]
+        rows.extend(('MARKET_BATCH', s) for s in self._batch_subscriptions)
+        return rows
+
+    def event_type_counts(self) -> Dict[str, int]:
+        return {EventType(value).name: n for value, n in enumerate(self.event_counts) if n}
+
+    def profile_report(self) -> pd.DataFrame:
+        """Per-handler calls, total ms, µs per call and µs per market event, slowest first."""
+        rows = []
+        for event_type, s in self._all_subscriptions():
+            rows.append({
+                'handler': s.name, 'event_type': event_type, 'calls': s.calls,
+                'total_ms': s.total_ns / 1e6,
+                'us_per_call': s.total_ns / s.calls / 1e3 if s.calls else 0.0,
+                'us_per_bar': s.total_ns / self.market_events / 1e3 if self.market_events else 0.0,
+            })
+        report = pd.DataFrame(rows, columns=['handler', 'event_type', 'calls', 'total_ms', 'us_per_call', 'us_per_bar'])
+        total = report['total_ms'].sum()
+        report['share'] = report['total_ms'] / total if total else 0.0
+        return report.sort_values('total_ms', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,335 @@
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .backtest_result import FILL_COLUMNS, BacktestResult
+from .event import FillEvent, MarketBarEvent
+from ..data_mgt.columnar_bars import ColumnarBars
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import logger
+
+RESULTS_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DEFAULT_BUFFER_ROWS = 65_536
+
+# Column order per stream. `bars` is per-bar telemetry from event-mode runs:
+# equity and cash after the bar, and ns since the writer was created.
+STREAM_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'fills': tuple(FILL_COLUMNS),
+    'equity': ('datetime', 'equity'),
+    'bars': ('datetime', 'symbol', 'close', 'equity', 'cash', 'elapsed_ns'),
+}
+
+
+def _json_default(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+class _ColumnFile:
+    """One append-only column of raw values; text is stored as int32 codes.
+
+    The kind (datetime, category or numeric) and dtype are fixed by the first
+    chunk appended. Datetimes are stored as UTC epoch nanoseconds.
+    """
+
+    __slots__ = ("path", "kind", "dtype", "codes", "rows", "_fh")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.kind: Optional[str] = None
+        self.dtype: Optional[np.dtype] = None
+        self.codes: Dict[str, int] = {}
+        self.rows = 0
+        self._fh = None
+
+    def _infer(self, values: Any):
+        if isinstance(values, (pd.Series, pd.Index)) and pd.api.types.is_datetime64_any_dtype(values.dtype):
+            self.kind, self.dtype = 'datetime', np.dtype(np.int64)
+            return
+        first = values.iloc[0] if isinstance(values, pd.Series) else values[0]
+        if isinstance(first, (datetime, np.datetime64)):
+            self.kind, self.dtype = 'datetime', np.dtype(np.int64)
+        elif isinstance(first, str):
+            self.kind, self.dtype = 'category', np.dtype(np.int32)
+        else:
+            dtype = np.asarray(values).dtype
+            self.kind, self.dtype = 'numeric', dtype if dtype != object else np.dtype(np.float64)
+
+    def _encode(self, values: Any) -> np.ndarray:
+        if self.kind == 'datetime':
+            index = pd.DatetimeIndex(values)
+            if index.tz is None:
+                index = index.tz_localize('UTC')
+            return index.as_unit('ns').asi8
+        if self.kind == 'category':
+            codes = self.codes
+            return np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int32, count=len(values))
+        return np.asarray(values).astype(self.dtype, casting='same_kind', copy=False)
+
+    def append(self, values: Any):
+        if not len(values):
+            return
+        if self.kind is None:
+            self._infer(values)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, 'ab')
+        self._fh.write(np.ascontiguousarray(self._encode(values)).tobytes())
+        self.rows += len(values)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def meta(self) -> Dict[str, Any]:
+        return {'file': self.path.name, 'kind': self.kind or 'numeric', 'rows': self.rows,
+                'dtype': str(self.dtype or np.dtype(np.float64)),
+                **({'categories': list(self.codes)} if self.kind == 'category' else {})}
+
+
+class ResultsWriter:
+    """Streams fills, equity points and per-bar telemetry into column files.
+
+    Rows are buffered per stream and appended to `<stream>/<column>.bin` every
+    `buffer_rows` rows, so the writer's memory is bounded whatever the run
+    length. Everything is written to a temporary sibling of `directory` and
+    renamed into place by `close()`, so readers never see a partial store.
+    Read it back with `ResultsStore`.
+    """
+
+    def __init__(self, directory: Union[str, Path], buffer_rows: int = DEFAULT_BUFFER_ROWS):
+        self.directory = Path(directory)
+        self.buffer_rows = max(1, int(buffer_rows))
+        self.directory.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = Path(tempfile.mkdtemp(prefix=f".{self.directory.name}-", dir=self.directory.parent))
+        self._columns = {stream: [_ColumnFile(self._tmp / stream / f"{col}.bin") for col in cols]
+                         for stream, cols in STREAM_COLUMNS.items()}
+        self._buffers: Dict[str, List[tuple]] = {stream: [] for stream in STREAM_COLUMNS}
+        self._pending_equity: Optional[Tuple[datetime, float]] = None
+        self._t0 = perf_counter_ns()
+        self.closed = False
+
+    # -------------------------------------------------------------- streaming
+    def append(self, stream: str, row: tuple):
+        buffer = self._buffers[stream]
+        buffer.append(row)
+        if len(buffer) >= self.buffer_rows:
+            self._flush(stream)
+
+    def _flush(self, stream: str):
+        buffer = self._buffers[stream]
+        if buffer:
+            for column, values in zip(self._columns[stream], zip(*buffer)):
+                column.append(values)
+            buffer.clear()
+
+    def on_fill(self, fill: FillEvent):
+        self.append('fills', (fill.datetime, fill.symbol, fill.direction, fill.quantity,
+                              fill.fill_price, fill.commission))
+
+    def on_bar(self, bar: MarketBarEvent, equity: float, cash: float):
+        """Record one marked bar; the equity stream keeps the last value per timestamp, as Portfolio does."""
+        close = bar.close if bar.close is not None else np.nan
+        self.append('bars', (bar.datetime, bar.symbol, close, equity, cash, perf_counter_ns() - self._t0))
+        pending = self._pending_equity
+        if pending is not None and pending[0] != bar.datetime:
+            self.append('equity', pending)
+        self._pending_equity = (bar.datetime, equity)
+
+    def append_result(self, result: BacktestResult):
+        """Write a finished result's fills and equity curve (engines that do not stream)."""
+        for stream, frame in (('fills', result.fills),
+                              ('equity', pd.DataFrame({'datetime': result.equity_curve.index,
+                                                       'equity': result.equity_curve.to_numpy()}))):
+            self._flush(stream)
+            for lo in range(0, len(frame), self.buffer_rows):
+                chunk = frame.iloc[lo:lo + self.buffer_rows]
+                for column, name in zip(self._columns[stream], STREAM_COLUMNS[stream]):
+                    column.append(chunk[name])
+
+    # ------------------------------------------------------------- finishing
+    def close(self, result: Optional[BacktestResult] = None) -> Path:
+        """Flush, write the manifest (with the summary of `result`, if given) and publish the store."""
+        if self._pending_equity is not None:
+            self.append('equity', self._pending_equity)
+            self._pending_equity = None
+        manifest: Dict[str, Any] = {'format_version': RESULTS_FORMAT_VERSION, 'streams': {}}
+        for stream in STREAM_COLUMNS:
+            self._flush(stream)
+            for column in self._columns[stream]:
+                column.close()
+            manifest['streams'][stream] = {name: column.meta()
+                                           for name, column in zip(STREAM_COLUMNS[stream], self._columns[stream])}
+        if result is not None:
+            manifest['result'] = {
+                'mode': result.mode, 'initial_equity': result.initial_equity, 'final_cash': result.final_cash,
+                'final_positions': result.final_positions, 'metrics': result.metrics,
+                # Datetime units and dtypes of the in-memory frames, so to_result() rebuilds them exactly.
+                'equity_unit': result.equity_curve.index.unit if len(result.equity_curve) else 'ns',
+                'fill_dtypes': {col: str(dtype) for col, dtype in result.fills.dtypes.items()},
+            }
+        try:
+            (self._tmp / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, default=_json_default),
+                                                   encoding='utf-8')
+            if self.directory.exists():
+                shutil.rmtree(self.directory)
+            os.replace(self._tmp, self.directory)
+        except Exception:
+            self.abort()
+            raise
+        self.closed = True
+        logger.info(f"Wrote results store {self.directory}")
+        return self.directory
+
+    def abort(self):
+        for columns in self._columns.values():
+            for column in columns:
+                column.close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        self.closed = True
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and not self.closed:
+            self.abort()
+
+
+class ResultsStore:
+    """Read side of a results directory; every column is memory-mapped read-only.
+
+    `column()` returns the stored array (epoch ns, category codes or values)
+    without copying; `frame()`, `fills()`, `equity_curve()` and `to_result()`
+    decode into pandas objects.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.manifest: Dict[str, Any] = json.loads((self.directory / MANIFEST_NAME).read_text(encoding='utf-8'))
+        if self.manifest.get('format_version') != RESULTS_FORMAT_VERSION:
+            raise ValueError(f"Results store {self.directory} has format version "
+                             f"{self.manifest.get('format_version')}; expected {RESULTS_FORMAT_VERSION}.")
+
+    def __len__(self) -> int:
+        return self.rows('bars')
+
+    def rows(self, stream: str) -> int:
+        columns = self.manifest['streams'][stream]
+        return next(iter(columns.values()))['rows'] if columns else 0
+
+    def column(self, stream: str, name: str) -> np.ndarray:
+        meta = self.manifest['streams'][stream][name]
+        dtype = np.dtype(meta['dtype'])
+        if not meta['rows']:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.directory / stream / meta['file'], dtype=dtype, mode='r', shape=(meta['rows'],))
+
+    def _decode(self, stream: str, name: str) -> Any:
+        meta = self.manifest['streams'][stream][name]
+        values = self.column(stream, name)
+        if meta['kind'] == 'datetime':
+            return pd.DatetimeIndex(np.asarray(values).view('datetime64[ns]')).tz_localize(timezone.utc)
+        if meta['kind'] == 'category':
+            return np.asarray(meta['categories'], dtype=object)[values]
+        return values
+
+    def frame(self, stream: str) -> pd.DataFrame:
+        return pd.DataFrame({name: self._decode(stream, name) for name in STREAM_COLUMNS[stream]})
+
+    def equity_curve(self) -> pd.Series:
+        index = self._decode('equity', 'datetime')
+        unit = self.manifest.get('result', {}).get('equity_unit')
+        if unit and len(index):
+            index = index.as_unit(unit)
+        return pd.Series(np.array(self.column('equity', 'equity'), dtype=float), index=index if len(index) else None,
+                         name='equity', dtype=float)
+
+    def fills(self) -> pd.DataFrame:
+        fills = self.frame('fills')
+        dtypes = self.manifest.get('result', {}).get('fill_dtypes')
+        return fills.astype(dtypes) if dtypes else fills
+
+    def to_result(self) -> BacktestResult:
+        meta = self.manifest.get('result')
+        if meta is None:
+            raise ValueError(f"Results store {self.directory} was closed without a result summary.")
+        result = BacktestResult(self.equity_curve(), self.fills(), meta['final_cash'], meta['final_positions'],
+                                meta['initial_equity'], meta['mode'])
+        result.metrics = meta['metrics']
+        return result
+
+
+def bars_digest(bars_by_symbol: Dict[str, ColumnarBars], column_map: Dict[str, str]) -> str:
+    """Content key of a feed's bars: symbol order, column map and every column's values."""
+    digest = hashlib.sha256(json.dumps(column_map, sort_keys=True).encode('utf-8'))
+    for symbol, bars in bars_by_symbol.items():
+        digest.update(f"{symbol}:{bars.digest()}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Package version plus a hash of its sources, so editing the engine invalidates cached runs."""
+    from .. import __version__
+    package = Path(__file__).resolve().parents[1]
+    digest = hashlib.sha256(__version__.encode('utf-8'))
+    for path in sorted(package.rglob('*.py')):
+        digest.update(path.relative_to(package).as_posix().encode('utf-8'))
+        digest.update(path.read_bytes())
+    return f"{__version__}+{digest.hexdigest()[:16]}"
+
+
+class RunCache:
+    """Finished backtests stored as results directories under `<cache_dir>/<key>/`.
+
+    Keys hash the bars' content, the strategy and its parameters, the engine
+    mode and costs, the settings snapshot and `code_version()`, so any change
+    that could alter a result misses the cache.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+
+    def make_key(self, bars_by_symbol: Dict[str, ColumnarBars], column_map: Dict[str, str], strategy_name: str,
+                 params: Dict[str, Any], mode: str, run: Dict[str, Any]) -> str:
+        settings = dataclasses.asdict(app_config.snapshot())
+        settings.pop('source', None)
+        payload = json.dumps({
+            'format_version': RESULTS_FORMAT_VERSION,
+            'data': bars_digest(bars_by_symbol, column_map),
+            'strategy': strategy_name, 'params': params, 'mode': mode, 'run': run,
+            'settings': settings, 'code': code_version(),
+        }, sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def load(self, key: str) -> Optional[BacktestResult]:
+        entry = self.entry_path(key)
+        if not (entry / MANIFEST_NAME).exists():
+            return None
+        try:
+            result = ResultsStore(entry).to_result()
+            logger.info(f"Loaded cached run {entry}")
+            return result
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable run cache entry {entry}: {e}")
+            return None
+
+    def store(self, key: str, result: BacktestResult) -> Path:
+        with ResultsWriter(self.entry_path(key)) as writer:
+            writer.append_result(result)
+            return writer.close(result)
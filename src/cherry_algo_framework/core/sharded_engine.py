@@ -0,0 +1,203 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from .backtest_result import BacktestResult, fills_frame
+from ..data_mgt.array_data_handler import ArrayDataHandler
+from ..data_mgt.columnar_bars import ColumnarBars
+from ..data_mgt.shared_bars import SharedBarStore
+from ..execution_mgt.simulated_broker import SimulatedBroker
+from ..portfolio_mgt.portfolio import Portfolio
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import disable_logging, logger
+
+NS_PER_DAY = 86_400 * 1_000_000_000
+SHARDS_PER_WORKER = 4
+
+Window = Tuple[int, int]  # inclusive [start_ns, end_ns]
+
+
+class _ShardPortfolio(Portfolio):
+    """Portfolio that records holdings value and fill count per timestamp.
+
+    Sizing never reads cash, so a shard's fills do not depend on the equity
+    it starts with; the stitch pass rebuilds cash from the fills and adds
+    these holdings values, the same two terms `total_equity` adds.
+    """
+
+    def __init__(self, symbol_list: List[str], initial_equity: float):
+        super().__init__(symbol_list, initial_equity)
+        self.marks: Dict[Any, Tuple[float, int]] = {}
+
+    def update_timeindex(self, bar):
+        if bar.close is not None:
+            self.ledger.mark(self._position(bar.symbol)._id, bar.close, bar.high, bar.low)
+        self.current_datetime = bar.datetime
+        self.marks[bar.datetime] = (self.holdings_value, len(self.fills))
+
+
+def session_windows(bars_by_symbol: Dict[str, ColumnarBars], n_shards: int) -> List[Window]:
+    """Split the UTC session dates into `n_shards` contiguous runs of whole days."""
+    days = np.unique(np.concatenate([np.asarray(b.timestamps, dtype=np.int64) // NS_PER_DAY
+                                     for b in bars_by_symbol.values()] or [np.empty(0, np.int64)]))
+    if days.size == 0:
+        return []
+    bounds = np.linspace(0, days.size, min(n_shards, days.size) + 1).astype(int)
+    return [(int(days[lo]) * NS_PER_DAY, (int(days[hi - 1]) + 1) * NS_PER_DAY - 1)
+            for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def _replay_shard(bars_by_symbol: Dict[str, ColumnarBars], spec: Dict[str, Any], window: Window) -> Dict[str, Any]:
+    from ..main_backtest_runner import build_event_bus
+
+    shard, warmup = {}, {}
+    for symbol, bars in bars_by_symbol.items():
+        lo, hi = bars.index_range(*window)
+        shard[symbol] = bars.slice(lo, hi)
+        if lo:
+            warmup[symbol] = bars.slice(max(0, lo - spec['warmup_bars']), lo)
+
+    symbols = list(bars_by_symbol)
+    handler = ArrayDataHandler(shard, spec['column_map'])
+    strategy = spec['strategy_cls'](symbols, data_feed=handler, params=spec['params'])
+    for event in ArrayDataHandler(warmup, spec['column_map']).stream_next():
+        strategy.prime(event)
+    portfolio = _ShardPortfolio(symbols, spec['initial_equity'])
+    broker = SimulatedBroker(spec['commission_per_share'], spec['commission_min_per_order'], spec['slippage_pct'])
+    bus = build_event_bus(strategy, portfolio, broker)
+    bus.run(handler.stream_next())
+
+    marks = portfolio.marks
+    return {
+        'window': window,
+        'fills': portfolio.fills,
+        'times': list(marks),
+        'holdings': np.fromiter((m[0] for m in marks.values()), dtype=np.float64, count=len(marks)),
+        'fill_counts': np.fromiter((m[1] for m in marks.values()), dtype=np.intp, count=len(marks)),
+        'flat': strategy.is_flat() and not portfolio.open_positions() and not broker.has_working_orders,
+        'final_positions': portfolio.open_positions(),
+        'bars': bus.market_events,
+    }
+
+
+# Worker-process state, set once per process by _init_worker.
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(manifest: Dict[str, Any], spec: Dict[str, Any]):
+    disable_logging()
+    app_config.use_snapshot(spec['config'])
+    _WORKER['store'] = SharedBarStore.attach(manifest)
+    _WORKER['spec'] = spec
+
+
+def _run_shard(window: Window) -> Dict[str, Any]:
+    return _replay_shard(_WORKER['store'].bars, _WORKER['spec'], window)
+
+
+def _merge_unflat(results: List[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], List[Window]]:
+    # A shard that did not end flat hands state to its successor, so the two
+    # are replayed again as one shard. Returns the kept results (None where a
+    # merged shard goes) and the merged windows, in order.
+    kept, windows = [], []
+    k = 0
+    while k < len(results):
+        j = k
+        while j < len(results) - 1 and not results[j]['flat']:
+            j += 1
+        if j == k:
+            kept.append(results[k])
+        else:
+            kept.append(None)
+            windows.append((results[k]['window'][0], results[j]['window'][1]))
+        k = j + 1
+    return kept, windows
+
+
+def _stitch(results: List[Dict[str, Any]], initial_equity: float) -> BacktestResult:
+    fills = [fill for r in results for fill in r['fills']]
+    # Cash after each fill, with exactly the operations Portfolio.on_fill applies.
+    cash_after = np.empty(len(fills) + 1)
+    cash = cash_after[0] = float(initial_equity)
+    for n, fill in enumerate(fills, 1):
+        if fill['direction'] == 'BUY':
+            cash -= fill['fill_price'] * fill['quantity'] + fill['commission']
+        else:
+            cash += fill['fill_price'] * fill['quantity'] - fill['commission']
+        cash_after[n] = cash
+
+    offsets = np.cumsum([0] + [len(r['fills']) for r in results[:-1]])
+    values = [cash_after[r['fill_counts'] + offset] + r['holdings'] for r, offset in zip(results, offsets)]
+    times = [t for r in results for t in r['times']]
+    equity_curve = pd.Series(np.concatenate(values) if values else [], index=times or None, name='equity', dtype=float)
+    if len(equity_curve):
+        equity_curve.index = pd.DatetimeIndex(equity_curve.index)
+    final_positions = results[-1]['final_positions'] if results else {}
+    return BacktestResult(equity_curve, fills_frame(fills), cash, final_positions, initial_equity, 'sharded')
+
+
+def run_sharded_backtest(bars_by_symbol: Dict[str, ColumnarBars],
+                         strategy_cls: Type,
+                         params: Optional[Dict[str, Any]],
+                         column_map: Dict[str, str],
+                         initial_equity: float,
+                         commission_per_share: float,
+                         commission_min_per_order: float,
+                         slippage_pct: float,
+                         max_workers: Optional[int] = None,
+                         n_shards: Optional[int] = None) -> BacktestResult:
+    """Event-driven backtest replayed as runs of whole sessions in parallel.
+
+    The UTC session dates are split into contiguous shards, each replayed
+    through the usual strategy / portfolio / broker bus in a worker process
+    (bars come from one shared-memory block). A shard's strategy is primed
+    with the `warmup_bars` bars per symbol before it. Fills never depend on
+    cash, so a sequential pass then rebuilds cash from the fills in order
+    and adds each shard's recorded holdings values, which gives the
+    single-process equity curve bit for bit.
+
+    This relies on the book being flat between shards. A shard that ends with
+    a position, a working order or a strategy that still believes it is long
+    is merged with the next one and both are replayed again, so the result is
+    exact even when that assumption fails (at worst it degrades to one shard).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    strategy = strategy_cls(list(bars_by_symbol), params=params)
+    if not strategy.supports_day_sharding:
+        raise ValueError(f"{strategy_cls.__name__} does not support day sharding (no prime()).")
+    spec = {
+        'strategy_cls': strategy_cls, 'params': params, 'column_map': dict(column_map),
+        'warmup_bars': int(strategy.warmup_bars), 'initial_equity': initial_equity,
+        'commission_per_share': commission_per_share, 'commission_min_per_order': commission_min_per_order,
+        'slippage_pct': slippage_pct, 'config': app_config.snapshot(),
+    }
+    windows = session_windows(bars_by_symbol, n_shards or max_workers * SHARDS_PER_WORKER)
+
+    def replay(pool: Optional[ProcessPoolExecutor], shard_windows: List[Window]) -> List[Dict[str, Any]]:
+        if pool is None:
+            return [_replay_shard(bars_by_symbol, spec, w) for w in shard_windows]
+        return list(pool.map(_run_shard, shard_windows))
+
+    def replay_all(pool: Optional[ProcessPoolExecutor]) -> List[Dict[str, Any]]:
+        results = replay(pool, windows)
+        while results and not all(r['flat'] for r in results[:-1]):
+            kept, merged = _merge_unflat(results)
+            logger.info(f"{len(merged)} shard boundary(ies) not flat; replaying merged shards.")
+            rerun = iter(replay(pool, merged))
+            results = [r if r is not None else next(rerun) for r in kept]
+        return results
+
+    if max_workers == 1 or len(windows) <= 1:
+        results = replay_all(None)
+    else:
+        with SharedBarStore() as store:
+            manifest = store.publish(bars_by_symbol)
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(manifest, spec)) as pool:
+                results = replay_all(pool)
+    logger.info(f"Sharded replay: {sum(r['bars'] for r in results)} bars in {len(results)} shard(s) "
+                f"over {max_workers} worker(s).")
+    return _stitch(results, initial_equity)
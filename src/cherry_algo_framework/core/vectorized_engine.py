@@ -0,0 +1,103 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .backtest_result import BacktestResult, fills_frame
+from ..data_mgt.columnar_bars import ColumnarBars
+
+
+def run_vectorized_backtest(bars_by_symbol: Dict[str, ColumnarBars],
+                            strategy,
+                            column_map: Dict[str, str],
+                            initial_equity: float,
+                            commission_per_share: float,
+                            commission_min_per_order: float,
+                            slippage_pct: float) -> BacktestResult:
+    """Array-form counterpart of the event-driven loop for screening runs.
+
+    Uses the same fill model as SimulatedBroker: a change in target position
+    at bar t becomes a market order filled at bar t+1's open, slipped against
+    the trade, with max(qty * per_share, min_per_order) commission. Cash
+    flows are accumulated in (timestamp, symbol order) sequence, the order the
+    event loop applies them, so both engines produce the same numbers.
+    """
+    symbols = list(bars_by_symbol.keys())
+    flow_ts: List[np.ndarray] = []
+    flow_sym: List[np.ndarray] = []
+    flow_val: List[np.ndarray] = []
+    fill_records = []
+    per_symbol = []
+
+    for k, symbol in enumerate(symbols):
+        bars = bars_by_symbol[symbol]
+        n = len(bars)
+        if n == 0:
+            continue
+        target = np.asarray(strategy.generate_target_positions(symbol, bars, column_map), dtype=np.float64)
+        if target.shape != (n,):
+            raise ValueError(f"generate_target_positions returned shape {target.shape} for {symbol}; expected ({n},).")
+        held = np.concatenate(([0.0], target[:-1]))  # shares held after the fills on each bar
+        delta = held[1:] - held[:-1]
+        fill_idx = np.flatnonzero(delta != 0) + 1
+        if fill_idx.size:
+            qty = np.abs(delta[fill_idx - 1])
+            is_buy = delta[fill_idx - 1] > 0
+            bar_open = np.asarray(bars.columns[column_map['open']], dtype=np.float64)[fill_idx]
+            price = np.where(is_buy, bar_open * (1 + slippage_pct), bar_open * (1 - slippage_pct))
+            commission = np.maximum(qty * commission_per_share, commission_min_per_order)
+            flows = np.where(is_buy, -(price * qty + commission), price * qty - commission)
+
+            flow_ts.append(bars.timestamps[fill_idx])
+            flow_sym.append(np.full(fill_idx.size, k))
+            flow_val.append(flows)
+            fill_records.append(pd.DataFrame({
+                'ts': bars.timestamps[fill_idx],
+                'k': k,
+                'symbol': symbol,
+                'direction': np.where(is_buy, 'BUY', 'SELL'),
+                'quantity': qty,
+                'fill_price': price,
+                'commission': commission,
+            }))
+        close = np.asarray(bars.columns[column_map['close']], dtype=np.float64)
+        per_symbol.append((symbol, np.asarray(bars.timestamps), held, close))
+
+    if not per_symbol:
+        return BacktestResult(pd.Series(dtype=float), fills_frame(), float(initial_equity), {}, float(initial_equity), 'vectorized')
+
+    timeline = np.unique(np.concatenate([ts for _, ts, _, _ in per_symbol]))
+
+    cash = np.full(timeline.size, float(initial_equity))
+    final_cash = float(initial_equity)
+    if flow_ts:
+        ts_all = np.concatenate(flow_ts)
+        order = np.lexsort((np.concatenate(flow_sym), ts_all))
+        ts_sorted = ts_all[order]
+        # np.cumsum adds strictly left to right, like `cash += flow` per fill.
+        running = np.cumsum(np.concatenate(([float(initial_equity)], np.concatenate(flow_val)[order])))
+        last_flow = np.searchsorted(ts_sorted, timeline, side='right')
+        cash = running[last_flow]
+        final_cash = float(running[-1])
+
+    holdings = np.zeros(timeline.size)
+    final_positions = {}
+    for symbol, ts, held, close in per_symbol:
+        idx = np.searchsorted(ts, timeline, side='right') - 1
+        seen = idx >= 0
+        value = np.zeros(timeline.size)
+        value[seen] = held[idx[seen]] * close[idx[seen]]
+        holdings = holdings + value
+        if held[-1] != 0:
+            final_positions[symbol] = float(held[-1])
+
+    index = pd.DatetimeIndex(timeline.view('datetime64[ns]')).tz_localize('UTC')
+    equity_curve = pd.Series(cash + holdings, index=index, name='equity')
+
+    fills = fills_frame()
+    if fill_records:
+        fills = pd.concat(fill_records, ignore_index=True).sort_values(['ts', 'k'], kind='stable')
+        fills.insert(0, 'datetime', pd.DatetimeIndex(fills['ts'].to_numpy().view('datetime64[ns]')).tz_localize('UTC'))
+        fills = fills.drop(columns=['ts', 'k']).reset_index(drop=True)
+
+    return BacktestResult(equity_curve, fills, final_cash, final_positions, float(initial_equity), 'vectorized')
@@ -1,5 +1,23 @@
 # src/cherry_algo_framework/data_mgt/__init__.py
-from .market_data_feed import MarketDataFeed
-from .data_handler import CSVDataHandler
+# Handlers are imported on first access, so using one does not import the others.
+_EXPORTS = {
+    "MarketDataFeed": "market_data_feed",
+    "CSVDataHandler": "data_handler",
+    "DirectoryDataHandler": "directory_data_handler",
+    "ArrayDataHandler": "array_data_handler",
+    "ColumnarBars": "columnar_bars",
+    "BarCache": "bar_cache",
+    "BarRingBuffer": "bar_history",
+    "ScreenerIndex": "screener_index",
+    "TickBarAggregator": "tick_data_handler",
+    "TickDataHandler": "tick_data_handler",
+}
 
-__all__ = ["MarketDataFeed", "CSVDataHandler"]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Dict, Generator, List, Optional, Union
+
+import pandas as pd
+
+from ..core.event import Event, MarketBarEventPool
+from .market_data_feed import MarketDataFeed
+from .columnar_bars import ColumnarBars, datetime_to_ns
+from ..utils.logging_setup import logger
+
+DEFAULT_COLUMN_MAP = {'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'volume': 'volume'}
+
+
+class ArrayDataHandler(MarketDataFeed):
+    """Replays bars that are already loaded as ColumnarBars.
+
+    Used where the arrays come from somewhere other than a CSV parse, e.g.
+    shared-memory views in sweep workers or date-range slices of a larger
+    load. Streaming is the same heap merge CSVDataHandler uses.
+    """
+
+    replay_mode = 'columnar'
+
+    def __init__(self, bars_by_symbol: Dict[str, ColumnarBars],
+                 column_map: Optional[Dict[str, str]] = None,
+                 event_pool: Optional[MarketBarEventPool] = None):
+        super().__init__()
+        self.event_pool = event_pool
+        self.columnar_data: Dict[str, ColumnarBars] = dict(bars_by_symbol)
+        self.symbol_list: List[str] = list(self.columnar_data.keys())
+        self.column_map: Dict[str, str] = dict(column_map or DEFAULT_COLUMN_MAP)
+
+    def stream_next(self) -> Generator[Event, None, None]:
+        yield from self._stream_columnar_bars(self.columnar_data, self.column_map, self.column_map.values())
+
+    def get_historical_data(self,
+                            symbols: List[str],
+                            start_date: Union[str, datetime],
+                            end_date: Union[str, datetime],
+                            timeframe: str = '1d') -> Dict[str, pd.DataFrame]:
+        start_ns, end_ns = datetime_to_ns(start_date), datetime_to_ns(end_date)
+        results = {}
+        for symbol in symbols:
+            bars = self.columnar_data.get(symbol.upper())
+            if bars is None:
+                logger.warning(f"No data loaded for symbol '{symbol.upper()}' to fulfill get_historical_data request.")
+                continue
+            lo, hi = bars.index_range(start_ns, end_ns)
+            results[symbol.upper()] = bars.to_frame(lo, hi, index_name='datetime')
+        return results
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from .columnar_bars import ColumnarBars
+from ..utils.logging_setup import logger
+
+CACHE_FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+
+def file_digest(path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BarCache:
+    """On-disk cache of normalised per-symbol bar columns.
+
+    Entries live under `<cache_dir>/<key>/`, one `.npy` file per column, and
+    are keyed by the source file's SHA-256 plus the loader options that shape
+    the result (symbols, date range, column names). Numeric columns are
+    memory-mapped read-only on load; text columns are loaded into memory.
+    The source frame's column dtypes are kept in the manifest
+    (`load_frame_dtypes`) so a DataFrame with the original dtypes can be
+    rebuilt from the stored columns.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+
+    def make_key(self, source_path: Union[str, Path], options: Dict[str, Any]) -> str:
+        payload = json.dumps({
+            'format_version': CACHE_FORMAT_VERSION,
+            'source_sha256': file_digest(source_path),
+            'options': options,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def load(self, key: str) -> Optional[Dict[str, ColumnarBars]]:
+        entry = self.entry_path(key)
+        manifest_path = entry / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+            if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+                return None
+            result = {}
+            for symbol, meta in manifest['symbols'].items():
+                symbol_dir = entry / meta['dir']
+                timestamps = np.load(symbol_dir / 'timestamps.npy', mmap_mode='r')
+                columns = {}
+                for col in meta['columns']:
+                    col_path = symbol_dir / col['file']
+                    if col['memmap']:
+                        columns[col['name']] = np.load(col_path, mmap_mode='r')
+                    else:
+                        columns[col['name']] = np.load(col_path, allow_pickle=True)
+                result[symbol] = ColumnarBars(timestamps, columns, meta['python_scalars'])
+            logger.info(f"Loaded {len(result)} symbol(s) from bar cache {entry}")
+            return result
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable bar cache entry {entry}: {e}")
+            return None
+
+    def load_frame_dtypes(self, key: str) -> Dict[str, Dict[str, str]]:
+        """Per symbol, the source frame's {column: dtype} recorded by `store` (empty when unknown)."""
+        try:
+            manifest = json.loads((self.entry_path(key) / MANIFEST_NAME).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        return {symbol: meta['frame_dtypes'] for symbol, meta in manifest.get('symbols', {}).items()
+                if meta.get('frame_dtypes')}
+
+    def store(self, key: str, bars_by_symbol: Dict[str, ColumnarBars], source: Optional[Union[str, Path]] = None,
+              frame_dtypes: Optional[Dict[str, Dict[str, str]]] = None) -> Path:
+        entry = self.entry_path(key)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write into a temporary sibling and rename, so readers never see a partial entry.
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.cache_dir))
+        try:
+            manifest: Dict[str, Any] = {
+                'format_version': CACHE_FORMAT_VERSION,
+                'source': str(source) if source is not None else None,
+                'symbols': {},
+            }
+            for n, (symbol, bars) in enumerate(bars_by_symbol.items()):
+                symbol_dir = tmp_dir / f"s{n:05d}"
+                symbol_dir.mkdir()
+                np.save(symbol_dir / 'timestamps.npy', np.asarray(bars.timestamps, dtype=np.int64))
+                columns_meta = []
+                for j, (name, arr) in enumerate(bars.columns.items()):
+                    memmap = arr.dtype != object
+                    file_name = f"c{j:03d}.npy"
+                    np.save(symbol_dir / file_name, arr, allow_pickle=not memmap)
+                    columns_meta.append({'name': name, 'file': file_name, 'dtype': str(arr.dtype), 'memmap': memmap})
+                manifest['symbols'][symbol] = {
+                    'dir': symbol_dir.name,
+                    'rows': len(bars),
+                    'python_scalars': bool(bars.python_scalars),
+                    'columns': columns_meta,
+                    'frame_dtypes': (frame_dtypes or {}).get(symbol),
+                }
+            (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(tmp_dir, entry)
+            logger.info(f"Wrote bar cache entry {entry}")
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return entry
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+import numpy as np
+
+from .columnar_bars import _EPOCH
+
+HISTORY_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+_FIELD_ROWS = {name: row for row, name in enumerate(HISTORY_FIELDS)}
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_ns(value: datetime) -> int:
+    # Microsecond resolution, like ns_to_datetime(); naive datetimes are UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND * 1000
+
+
+class BarRingBuffer:
+    """Fixed-capacity history of one symbol's bars, newest last.
+
+    Values live in a (fields, 2 * capacity) float64 block that is appended
+    to left to right; when the write position reaches the end, the newest
+    `capacity - 1` bars are moved back to the front. Every lookback of up to
+    `capacity` bars is therefore one contiguous slice, returned as a
+    read-only view with no copy, at an amortised cost of one write per
+    field per bar. Views are only valid until the next `append` (the move reuses
+    their memory); copy them to keep them. Missing values are stored as NaN.
+    """
+
+    __slots__ = ("capacity", "values", "timestamps", "_rows", "_pos", "_count")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("BarRingBuffer capacity must be at least 1.")
+        self.capacity = int(capacity)
+        self.values = np.full((len(HISTORY_FIELDS), 2 * self.capacity), np.nan)
+        self.timestamps = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._rows = tuple(self.values)  # per-field row views: scalar writes are cheaper than a column write
+        self._pos = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, ts_ns: int, open: Any, high: Any, low: Any, close: Any, volume: Any):
+        pos = self._pos
+        if pos == 2 * self.capacity:
+            keep = self.capacity - 1
+            self.values[:, :keep] = self.values[:, pos - keep:pos]
+            self.timestamps[:keep] = self.timestamps[pos - keep:pos]
+            pos = keep
+        o, h, l, c, v = self._rows
+        o[pos] = open
+        h[pos] = high
+        l[pos] = low
+        c[pos] = close
+        v[pos] = volume
+        self.timestamps[pos] = ts_ns
+        self._pos = pos + 1
+        if self._count < self.capacity:
+            self._count += 1
+
+    def latest(self, n: Optional[int] = None, field: str = 'close') -> np.ndarray:
+        """The last `n` (default: all held) values of `field`, oldest first."""
+        n = self._count if n is None else min(int(n), self._count)
+        if field == 'datetime':
+            view = self.timestamps[self._pos - n:self._pos]
+        else:
+            row = _FIELD_ROWS.get(field)
+            if row is None:
+                raise KeyError(f"Bar history does not track '{field}'. Tracked: {('datetime',) + HISTORY_FIELDS}.")
+            view = self.values[row, self._pos - n:self._pos]
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,107 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def ns_to_datetime(ts_ns: int) -> datetime:
+    # Same truncation to microseconds as pd.Timestamp.to_pydatetime()
+    return _EPOCH + timedelta(microseconds=int(ts_ns) // 1000)
+
+
+def datetime_to_ns(value) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return int(ts.tz_convert('UTC').value)
+
+
+class ColumnarBars:
+    """Contiguous per-column arrays for one symbol's bars.
+
+    `timestamps` holds UTC epoch nanoseconds (int64). For an all-numeric frame
+    every column is stored in the frame's common dtype (float64 for OHLCV), so
+    `columns[name][i]` is exactly the scalar `df.iterrows()` would produce.
+    When the frame has a text column, iterrows() yields plain Python scalars;
+    the columns then keep their native dtypes and `python_scalars` is set so
+    readers convert with `ndarray.item`.
+    """
+
+    __slots__ = ("timestamps", "columns", "column_names", "python_scalars")
+
+    def __init__(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray], python_scalars: bool = False):
+        self.timestamps: np.ndarray = timestamps
+        self.columns: Dict[str, np.ndarray] = columns
+        self.column_names: List[str] = list(columns.keys())
+        self.python_scalars: bool = python_scalars
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, drop: Iterable[str] = ()) -> "ColumnarBars":
+        # `drop` removes columns from storage (e.g. a per-symbol constant symbol
+        # column) without changing the scalar types the remaining columns emit.
+        index = df.index
+        if not isinstance(index, pd.DatetimeIndex):
+            raise TypeError("ColumnarBars.from_frame expects a DatetimeIndex.")
+        timestamps = np.ascontiguousarray(index.as_unit('ns').asi8, dtype=np.int64)
+        row_dtype = df.iloc[:1].to_numpy().dtype  # the dtype iterrows() rows get
+        python_scalars = row_dtype == object
+        dropped = set(drop)
+        columns = {}
+        for col in df.columns:
+            if col in dropped:
+                continue
+            values = df[col].to_numpy() if python_scalars else df[col].to_numpy(dtype=row_dtype)
+            columns[col] = np.ascontiguousarray(values)
+        return cls(timestamps, columns, python_scalars)
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    def digest(self, stop: Optional[int] = None) -> str:
+        """Content hash of the first `stop` bars (all by default): timestamps, column names and values."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(b'py' if self.python_scalars else b'np')
+        digest.update(np.ascontiguousarray(self.timestamps[:stop], dtype=np.int64).tobytes())
+        for name in sorted(self.columns):
+            column = self.columns[name][:stop]
+            digest.update(f"{name}:{column.dtype}".encode())
+            if column.dtype == object:
+                digest.update(repr(column.tolist()).encode())
+            else:
+                digest.update(np.ascontiguousarray(column).tobytes())
+        return digest.hexdigest()
+
+    def get_column(self, name: str) -> Optional[np.ndarray]:
+        return self.columns.get(name)
+
+    def _getter(self, arr: Optional[np.ndarray]) -> Optional[Callable[[int], Any]]:
+        if arr is None:
+            return None
+        return arr.item if self.python_scalars else arr.__getitem__
+
+    def event_layout(self, column_map: Dict[str, str], excluded: Iterable[str]) -> Tuple[List[Tuple[str, Any]], List[Tuple[str, Any]]]:
+        # (event key, per-index getter) pairs for the OHLCV fields and the pass-through extras
+        excluded = set(excluded)
+        ohlcv = [(key, self._getter(self.columns.get(col))) for key, col in column_map.items()]
+        extras = [(col, self._getter(arr)) for col, arr in self.columns.items() if col not in excluded]
+        return ohlcv, extras
+
+    def index_range(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Tuple[int, int]:
+        # Binary search for the inclusive [start_ns, end_ns] window
+        lo = 0 if start_ns is None else int(np.searchsorted(self.timestamps, start_ns, side='left'))
+        hi = len(self) if end_ns is None else int(np.searchsorted(self.timestamps, end_ns, side='right'))
+        return lo, max(lo, hi)
+
+    def slice(self, start: int, stop: int) -> "ColumnarBars":
+        # Views, not copies; memory-mapped columns stay memory-mapped.
+        return ColumnarBars(self.timestamps[start:stop],
+                            {name: col[start:stop] for name, col in self.columns.items()},
+                            self.python_scalars)
+
+    def to_frame(self, start: int = 0, stop: Optional[int] = None, index_name: Optional[str] = None) -> pd.DataFrame:
+        index = pd.DatetimeIndex(self.timestamps[start:stop].view('datetime64[ns]'), name=index_name).tz_localize('UTC')
+        return pd.DataFrame({name: col[start:stop] for name, col in self.columns.items()}, index=index, copy=False)
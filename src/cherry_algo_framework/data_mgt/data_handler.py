@@ -1,14 +1,22 @@
 from datetime import datetime, timezone
 from typing import Generator, Dict, Any, List, Union, Optional
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-from ..core.event import Event, EventType
+from ..core.event import Event, EventType, MarketBarEventPool
 from .market_data_feed import MarketDataFeed
+from .columnar_bars import ColumnarBars, datetime_to_ns
+from .bar_cache import BarCache
 from ..utils.config_loader import app_config
 from ..utils.logging_setup import logger  
+from ..utils.telemetry import telemetry
 
 class CSVDataHandler(MarketDataFeed):
+    # 'columnar' replays from per-symbol NumPy columns built once at load time;
+    # 'iterrows' is the original row-by-row pandas path, kept for comparison.
+    REPLAY_MODES = ('columnar', 'iterrows')
+
     def __init__(self, csv_file_path: Union[str, Path], 
                  symbol_list: List[str], 
                  start_date: Optional[Union[str, datetime]] = None,
@@ -20,13 +28,24 @@ class CSVDataHandler(MarketDataFeed):
                  high_col: str = 'high', 
                  low_col: str = 'low', 
                  close_col: str = 'close', 
-                 volume_col: str = 'volume'):
+                 volume_col: str = 'volume',
+                 replay_mode: str = 'columnar',
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 event_pool: Optional[MarketBarEventPool] = None):
         
         super().__init__()
+        self.event_pool = event_pool
+        if replay_mode not in self.REPLAY_MODES:
+            raise ValueError(f"Unknown replay_mode '{replay_mode}'. Expected one of {self.REPLAY_MODES}.")
+        self.replay_mode = replay_mode
         self.csv_file_path = Path(csv_file_path)
         self.symbol_list = [s.upper() for s in symbol_list]  
         self.data_frames: Dict[str, pd.DataFrame] = {}
         self.data_iterators: Dict[str, Generator[pd.Series, None, None]] = {}
+        self.columnar_data: Dict[str, ColumnarBars] = {}
+        # Source frame {column: dtype} per symbol, to rebuild frames from columnar data alone.
+        self.frame_dtypes: Dict[str, Dict[str, str]] = {}
+        self.bar_cache: Optional[BarCache] = BarCache(cache_dir) if cache_dir else None
         
         self.timeframe_column = timeframe_column
         self.symbol_column = symbol_column
@@ -50,13 +69,26 @@ class CSVDataHandler(MarketDataFeed):
             self.end_dt = pd.to_datetime(end_date, utc=True).to_pydatetime() if not isinstance(end_date, datetime) else end_date
             if self.end_dt.tzinfo is None: self.end_dt = self.end_dt.replace(tzinfo=timezone.utc)
 
-        self._load_and_prepare_data()
+        with telemetry.timer('data.load'):
+            self._load_and_prepare_data()
+        telemetry.count('data.bars', sum(len(bars) for bars in self.columnar_data.values()))
 
     def _load_and_prepare_data(self):
         if not self.csv_file_path.exists():
             logger.error(f"CSV file not found: {self.csv_file_path}")
             raise FileNotFoundError(f"CSV file not found: {self.csv_file_path}")
 
+        cache_key = None
+        if self.bar_cache is not None:
+            cache_key = self.bar_cache.make_key(self.csv_file_path, self._cache_options())
+            cached = self.bar_cache.load(cache_key)
+            telemetry.count('data.cache_hits' if cached is not None else 'data.cache_misses')
+            if cached is not None:
+                self.frame_dtypes = self.bar_cache.load_frame_dtypes(cache_key)
+                for symbol, bars in cached.items():
+                    self._register_symbol_bars(symbol, bars)
+                return
+
         try:
             full_df = pd.read_csv(self.csv_file_path, header=0, parse_dates=[self.timeframe_column])
             
@@ -82,16 +114,14 @@ class CSVDataHandler(MarketDataFeed):
                 for symbol in self.symbol_list:
                     symbol_df = full_df[full_df[self.symbol_column] == symbol].copy()
                     if not symbol_df.empty:
-                        self.data_frames[symbol] = symbol_df
-                        self.data_iterators[symbol] = self._dataframe_to_generator(symbol_df)
+                        self._register_symbol_frame(symbol, symbol_df)
                     else:
                         logger.warning(f"No data found for symbol '{symbol}' in {self.csv_file_path}")
             else:  
                 if not self.symbol_list:
                     raise ValueError("Symbol list cannot be empty for single-symbol CSV.")
                 symbol = self.symbol_list[0] 
-                self.data_frames[symbol] = full_df.copy()
-                self.data_iterators[symbol] = self._dataframe_to_generator(full_df)
+                self._register_symbol_frame(symbol, full_df.copy())
                 if len(self.symbol_list) > 1:
                     logger.warning(f"CSV '{self.csv_file_path}' treated as single-symbol data for '{symbol}'. Other symbols in list ignored for this file.")
 
@@ -99,11 +129,59 @@ class CSVDataHandler(MarketDataFeed):
             logger.exception(f"Error loading or processing CSV file {self.csv_file_path}: {e}")
             raise
 
+        if cache_key is not None:
+            try:
+                self.bar_cache.store(cache_key, self.columnar_data, source=self.csv_file_path,
+                                     frame_dtypes=self.frame_dtypes)
+            except OSError as e:
+                logger.warning(f"Could not write bar cache for {self.csv_file_path}: {e}")
+
+    def _cache_options(self) -> Dict[str, Any]:
+        return {
+            'symbols': self.symbol_list,
+            'symbol_column': self.symbol_column,
+            'timeframe_column': self.timeframe_column,
+            'start': self.start_dt.isoformat() if self.start_dt else None,
+            'end': self.end_dt.isoformat() if self.end_dt else None,
+        }
+
+    def _register_symbol_frame(self, symbol: str, df: pd.DataFrame):
+        self.data_frames[symbol] = df
+        self.frame_dtypes[symbol] = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        if self.replay_mode == 'columnar' or self.bar_cache is not None:
+            # The symbol column is constant per symbol and never part of the event payload.
+            drop = [self.symbol_column] if self.symbol_column else []
+            self.columnar_data[symbol] = ColumnarBars.from_frame(df, drop=drop)
+        if self.replay_mode == 'iterrows':
+            self.data_iterators[symbol] = self._dataframe_to_generator(df)
+
+    def _register_symbol_bars(self, symbol: str, bars: ColumnarBars):
+        self.columnar_data[symbol] = bars
+        if self.replay_mode == 'iterrows':
+            df = self._frame_from_bars(symbol, bars)
+            self.data_frames[symbol] = df
+            self.data_iterators[symbol] = self._dataframe_to_generator(df)
+
+    def _frame_from_bars(self, symbol: str, bars: ColumnarBars) -> pd.DataFrame:
+        # Columnar storage may widen dtypes (e.g. int volume to float64) and drops the
+        # symbol column; restore both from the recorded source dtypes. Columns are
+        # copied into memory rather than left as views of a memory-mapped cache entry.
+        index = bars.to_frame(index_name=self.timeframe_column).index
+        df = pd.DataFrame({name: np.array(col) for name, col in bars.columns.items()}, index=index)
+        if self.symbol_column:
+            df[self.symbol_column] = symbol
+        dtypes = self.frame_dtypes.get(symbol)
+        return df[list(dtypes)].astype(dtypes) if dtypes else df
+
     def _dataframe_to_generator(self, df: pd.DataFrame) -> Generator[pd.Series, None, None]:
         for timestamp, row in df.iterrows():
             yield row  
 
     def stream_next(self) -> Generator[Event, None, None]:
+        if self.replay_mode == 'columnar':
+            yield from self._stream_columnar()
+            return
+
         active_symbols = list(self.data_iterators.keys())
         
         current_bars: Dict[str, Optional[pd.Series]] = {symbol: None for symbol in active_symbols}
@@ -174,6 +252,12 @@ class CSVDataHandler(MarketDataFeed):
         self.continue_backtest = False  
         logger.info("Market data stream finished for all symbols.")
 
+    def _stream_columnar(self) -> Generator[Event, None, None]:
+        excluded = set(self.column_map.values())
+        if self.symbol_column:
+            excluded.add(self.symbol_column)
+        yield from self._stream_columnar_bars(self.columnar_data, self.column_map, excluded)
+
     def get_historical_data(self, 
                               symbols: List[str], 
                               start_date: Union[str, datetime], 
@@ -189,9 +273,32 @@ class CSVDataHandler(MarketDataFeed):
 
         for symbol in symbols:
             symbol_upper = symbol.upper()
+            # For zero-copy column views use get_historical_bars().
             if symbol_upper in self.data_frames:
                 df_slice = self.data_frames[symbol_upper].loc[_start_dt:_end_dt]
                 results[symbol_upper] = df_slice
+            elif symbol_upper in self.columnar_data:
+                # Bar-cache loads keep no DataFrame: rebuild one with the source columns and dtypes.
+                bars = self.columnar_data[symbol_upper]
+                lo, hi = bars.index_range(datetime_to_ns(_start_dt), datetime_to_ns(_end_dt))
+                results[symbol_upper] = self._frame_from_bars(symbol_upper, bars.slice(lo, hi))
             else:
                 logger.warning(f"No historical data loaded for symbol '{symbol_upper}' to fulfill get_historical_data request.")
         return results
+
+    def get_historical_bars(self,
+                            symbols: List[str],
+                            start_date: Optional[Union[str, datetime]] = None,
+                            end_date: Optional[Union[str, datetime]] = None) -> Dict[str, ColumnarBars]:
+        # Zero-copy column views over the inclusive date range, located by binary search.
+        start_ns = datetime_to_ns(start_date) if start_date is not None else None
+        end_ns = datetime_to_ns(end_date) if end_date is not None else None
+        results = {}
+        for symbol in symbols:
+            symbol_upper = symbol.upper()
+            bars = self.columnar_data.get(symbol_upper)
+            if bars is None:
+                logger.warning(f"No columnar data loaded for symbol '{symbol_upper}' to fulfill get_historical_bars request.")
+                continue
+            results[symbol_upper] = bars.slice(*bars.index_range(start_ns, end_ns))
+        return results
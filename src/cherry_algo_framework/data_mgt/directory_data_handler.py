@@ -0,0 +1,223 @@
+import heapq
+import io
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Generator, Dict, Any, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from ..core.event import Event, MarketBarEventPool
+from .market_data_feed import MarketDataFeed
+from .columnar_bars import ColumnarBars, ns_to_datetime
+from ..utils.logging_setup import logger
+
+
+class _SymbolFileCursor:
+    """Reads one per-symbol CSV forward in fixed-size chunks.
+
+    The file is only opened while a chunk is being read; between chunks the
+    cursor keeps a byte offset, so a universe of thousands of symbols never
+    holds thousands of file handles. At most one parsed chunk is alive.
+    """
+
+    def __init__(self, symbol: str, path: Path, handler: "DirectoryDataHandler"):
+        self.symbol = symbol
+        self.path = path
+        self.handler = handler
+        self.header: Optional[bytes] = None
+        self.offset: int = 0
+        self.exhausted: bool = False
+        self.last_timestamp: Optional[int] = None
+
+        self.bars: Optional[ColumnarBars] = None
+        self.position: int = 0
+        self.layout: Any = None
+
+    def _read_raw_chunk(self) -> Optional[bytes]:
+        lines: List[bytes] = []
+        with open(self.path, 'rb') as f:
+            if self.header is None:
+                self.header = f.readline()
+                self.offset = f.tell()
+            f.seek(self.offset)
+            for _ in range(self.handler.chunk_size):
+                line = f.readline()
+                if not line:
+                    self.exhausted = True
+                    break
+                if line.strip():
+                    lines.append(line)
+            self.offset = f.tell()
+        if not lines:
+            return None
+        return self.header + b''.join(lines)
+
+    def load_next_chunk(self) -> bool:
+        # Skips chunks that are empty after date filtering; False once the file is done.
+        while not self.exhausted:
+            raw = self._read_raw_chunk()
+            if raw is None:
+                continue
+            chunk = self.handler._prepare_chunk(pd.read_csv(io.BytesIO(raw), header=0), self.path)
+            if chunk.empty:
+                continue
+            bars = ColumnarBars.from_frame(chunk)
+            if self.last_timestamp is not None and int(bars.timestamps[0]) < self.last_timestamp:
+                raise ValueError(f"File {self.path} is not sorted by '{self.handler.timeframe_column}' across chunks.")
+            self.last_timestamp = int(bars.timestamps[-1])
+            self.bars = bars
+            self.position = 0
+            self.layout = bars.event_layout(self.handler.column_map, self.handler.excluded_columns)
+            return True
+        self.bars = None
+        self.layout = None
+        return False
+
+
+class DirectoryDataHandler(MarketDataFeed):
+    """Replays a directory of per-symbol CSV files (one file per ticker).
+
+    Files are opened lazily and read `chunk_size` rows at a time, and the
+    symbols are merged with a heap keyed on (timestamp, symbol). Memory is
+    bounded by one chunk per active symbol, not by the total history. Each
+    file must already be sorted by time.
+    """
+
+    def __init__(self, data_dir: Union[str, Path],
+                 symbol_list: Optional[List[str]] = None,
+                 start_date: Optional[Union[str, datetime]] = None,
+                 end_date: Optional[Union[str, datetime]] = None,
+                 file_pattern: str = '*.csv',
+                 chunk_size: int = 50_000,
+                 timeframe_column: str = 'datetime',
+                 open_col: str = 'open',
+                 high_col: str = 'high',
+                 low_col: str = 'low',
+                 close_col: str = 'close',
+                 volume_col: str = 'volume',
+                 event_pool: Optional[MarketBarEventPool] = None):
+
+        super().__init__()
+        self.event_pool = event_pool
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive number of rows.")
+        self.data_dir = Path(data_dir)
+        self.file_pattern = file_pattern
+        self.chunk_size = chunk_size
+        self.timeframe_column = timeframe_column
+
+        self.column_map = {
+            'open': open_col,
+            'high': high_col,
+            'low': low_col,
+            'close': close_col,
+            'volume': volume_col
+        }
+        self.excluded_columns = set(self.column_map.values())
+
+        self.start_dt: Optional[datetime] = None
+        if start_date:
+            self.start_dt = pd.to_datetime(start_date, utc=True).to_pydatetime() if not isinstance(start_date, datetime) else start_date
+            if self.start_dt.tzinfo is None: self.start_dt = self.start_dt.replace(tzinfo=timezone.utc)
+
+        self.end_dt: Optional[datetime] = None
+        if end_date:
+            self.end_dt = pd.to_datetime(end_date, utc=True).to_pydatetime() if not isinstance(end_date, datetime) else end_date
+            if self.end_dt.tzinfo is None: self.end_dt = self.end_dt.replace(tzinfo=timezone.utc)
+
+        self.symbol_files: Dict[str, Path] = self._discover_files(symbol_list)
+        self.symbol_list = list(self.symbol_files.keys())
+
+    def _discover_files(self, symbol_list: Optional[List[str]]) -> Dict[str, Path]:
+        if not self.data_dir.is_dir():
+            logger.error(f"Data directory not found: {self.data_dir}")
+            raise FileNotFoundError(f"Data directory not found: {self.data_dir}")
+
+        available = {path.stem.upper(): path for path in sorted(self.data_dir.glob(self.file_pattern)) if path.is_file()}
+        if symbol_list is None:
+            return available
+
+        files = {}
+        for symbol in (s.upper() for s in symbol_list):
+            if symbol in available:
+                files[symbol] = available[symbol]
+            else:
+                logger.warning(f"No data file found for symbol '{symbol}' in {self.data_dir}")
+        return files
+
+    def _prepare_chunk(self, df: pd.DataFrame, path: Path) -> pd.DataFrame:
+        if self.timeframe_column not in df.columns:
+            raise ValueError(f"Timestamp column '{self.timeframe_column}' not found in {path}.")
+        ts = pd.to_datetime(df[self.timeframe_column], errors='coerce', utc=True)
+        df = df.drop(columns=[self.timeframe_column])
+        df.index = pd.DatetimeIndex(ts, name=self.timeframe_column)
+        df = df[df.index.notna()]
+        df = df.sort_index(kind='stable')
+
+        if self.start_dt:
+            df = df[df.index >= self.start_dt]
+        if self.end_dt:
+            df = df[df.index <= self.end_dt]
+        return df
+
+    def stream_next(self) -> Generator[Event, None, None]:
+        # Ties on timestamp are broken by symbol so replays are deterministic
+        # regardless of directory listing order.
+        heap: List[Tuple[int, str, _SymbolFileCursor]] = []
+        for symbol, path in self.symbol_files.items():
+            cursor = _SymbolFileCursor(symbol, path, self)
+            if cursor.load_next_chunk():
+                heap.append((int(cursor.bars.timestamps[0]), symbol, cursor))
+            else:
+                logger.info(f"Data stream ended for symbol {symbol}.")
+        heapq.heapify(heap)
+
+        while self.continue_backtest and heap:
+            ts_ns, symbol, cursor = heap[0]
+            i = cursor.position
+            ohlcv_columns, extra_columns = cursor.layout
+
+            yield self._publish_bar(
+                symbol, ns_to_datetime(ts_ns),
+                *[(get(i) if get is not None else None) for _, get in ohlcv_columns],
+                extras={col: get(i) for col, get in extra_columns} if extra_columns else None,
+                ts_ns=ts_ns
+            )
+
+            i += 1
+            if i >= len(cursor.bars):
+                if not cursor.load_next_chunk():
+                    heapq.heappop(heap)
+                    logger.info(f"Data stream completed for symbol {symbol}.")
+                    continue
+                i = 0
+            cursor.position = i
+            heapq.heapreplace(heap, (int(cursor.bars.timestamps[i]), symbol, cursor))
+
+        self.continue_backtest = False
+        logger.info("Market data stream finished for all symbols.")
+
+    def get_historical_data(self,
+                            symbols: List[str],
+                            start_date: Union[str, datetime],
+                            end_date: Union[str, datetime],
+                            timeframe: str = '1d') -> Dict[str, pd.DataFrame]:
+
+        results = {}
+        _start_dt = pd.to_datetime(start_date, utc=True)
+        _end_dt = pd.to_datetime(end_date, utc=True)
+
+        for symbol in symbols:
+            symbol_upper = symbol.upper()
+            path = self.symbol_files.get(symbol_upper)
+            if path is None:
+                logger.warning(f"No data file for symbol '{symbol_upper}' to fulfill get_historical_data request.")
+                continue
+            parts = []
+            for chunk in pd.read_csv(path, header=0, chunksize=self.chunk_size):
+                chunk = self._prepare_chunk(chunk, path)
+                chunk = chunk[(chunk.index >= _start_dt) & (chunk.index <= _end_dt)]
+                if not chunk.empty:
+                    parts.append(chunk)
+            results[symbol_upper] = pd.concat(parts) if parts else pd.DataFrame()
+        return results
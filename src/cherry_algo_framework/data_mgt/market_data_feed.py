@@ -1,14 +1,34 @@
+import heapq
 from abc import ABC, abstractmethod
-from typing import Generator, Dict, Any, Optional, Union, List, Tuple
+from typing import Generator, Dict, Any, Iterable, Optional, Union, List, Tuple, TYPE_CHECKING
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
-from ..core.event import Event, EventType
+from ..core.event import Event, EventType, MarketBarEvent, MarketBarEventPool
+from .bar_history import BarRingBuffer, _to_ns
+from .columnar_bars import ns_to_datetime
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import logger
+
+if TYPE_CHECKING:
+    from .columnar_bars import ColumnarBars
 
 class MarketDataFeed(ABC):
+    # Feeds that hold every bar as ColumnarBars in `columnar_data` set this to
+    # 'columnar'; the rest are streamed a row at a time.
+    replay_mode = 'rows'
+
     def __init__(self):
-        self.latest_symbol_data: Dict[str, Dict[str, Any]] = {}
+        self.latest_symbol_data: Dict[str, Union[Dict[str, Any], MarketBarEvent]] = {}
         self.continue_backtest: bool = True
+        self.event_pool: Optional[MarketBarEventPool] = None
+        self._latest_bar_holders: Dict[str, MarketBarEvent] = {}
+        # Per-symbol OHLCV lookback, filled as bars are published (0 disables it).
+        self.history_capacity: int = app_config.snapshot().history_bars
+        self.bar_history: Dict[str, BarRingBuffer] = {}
+        # Inclusive (start_ns, end_ns) bounds for columnar replays; None means open-ended.
+        self.replay_window: Optional[Tuple[Optional[int], Optional[int]]] = None
 
     @abstractmethod
     def stream_next(self) -> Generator[Event, None, None]:
@@ -33,11 +53,105 @@ class MarketDataFeed(ABC):
     
     def get_latest_bar_all_values(self, symbol: str) -> Optional[Dict[str, Any]]:
         if symbol in self.latest_symbol_data:
-            return self.latest_symbol_data[symbol]
+            return self._as_dict(self.latest_symbol_data[symbol])
         return None
 
-    def update_latest_symbol_data(self, symbol: str, data_row: Dict[str, Any]):
+    def update_latest_symbol_data(self, symbol: str, data_row: Union[Dict[str, Any], MarketBarEvent],
+                                  ts_ns: Optional[int] = None):
+        if self.event_pool is not None and isinstance(data_row, MarketBarEvent):
+            # Pooled events get recycled, so keep a private per-symbol copy.
+            holder = self._latest_bar_holders.get(symbol)
+            if holder is None:
+                holder = self._latest_bar_holders[symbol] = MarketBarEvent(symbol, data_row.datetime)
+            holder.copy_from(data_row)
+            data_row = holder
         self.latest_symbol_data[symbol] = data_row
+        if self.history_capacity:
+            history = self.bar_history.get(symbol)
+            if history is None:
+                history = self.bar_history[symbol] = BarRingBuffer(self.history_capacity)
+            if isinstance(data_row, MarketBarEvent):
+                history.append(_to_ns(data_row.datetime) if ts_ns is None else ts_ns, data_row.open, data_row.high, data_row.low,
+                               data_row.close, data_row.volume)
+            else:
+                history.append(_to_ns(data_row['datetime']), data_row.get('open'), data_row.get('high'),
+                               data_row.get('low'), data_row.get('close'), data_row.get('volume'))
+
+    def get_latest_bars(self, symbol: str, n: Optional[int] = None, field: str = 'close') -> np.ndarray:
+        """The last `n` values of `field` for `symbol`, oldest first, as a read-only view.
+
+        Only bars the feed has already published are included, so the window
+        ends at the current bar and can never look ahead. Fewer than `n`
+        values come back until `n` bars have been seen. `field` is one of
+        open/high/low/close/volume, or 'datetime' for epoch nanoseconds. The
+        view is overwritten by later bars of the symbol; copy it to keep it.
+        """
+        if n is not None and n > self.history_capacity:
+            raise ValueError(f"Requested {n} bars but the feed keeps {self.history_capacity} "
+                             "(MarketData.HISTORY_BARS).")
+        history = self.bar_history.get(symbol)
+        if history is None:
+            return np.empty(0, dtype=np.int64 if field == 'datetime' else np.float64)
+        return history.latest(n, field)
+
+    def _publish_bar(self, symbol: str, bar_datetime: datetime,
+                     open: Any, high: Any, low: Any, close: Any, volume: Any,
+                     extras: Optional[Dict[str, Any]] = None, ts_ns: Optional[int] = None) -> MarketBarEvent:
+        if self.event_pool is not None:
+            event = self.event_pool.acquire(symbol, bar_datetime, open, high, low, close, volume, extras)
+        else:
+            event = MarketBarEvent(symbol, bar_datetime, open, high, low, close, volume, extras)
+        self.update_latest_symbol_data(symbol, event, ts_ns)
+        return event
+
+    def _stream_columnar_bars(self, bars_by_symbol: Dict[str, "ColumnarBars"],
+                              column_map: Dict[str, str],
+                              excluded: Iterable[str]) -> Generator[Event, None, None]:
+        # Heap entries are (timestamp_ns, load_order). Ties resolve in load order,
+        # exactly as the iterrows path's min() over its symbol dict does.
+        if self.replay_window is not None:
+            bars_by_symbol = {symbol: bars.slice(*bars.index_range(*self.replay_window))
+                              for symbol, bars in bars_by_symbol.items()}
+        symbols: List[str] = []
+        layouts: List[Any] = []
+        heap: List[Tuple[int, int]] = []
+        for symbol, bars in bars_by_symbol.items():
+            if len(bars) == 0:
+                logger.info(f"Data stream ended for symbol {symbol}.")
+                continue
+            heap.append((int(bars.timestamps[0]), len(symbols)))
+            symbols.append(symbol)
+            layouts.append((bars.timestamps, len(bars)) + bars.event_layout(column_map, excluded))
+        heapq.heapify(heap)
+        cursors = [0] * len(symbols)
+
+        while self.continue_backtest and heap:
+            ts_ns, k = heap[0]
+            i = cursors[k]
+            symbol = symbols[k]
+            timestamps, length, ohlcv_columns, extra_columns = layouts[k]
+
+            yield self._publish_bar(
+                symbol, ns_to_datetime(ts_ns),
+                *[(get(i) if get is not None else None) for _, get in ohlcv_columns],
+                extras={col: get(i) for col, get in extra_columns} if extra_columns else None,
+                ts_ns=ts_ns
+            )
+
+            i += 1
+            if i < length:
+                cursors[k] = i
+                heapq.heapreplace(heap, (int(timestamps[i]), k))
+            else:
+                heapq.heappop(heap)
+                logger.info(f"Data stream completed for symbol {symbol}.")
+
+        self.continue_backtest = False
+        logger.info("Market data stream finished for all symbols.")
+
+    @staticmethod
+    def _as_dict(bar: Union[Dict[str, Any], MarketBarEvent]) -> Dict[str, Any]:
+        return bar.data if isinstance(bar, MarketBarEvent) else bar
 
     def stop_feed(self):
         self.continue_backtest = False
@@ -55,5 +169,5 @@ class MarketDataFeed(ABC):
         snapshot = {}
         for sym in symbols:
             if sym in self.latest_symbol_data:
-                snapshot[sym] = self.latest_symbol_data[sym]
+                snapshot[sym] = self._as_dict(self.latest_symbol_data[sym])
         return snapshot
@@ -0,0 +1,317 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .columnar_bars import ColumnarBars
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import logger
+
+INDEX_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+NS_PER_DAY = 86_400 * 1_000_000_000
+# Per-(day, symbol) columns, rows sorted by (day, symbol_id).
+FEATURE_COLUMNS = ('premarket_volume', 'premarket_last', 'session_close', 'prev_close',
+                   'gap_pct', 'relative_volume', 'float_shares')
+_SECTION = 'Screener'
+
+
+def _time_of_day_ns(value: Union[str, time]) -> int:
+    if isinstance(value, str):
+        value = time.fromisoformat(value)
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000_000
+
+
+def _day_number(day: Union[str, date, datetime, pd.Timestamp, int]) -> int:
+    # Days since the epoch (UTC); ints are taken as already converted.
+    if isinstance(day, (int, np.integer)):
+        return int(day)
+    return int(pd.Timestamp(day).value // NS_PER_DAY)
+
+
+class ScreenCriteria:
+    """Thresholds of the pre-market screen (VRPF: volume, relative volume, price, float, plus gap)."""
+
+    __slots__ = ("min_price", "max_price", "min_float", "max_float", "min_gap_pct",
+                 "min_relative_volume", "min_premarket_volume")
+
+    def __init__(self, min_price: float = 1.0, max_price: float = 30.0,
+                 min_float: float = 1_000_000, max_float: float = 10_000_000,
+                 min_gap_pct: float = 0.05, min_relative_volume: float = 2.0,
+                 min_premarket_volume: float = 1_000_000):
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_float = min_float
+        self.max_float = max_float
+        self.min_gap_pct = min_gap_pct
+        self.min_relative_volume = min_relative_volume
+        self.min_premarket_volume = min_premarket_volume
+
+    @classmethod
+    def from_config(cls) -> "ScreenCriteria":
+        defaults = cls()
+        return cls(**{name: app_config.getfloat(_SECTION, name.upper(), getattr(defaults, name))
+                      for name in cls.__slots__})
+
+
+def load_float_shares(path: Union[str, Path], symbol_column: str = 'symbol',
+                      float_column: str = 'float_shares') -> Dict[str, float]:
+    """Symbol -> float from a fundamentals CSV (the last row wins for repeated symbols)."""
+    path = Path(path)
+    if not path.exists() or path.stat().st_size <= 1:
+        logger.warning(f"No fundamentals in {path}; float criteria will exclude every symbol.")
+        return {}
+    df = pd.read_csv(path)
+    missing = {symbol_column, float_column} - set(df.columns)
+    if missing:
+        raise ValueError(f"Fundamentals file {path} lacks column(s) {sorted(missing)}.")
+    return dict(zip(df[symbol_column].astype(str).str.upper(), df[float_column].astype(float)))
+
+
+class ScreenerIndex:
+    """Persisted per-(date, symbol) pre-market feature table for daily universe selection.
+
+    `update()` reduces each symbol's intraday bars to one row per UTC day:
+    pre-market volume and last price over [PREMARKET_START_UTC,
+    PREMARKET_END_UTC), the regular-session close up to SESSION_END_UTC, the
+    gap of the last pre-market price over the prior session's close, and
+    relative volume against the mean pre-market volume of the previous
+    RELATIVE_VOLUME_LOOKBACK_DAYS days. Float comes from the fundamentals
+    as known at update time. An update re-aggregates a symbol's last indexed
+    day, which may have been indexed part-way through, and adds the days
+    after it, using the stored rows for the prior close and volume history,
+    so incremental updates produce the same rows as a full rebuild.
+
+    Rows are sorted by day, so `candidates(day)` is two binary searches and
+    a vectorised mask over that day's rows.
+    """
+
+    def __init__(self, index_dir: Optional[Union[str, Path]] = None,
+                 premarket_start: Optional[str] = None, premarket_end: Optional[str] = None,
+                 session_end: Optional[str] = None, lookback_days: Optional[int] = None):
+        self.index_dir = Path(index_dir or app_config.get(_SECTION, 'INDEX_DIR', '.cache/screener_index/'))
+        self.params = {
+            'premarket_start': premarket_start or app_config.get(_SECTION, 'PREMARKET_START_UTC', '09:00'),
+            'premarket_end': premarket_end or app_config.get(_SECTION, 'PREMARKET_END_UTC', '14:30'),
+            'session_end': session_end or app_config.get(_SECTION, 'SESSION_END_UTC', '21:00'),
+            'lookback_days': int(lookback_days or app_config.getint(_SECTION, 'RELATIVE_VOLUME_LOOKBACK_DAYS', 20)),
+        }
+        self.symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self.last_day: Dict[str, int] = {}
+        self.day = np.empty(0, dtype=np.int64)
+        self.symbol_id = np.empty(0, dtype=np.int32)
+        self.columns: Dict[str, np.ndarray] = {name: np.empty(0) for name in FEATURE_COLUMNS}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    # ------------------------------------------------------------ persistence
+    def _load(self):
+        manifest_path = self.index_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+            if manifest.get('format_version') != INDEX_FORMAT_VERSION or manifest.get('params') != self.params:
+                logger.warning(f"Screener index {self.index_dir} was built with other settings; rebuilding from scratch.")
+                return
+            self.day = np.load(self.index_dir / 'day.npy', mmap_mode='r')
+            self.symbol_id = np.load(self.index_dir / 'symbol_id.npy', mmap_mode='r')
+            self.columns = {name: np.load(self.index_dir / f"{name}.npy", mmap_mode='r') for name in FEATURE_COLUMNS}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable screener index {self.index_dir}: {e}")
+            return
+        self.symbols = manifest['symbols']
+        self._symbol_ids = {s: i for i, s in enumerate(self.symbols)}
+        self.last_day = {s: int(d) for s, d in manifest['last_day'].items()}
+
+    def save(self) -> Path:
+        self.index_dir.parent.mkdir(parents=True, exist_ok=True)
+        # Write into a temporary sibling and rename, so readers never see a partial index.
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{self.index_dir.name}-", dir=self.index_dir.parent))
+        try:
+            np.save(tmp_dir / 'day.npy', np.asarray(self.day))
+            np.save(tmp_dir / 'symbol_id.npy', np.asarray(self.symbol_id))
+            for name, values in self.columns.items():
+                np.save(tmp_dir / f"{name}.npy", np.asarray(values))
+            manifest = {'format_version': INDEX_FORMAT_VERSION, 'params': self.params,
+                        'symbols': self.symbols, 'last_day': self.last_day, 'rows': len(self)}
+            (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+            if self.index_dir.exists():
+                shutil.rmtree(self.index_dir)
+            os.replace(tmp_dir, self.index_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        logger.info(f"Wrote screener index {self.index_dir} ({len(self)} rows, {len(self.symbols)} symbols)")
+        return self.index_dir
+
+    # --------------------------------------------------------------- building
+    def _daily_aggregates(self, bars: ColumnarBars, column_map: Dict[str, str], from_day: Optional[int]):
+        ts = np.asarray(bars.timestamps, dtype=np.int64)
+        close = np.asarray(bars.columns[column_map.get('close', 'close')], dtype=np.float64)
+        volume = np.asarray(bars.columns[column_map.get('volume', 'volume')], dtype=np.float64)
+        if from_day is not None:
+            keep = ts >= from_day * NS_PER_DAY
+            ts, close, volume = ts[keep], close[keep], volume[keep]
+        if not len(ts):
+            return None
+        day = ts // NS_PER_DAY
+        tod = ts - day * NS_PER_DAY
+        days, first = np.unique(day, return_index=True)
+        pre_start = _time_of_day_ns(self.params['premarket_start'])
+        pre_end = _time_of_day_ns(self.params['premarket_end'])
+        session_end = _time_of_day_ns(self.params['session_end'])
+        premarket = (tod >= pre_start) & (tod < pre_end)
+        regular = (tod >= pre_end) & (tod < session_end)
+        positions = np.arange(len(ts))
+        # Last bar of each day inside each window (-1 when the window had no bars).
+        last_pre = np.maximum.reduceat(np.where(premarket, positions, -1), first)
+        last_regular = np.maximum.reduceat(np.where(regular, positions, -1), first)
+        return (days,
+                np.add.reduceat(np.where(premarket, volume, 0.0), first),
+                np.where(last_pre >= 0, close[last_pre], np.nan),
+                np.where(last_regular >= 0, close[last_regular], np.nan))
+
+    def update(self, bars_by_symbol: Union[Mapping[str, ColumnarBars], Iterable[Tuple[str, ColumnarBars]]],
+               float_shares: Optional[Mapping[str, float]] = None,
+               column_map: Optional[Dict[str, str]] = None) -> int:
+        """Add rows for days not yet indexed; returns the number of rows added.
+
+        Each symbol's last indexed day is rebuilt from `bars`, so they should
+        cover that whole day, not only the bars since the previous update.
+        `bars_by_symbol` may also be an iterable of (symbol, bars) pairs, so a
+        large universe can be loaded one symbol at a time.
+        """
+        column_map = column_map or {}
+        float_shares = float_shares or {}
+        lookback = self.params['lookback_days']
+        # Existing rows grouped by symbol, each group in day order.
+        by_symbol = np.argsort(np.asarray(self.symbol_id), kind='stable')
+        group_ends = np.searchsorted(np.asarray(self.symbol_id)[by_symbol], np.arange(len(self.symbols) + 1))
+        stored_volume = np.asarray(self.columns['premarket_volume'])
+        stored_close = np.asarray(self.columns['session_close'])
+        pairs = bars_by_symbol.items() if isinstance(bars_by_symbol, Mapping) else bars_by_symbol
+        new_parts, replaced = [], []
+        for symbol, bars in pairs:
+            symbol = symbol.upper()
+            aggregates = self._daily_aggregates(bars, column_map, self.last_day.get(symbol))
+            if aggregates is None:
+                continue
+            days, pm_volume, pm_last, session_close = aggregates
+            sid = self._symbol_ids.get(symbol)
+            if sid is None:
+                sid = self._symbol_ids[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+                prior_volume, prior_close = np.empty(0), np.empty(0)
+            else:
+                rows = by_symbol[group_ends[sid]:group_ends[sid + 1]]
+                if days[0] == self.last_day[symbol]:
+                    replaced.append(rows[-1])
+                    rows = rows[:-1]
+                prior_volume, prior_close = stored_volume[rows[-lookback:]], stored_close[rows[-1:]]
+
+            closes = np.concatenate((prior_close if len(prior_close) else [np.nan], session_close))
+            prev_close = closes[:-1]
+            # Each new day's window holds the previous `lookback` days' volumes
+            # (zero-padded while the history is short), summed per window so an
+            # incremental update rounds exactly like a full rebuild.
+            volumes = np.concatenate((np.zeros(lookback), prior_volume, pm_volume))
+            end = np.arange(len(prior_volume), len(prior_volume) + len(days))
+            windows = np.lib.stride_tricks.sliding_window_view(volumes, lookback)[end]
+            counts = np.minimum(end, lookback)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean_prior = windows.sum(axis=1) / counts
+                relative_volume = np.where(mean_prior > 0, pm_volume / mean_prior, np.nan)
+                gap_pct = pm_last / prev_close - 1
+
+            new_parts.append((days, np.full(len(days), sid, dtype=np.int32), {
+                'premarket_volume': pm_volume, 'premarket_last': pm_last, 'session_close': session_close,
+                'prev_close': prev_close, 'gap_pct': gap_pct, 'relative_volume': relative_volume,
+                'float_shares': np.full(len(days), float(float_shares.get(symbol, np.nan))),
+            }))
+            self.last_day[symbol] = int(days[-1])
+
+        if not new_parts:
+            return 0
+        kept = np.ones(len(self.day), dtype=bool)
+        kept[replaced] = False
+        day = np.concatenate([np.asarray(self.day)[kept]] + [p[0] for p in new_parts])
+        symbol_id = np.concatenate([np.asarray(self.symbol_id)[kept]] + [p[1] for p in new_parts])
+        order = np.lexsort((symbol_id, day))
+        self.day, self.symbol_id = day[order], symbol_id[order]
+        self.columns = {name: np.concatenate([np.asarray(self.columns[name])[kept]]
+                                             + [p[2][name] for p in new_parts])[order]
+                        for name in FEATURE_COLUMNS}
+        added = sum(len(p[0]) for p in new_parts) - len(replaced)
+        logger.info(f"Screener index: added {added} and rebuilt {len(replaced)} day rows "
+                    f"for {len(new_parts)} symbol(s).")
+        return added
+
+    # ---------------------------------------------------------------- queries
+    def _day_slice(self, day) -> slice:
+        d = _day_number(day)
+        return slice(int(np.searchsorted(self.day, d, 'left')), int(np.searchsorted(self.day, d, 'right')))
+
+    def features(self, day) -> pd.DataFrame:
+        rows = self._day_slice(day)
+        frame = pd.DataFrame({name: np.asarray(values[rows]) for name, values in self.columns.items()})
+        frame.insert(0, 'symbol', [self.symbols[i] for i in np.asarray(self.symbol_id[rows]).tolist()])
+        return frame
+
+    def candidates(self, day, criteria: Optional[ScreenCriteria] = None) -> List[str]:
+        """Symbols passing the screen on `day`, strongest gap first."""
+        c = criteria or ScreenCriteria.from_config()
+        rows = self._day_slice(day)
+        col = {name: values[rows] for name, values in self.columns.items()}
+        price, float_shares = col['premarket_last'], col['float_shares']
+        with np.errstate(invalid='ignore'):
+            mask = ((price >= c.min_price) & (price <= c.max_price)
+                    & (float_shares >= c.min_float) & (float_shares <= c.max_float)
+                    & (col['gap_pct'] > c.min_gap_pct)
+                    & (col['relative_volume'] > c.min_relative_volume)
+                    & (col['premarket_volume'] > c.min_premarket_volume))
+        hits = np.flatnonzero(mask)
+        hits = hits[np.argsort(-col['gap_pct'][hits], kind='stable')]
+        ids = self.symbol_id[rows]
+        return [self.symbols[i] for i in ids[hits].tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend the pre-market screener index.")
+    parser.add_argument('--data_dir', required=True, help="directory of per-symbol CSV files (DirectoryDataHandler layout)")
+    parser.add_argument('--fundamentals', default='data/sample_fundamental_data.csv')
+    parser.add_argument('--index_dir', default=None)
+    parser.add_argument('--day', default=None, help="print the candidates for this date after updating")
+    args = parser.parse_args()
+
+    from .directory_data_handler import DirectoryDataHandler
+
+    handler = DirectoryDataHandler(args.data_dir)
+    index = ScreenerIndex(args.index_dir)
+    floats = load_float_shares(args.fundamentals)
+
+    def per_symbol():
+        # One symbol's bars in memory at a time.
+        for symbol, path in handler.symbol_files.items():
+            frame = handler._prepare_chunk(pd.read_csv(path), path)
+            if not frame.empty:
+                yield symbol, ColumnarBars.from_frame(frame)
+
+    index.update(per_symbol(), floats, handler.column_map)
+    index.save()
+    if args.day:
+        print(index.candidates(args.day))
+
+
+if __name__ == '__main__':
+    main()
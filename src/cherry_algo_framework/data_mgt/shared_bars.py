@@ -0,0 +1,107 @@
+import sys
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .columnar_bars import ColumnarBars
+
+_ALIGN = 64
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Pool workers share the publisher's resource tracker, so the block stays
+    # registered once and is unlinked only by the publisher.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedBarStore:
+    """Publishes ColumnarBars into one shared-memory block.
+
+    The publisher calls `publish()` and passes the returned manifest (a small
+    picklable dict of offsets, dtypes and shapes) to worker processes, which
+    call `SharedBarStore.attach(manifest)` to get read-only array views of the
+    same memory. Text columns cannot live in shared memory and travel inside
+    the manifest instead. The publisher must `close()` (which unlinks) when
+    the workers are done.
+    """
+
+    def __init__(self):
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._owner = False
+        self.bars: Dict[str, ColumnarBars] = {}
+
+    def publish(self, bars_by_symbol: Dict[str, ColumnarBars]) -> Dict[str, Any]:
+        layout: List[tuple] = []
+        offset = 0
+        symbols_meta: Dict[str, Any] = {}
+        for symbol, bars in bars_by_symbol.items():
+            arrays = {'__timestamps__': np.asarray(bars.timestamps, dtype=np.int64)}
+            arrays.update(bars.columns)
+            meta = {'python_scalars': bool(bars.python_scalars), 'arrays': {}, 'objects': {}}
+            for name, arr in arrays.items():
+                if arr.dtype == object:
+                    meta['objects'][name] = arr
+                    continue
+                offset = (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+                meta['arrays'][name] = (offset, arr.dtype.str, arr.shape)
+                layout.append((offset, arr))
+                offset += arr.nbytes
+            meta['order'] = list(arrays.keys())
+            symbols_meta[symbol] = meta
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self._owner = True
+        for start, arr in layout:
+            target = np.ndarray(arr.shape, dtype=arr.dtype, buffer=self._shm.buf, offset=start)
+            target[...] = arr
+        manifest = {'name': self._shm.name, 'symbols': symbols_meta}
+        self.bars = self._views(manifest)
+        return manifest
+
+    @classmethod
+    def attach(cls, manifest: Dict[str, Any]) -> "SharedBarStore":
+        store = cls()
+        store._shm = _attach(manifest['name'])
+        store.bars = store._views(manifest)
+        return store
+
+    def _views(self, manifest: Dict[str, Any]) -> Dict[str, ColumnarBars]:
+        result = {}
+        for symbol, meta in manifest['symbols'].items():
+            columns = {}
+            timestamps = None
+            for name in meta['order']:
+                if name in meta['objects']:
+                    arr = meta['objects'][name]
+                else:
+                    start, dtype, shape = meta['arrays'][name]
+                    arr = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=self._shm.buf, offset=start)
+                    arr.flags.writeable = False
+                if name == '__timestamps__':
+                    timestamps = arr
+                else:
+                    columns[name] = arr
+            result[symbol] = ColumnarBars(timestamps, columns, meta['python_scalars'])
+        return result
+
+    def close(self):
+        if self._shm is None:
+            return
+        self.bars = {}
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views are still referenced somewhere; the mapping goes away with the process.
+            pass
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> "SharedBarStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,337 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..core.event import Event, MarketBarEventPool
+from .market_data_feed import MarketDataFeed
+from .columnar_bars import ColumnarBars, ns_to_datetime, datetime_to_ns
+from .bar_cache import BarCache
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import logger
+
+TICK_BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'vwap', 'trades')
+DEFAULT_COLUMN_MAP = {'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'volume': 'volume'}
+# Per-(symbol, bar) partial aggregates; `notional` is sum(price * size).
+_GROUP_FIELDS = ('code', 'bucket', 'open', 'high', 'low', 'close', 'volume', 'notional', 'trades')
+
+
+def interval_to_ns(interval: Union[str, int, float, pd.Timedelta]) -> int:
+    """'1min', '5min', '30s', a Timedelta, or a number of seconds."""
+    if isinstance(interval, (int, float, np.integer, np.floating)):
+        ns = int(round(float(interval) * 1_000_000_000))
+    else:
+        ns = int(pd.Timedelta(interval).value)
+    if ns <= 0:
+        raise ValueError(f"Bar interval must be positive, got {interval!r}.")
+    return ns
+
+
+def _reduce_groups(g: Dict[str, np.ndarray], starts: np.ndarray) -> Dict[str, np.ndarray]:
+    # Combine consecutive partial bars of the same (symbol, bucket); inputs are in time order.
+    ends = np.r_[starts[1:], len(g['code'])] - 1
+    return {
+        'code': g['code'][starts], 'bucket': g['bucket'][starts],
+        'open': g['open'][starts], 'close': g['close'][ends],
+        'high': np.maximum.reduceat(g['high'], starts), 'low': np.minimum.reduceat(g['low'], starts),
+        'volume': np.add.reduceat(g['volume'], starts), 'notional': np.add.reduceat(g['notional'], starts),
+        'trades': np.add.reduceat(g['trades'], starts),
+    }
+
+
+def _group_starts(code: np.ndarray, bucket: np.ndarray) -> np.ndarray:
+    change = np.empty(len(code), dtype=bool)
+    change[:1] = True
+    change[1:] = (code[1:] != code[:-1]) | (bucket[1:] != bucket[:-1])
+    return np.flatnonzero(change)
+
+
+class TickBarAggregator:
+    """Incremental tick-to-bar aggregation over time-sorted batches of ticks.
+
+    Each `push()` reduces its ticks to (symbol, bar) partial aggregates with
+    one `reduceat` per field and merges them with the bars still open from
+    the previous batch. A bar is complete, and returned, once a tick of a
+    later bar has been seen anywhere in the input (ticks are globally time
+    sorted), so state is at most one open bar per symbol and bars that span
+    batch boundaries come out as in a single pass (volume and VWAP sums
+    may round differently in the last bit).
+
+    Bars are labelled with their start time, aligned to multiples of the
+    interval since the epoch; intervals without trades produce no bar.
+    Returned bars are in (start time, symbol first-seen order) order, with
+    open/high/low/close/volume/vwap/trades columns.
+    """
+
+    def __init__(self, interval: Union[str, int, float, pd.Timedelta] = '1min', symbol: Optional[str] = None):
+        self.interval_ns = interval_to_ns(interval)
+        self.default_symbol = symbol.upper() if symbol else None
+        self.symbols: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._open_bars: Optional[Dict[str, np.ndarray]] = None
+        self._last_ts: Optional[int] = None
+
+    def _encode(self, symbols: Optional[Iterable[str]], n: int) -> np.ndarray:
+        if symbols is None:
+            if self.default_symbol is None:
+                raise ValueError("Ticks without a symbol column need TickBarAggregator(symbol=...).")
+            code = self._codes.get(self.default_symbol)
+            if code is None:
+                code = self._codes[self.default_symbol] = len(self.symbols)
+                self.symbols.append(self.default_symbol)
+            return np.full(n, code, dtype=np.int64)
+        local, uniques = pd.factorize(np.asarray(symbols))
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for j, symbol in enumerate(uniques):
+            symbol = str(symbol).upper()
+            code = self._codes.get(symbol)
+            if code is None:
+                code = self._codes[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            mapping[j] = code
+        return mapping[local]
+
+    def push(self, timestamps: np.ndarray, prices: np.ndarray, sizes: np.ndarray,
+             symbols: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, ColumnarBars]:
+        """Add a batch of ticks; returns (symbol codes, bars) for the bars it completed."""
+        ts = np.asarray(timestamps, dtype=np.int64)
+        if not len(ts):
+            return self._emit(None)
+        if (self._last_ts is not None and ts[0] < self._last_ts) or np.any(ts[1:] < ts[:-1]):
+            raise ValueError("Ticks must be sorted by time.")
+        self._last_ts = int(ts[-1])
+        price = np.asarray(prices, dtype=np.float64)
+        size = np.asarray(sizes, dtype=np.float64)
+        code = self._encode(symbols, len(ts))
+        bucket = ts // self.interval_ns
+
+        if len(self.symbols) > 1:
+            order = np.argsort(code, kind='stable')  # grouped by symbol, time order kept within each
+            code, bucket, price, size = code[order], bucket[order], price[order], size[order]
+        starts = _group_starts(code, bucket)
+        groups = _reduce_groups({'code': code, 'bucket': bucket, 'open': price, 'high': price, 'low': price,
+                                 'close': price, 'volume': size, 'notional': price * size,
+                                 'trades': np.ones(len(ts), dtype=np.int64)}, starts)
+
+        if self._open_bars is not None and len(self._open_bars['code']):
+            merged = {name: np.concatenate((self._open_bars[name], groups[name])) for name in _GROUP_FIELDS}
+            # Open bars precede this batch's partials of the same (symbol, bucket).
+            order = np.lexsort((np.arange(len(merged['code'])), merged['bucket'], merged['code']))
+            merged = {name: values[order] for name, values in merged.items()}
+            groups = _reduce_groups(merged, _group_starts(merged['code'], merged['bucket']))
+
+        done = groups['bucket'] < self._last_ts // self.interval_ns
+        self._open_bars = {name: values[~done] for name, values in groups.items()}
+        return self._emit({name: values[done] for name, values in groups.items()})
+
+    def flush(self) -> Tuple[np.ndarray, ColumnarBars]:
+        """Close and return the bars still open (call once the input is exhausted)."""
+        groups, self._open_bars = self._open_bars, None
+        return self._emit(groups)
+
+    def _emit(self, groups: Optional[Dict[str, np.ndarray]]) -> Tuple[np.ndarray, ColumnarBars]:
+        if groups is None or not len(groups['code']):
+            empty = np.empty(0)
+            return (np.empty(0, dtype=np.int64),
+                    ColumnarBars(np.empty(0, dtype=np.int64),
+                                 {name: (np.empty(0, dtype=np.int64) if name == 'trades' else empty)
+                                  for name in TICK_BAR_COLUMNS}))
+        order = np.lexsort((groups['code'], groups['bucket']))
+        g = {name: values[order] for name, values in groups.items()}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = np.where(g['volume'] > 0, g['notional'] / g['volume'], np.nan)
+        columns = {'open': g['open'], 'high': g['high'], 'low': g['low'], 'close': g['close'],
+                   'volume': g['volume'], 'vwap': vwap, 'trades': g['trades']}
+        return g['code'], ColumnarBars(g['bucket'] * self.interval_ns, columns)
+
+
+def split_by_symbol(codes: np.ndarray, bars: ColumnarBars, symbols: List[str]) -> Dict[str, ColumnarBars]:
+    """Per-symbol ColumnarBars from a mixed, time-ordered batch."""
+    result = {}
+    for code in np.unique(codes).tolist():
+        rows = np.flatnonzero(codes == code)
+        result[symbols[code]] = ColumnarBars(bars.timestamps[rows], {name: col[rows] for name, col in bars.columns.items()})
+    return result
+
+
+class TickDataHandler(MarketDataFeed):
+    """Replays a tick CSV as bars aggregated on the fly.
+
+    The file is read `chunk_size` rows at a time and fed through a
+    TickBarAggregator, so memory stays at one chunk plus one open bar per
+    symbol however long the file is. The file must be sorted by time; with
+    `symbol_column` it may interleave many symbols. Bars carry `vwap` and
+    `trades` as extras and are published when complete, labelled with their
+    start time.
+
+    With `symbol_column` and no `symbol_list`, every symbol in the file is
+    replayed and `symbol_list` is filled by one pass over that column, so a
+    strategy built from the feed sees the whole universe.
+
+    With `cache_dir`, a bar cache entry written by `write_bar_cache()` for
+    the same file and options is replayed instead of re-aggregating.
+    """
+
+    def __init__(self, tick_file_path: Union[str, Path],
+                 interval: Union[str, int, float, pd.Timedelta] = '1min',
+                 symbol: Optional[str] = None,
+                 symbol_column: Optional[str] = None,
+                 symbol_list: Optional[List[str]] = None,
+                 start_date: Optional[Union[str, datetime]] = None,
+                 end_date: Optional[Union[str, datetime]] = None,
+                 timeframe_column: str = 'datetime',
+                 price_col: str = 'price',
+                 size_col: str = 'size',
+                 chunk_size: int = 500_000,
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 event_pool: Optional[MarketBarEventPool] = None):
+        super().__init__()
+        self.event_pool = event_pool
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive number of rows.")
+        if symbol is None and symbol_column is None:
+            raise ValueError("TickDataHandler needs either a symbol or a symbol_column.")
+        self.tick_file_path = Path(tick_file_path)
+        if not self.tick_file_path.exists():
+            logger.error(f"Tick file not found: {self.tick_file_path}")
+            raise FileNotFoundError(f"Tick file not found: {self.tick_file_path}")
+        self.interval = interval
+        self.interval_ns = interval_to_ns(interval)
+        self.symbol = symbol.upper() if symbol else None
+        self.symbol_column = symbol_column
+        # Symbols to keep from a multi-symbol file (None keeps all of them).
+        self.symbol_filter: Optional[List[str]] = [s.upper() for s in symbol_list] if symbol_list else None
+        self.symbol_list = list(self.symbol_filter or ([self.symbol] if self.symbol else []))
+        self.start_ns = datetime_to_ns(start_date) if start_date else None
+        self.end_ns = datetime_to_ns(end_date) if end_date else None
+        self.timeframe_column = timeframe_column
+        self.price_col = price_col
+        self.size_col = size_col
+        self.chunk_size = chunk_size
+        self.column_map = dict(DEFAULT_COLUMN_MAP)
+
+        self.bar_cache: Optional[BarCache] = BarCache(cache_dir) if cache_dir else None
+        self.columnar_data: Optional[Dict[str, ColumnarBars]] = None
+        if self.bar_cache is not None:
+            self.columnar_data = self.bar_cache.load(self._cache_key())
+            if self.columnar_data is not None:
+                self.symbol_list = list(self.columnar_data.keys())
+        if self.columnar_data is None and self.symbol_column and self.symbol_filter is None:
+            self.symbol_list = self._discover_symbols()
+
+    def _cache_options(self) -> Dict[str, object]:
+        return {
+            'kind': 'tick_bars',
+            'interval_ns': self.interval_ns,
+            'symbol': self.symbol,
+            'symbol_column': self.symbol_column,
+            'symbols': (self.symbol_filter or []) if self.symbol_column else None,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'columns': [self.timeframe_column, self.price_col, self.size_col],
+        }
+
+    def _cache_key(self) -> str:
+        return self.bar_cache.make_key(self.tick_file_path, self._cache_options())
+
+    def _discover_symbols(self) -> List[str]:
+        """Distinct names in the symbol column, upper-cased and sorted."""
+        found = set()
+        for chunk in pd.read_csv(self.tick_file_path, usecols=[self.symbol_column], chunksize=self.chunk_size):
+            found.update(str(name).upper() for name in chunk[self.symbol_column].dropna().unique())
+        return sorted(found)
+
+    def _read_tick_chunks(self) -> Generator[Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]], None, None]:
+        usecols = [self.timeframe_column, self.price_col, self.size_col]
+        if self.symbol_column:
+            usecols.append(self.symbol_column)
+        wanted = set(self.symbol_filter) if self.symbol_column and self.symbol_filter else None
+        for chunk in pd.read_csv(self.tick_file_path, usecols=usecols, chunksize=self.chunk_size):
+            ts = pd.to_datetime(chunk[self.timeframe_column], errors='coerce', utc=True)
+            keep = ts.notna().to_numpy(copy=True)  # pandas may hand back a read-only view
+            ts_ns = ts.to_numpy(dtype='datetime64[ns]').view(np.int64)
+            if self.start_ns is not None:
+                keep &= ts_ns >= self.start_ns
+            if self.end_ns is not None:
+                keep &= ts_ns <= self.end_ns
+            symbols = None
+            if self.symbol_column:
+                # Normalise the few distinct names rather than every row.
+                local, uniques = pd.factorize(chunk[self.symbol_column].to_numpy())
+                names = np.array([str(u).upper() for u in uniques], dtype=object)
+                if wanted is not None:
+                    keep &= np.isin(local, [j for j, name in enumerate(names) if name in wanted])
+                symbols = names[local[keep]]
+            yield (ts_ns[keep], chunk[self.price_col].to_numpy(dtype=np.float64)[keep],
+                   chunk[self.size_col].to_numpy(dtype=np.float64)[keep], symbols)
+
+    def iter_bar_batches(self) -> Generator[Tuple[List[str], np.ndarray, ColumnarBars], None, None]:
+        """(symbol names, codes, bars) for each chunk's completed bars, in time order."""
+        aggregator = TickBarAggregator(pd.Timedelta(self.interval_ns, 'ns'), symbol=self.symbol)
+        try:
+            for ts_ns, prices, sizes, symbols in self._read_tick_chunks():
+                codes, bars = aggregator.push(ts_ns, prices, sizes, symbols)
+                if len(bars):
+                    yield aggregator.symbols, codes, bars
+        except ValueError as e:
+            raise ValueError(f"{self.tick_file_path}: {e}") from e
+        codes, bars = aggregator.flush()
+        if len(bars):
+            yield aggregator.symbols, codes, bars
+
+    def aggregate(self) -> Dict[str, ColumnarBars]:
+        """The whole file's bars per symbol (bars only; ticks are never all in memory)."""
+        parts: Dict[str, List[ColumnarBars]] = {}
+        for symbols, codes, bars in self.iter_bar_batches():
+            for symbol, symbol_bars in split_by_symbol(codes, bars, symbols).items():
+                parts.setdefault(symbol, []).append(symbol_bars)
+        return {symbol: ColumnarBars(np.concatenate([p.timestamps for p in pieces]),
+                                     {name: np.concatenate([p.columns[name] for p in pieces]) for name in TICK_BAR_COLUMNS})
+                for symbol, pieces in parts.items()}
+
+    def write_bar_cache(self, cache_dir: Optional[Union[str, Path]] = None) -> Path:
+        """Aggregate the file once and store the bars in the bar cache."""
+        if cache_dir is not None:
+            self.bar_cache = BarCache(cache_dir)
+        elif self.bar_cache is None:
+            self.bar_cache = BarCache(app_config.get('MarketData', 'BAR_CACHE_DIR', '.cache/bars/'))
+        bars = self.aggregate()
+        return self.bar_cache.store(self._cache_key(), bars, source=self.tick_file_path)
+
+    def stream_next(self) -> Generator[Event, None, None]:
+        if self.columnar_data is not None:
+            yield from self._stream_columnar_bars(self.columnar_data, self.column_map, self.column_map.values())
+            return
+        for symbols, codes, bars in self.iter_bar_batches():
+            c = bars.columns
+            o, h, l, cl, v, vwap, trades = (c[name] for name in TICK_BAR_COLUMNS)
+            timestamps = bars.timestamps
+            for i, code in enumerate(codes.tolist()):
+                if not self.continue_backtest:
+                    break
+                ts_ns = int(timestamps[i])
+                yield self._publish_bar(symbols[code], ns_to_datetime(ts_ns), o[i], h[i], l[i], cl[i], v[i],
+                                        extras={'vwap': vwap[i], 'trades': trades[i]}, ts_ns=ts_ns)
+            if not self.continue_backtest:
+                break
+        self.continue_backtest = False
+        logger.info("Market data stream finished for all symbols.")
+
+    def get_historical_data(self,
+                            symbols: List[str],
+                            start_date: Union[str, datetime],
+                            end_date: Union[str, datetime],
+                            timeframe: str = '1d') -> Dict[str, pd.DataFrame]:
+        start_ns, end_ns = datetime_to_ns(start_date), datetime_to_ns(end_date)
+        all_bars = self.columnar_data if self.columnar_data is not None else self.aggregate()
+        results = {}
+        for symbol in symbols:
+            bars = all_bars.get(symbol.upper())
+            if bars is None:
+                logger.warning(f"No tick data for symbol '{symbol.upper()}' to fulfill get_historical_data request.")
+                continue
+            lo, hi = bars.index_range(start_ns, end_ns)
+            results[symbol.upper()] = bars.to_frame(lo, hi, index_name=self.timeframe_column)
+        return results
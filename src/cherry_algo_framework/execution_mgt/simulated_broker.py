@@ -1 +1,360 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from ..core.event import FillEvent, MarketBarEvent, OrderEvent
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import logger
+from ..utils.telemetry import telemetry
+
+ORDER_TYPES = ('MKT', 'LMT', 'STP', 'TRAIL')
+
+
+class _RestingOrder:
+    __slots__ = ("order", "price", "trail_pct", "trail_steps", "anchor", "peak", "oco", "live")
+
+    def __init__(self, order: OrderEvent, price: float, trail_pct: Optional[float] = None,
+                 trail_steps: Optional[Sequence[Tuple[float, float]]] = None, anchor: Optional[float] = None):
+        self.order = order
+        self.price = price            # stop or limit price; the book key
+        self.trail_pct = trail_pct
+        self.trail_steps = trail_steps
+        self.anchor = anchor          # entry price the trail steps are measured from
+        self.peak = float('-inf')     # best price seen while resting (trailing orders)
+        self.oco: List[int] = []
+        self.live = True
+
+    @property
+    def trailing(self) -> bool:
+        return self.trail_pct is not None or self.trail_steps is not None
+
+    def trail_for(self, peak: float) -> Optional[float]:
+        if self.trail_steps is None:
+            return self.trail_pct
+        trail = self.trail_pct
+        gain = peak / self.anchor - 1
+        for threshold, step_trail in self.trail_steps:
+            if gain >= threshold:
+                trail = step_trail
+        return trail
+
+
+class _PriceLevels:
+    """Order ids of one kind for one symbol, kept sorted by (price, order_id)."""
+
+    __slots__ = ("keys",)
+
+    def __init__(self):
+        self.keys: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, price: float, order_id: int):
+        insort(self.keys, (price, order_id))
+
+    def remove(self, price: float, order_id: int):
+        i = bisect_left(self.keys, (price, order_id))
+        if i < len(self.keys) and self.keys[i] == (price, order_id):
+            del self.keys[i]
+
+    def pop_at_or_above(self, price: float) -> List[int]:
+        # Highest first: the order a falling price reaches them in.
+        if not self.keys or self.keys[-1][0] < price:
+            return []
+        i = bisect_left(self.keys, (price, -1))
+        taken = self.keys[i:]
+        del self.keys[i:]
+        return [order_id for _, order_id in reversed(taken)]
+
+    def pop_at_or_below(self, price: float) -> List[int]:
+        # Lowest first: the order a rising price reaches them in.
+        if not self.keys or self.keys[0][0] > price:
+            return []
+        i = bisect_right(self.keys, (price, float('inf')))
+        taken = self.keys[:i]
+        del self.keys[:i]
+        return [order_id for _, order_id in taken]
+
+
+class _SymbolBook:
+    __slots__ = ("sell_stops", "buy_stops", "buy_limits", "sell_limits", "trailing")
+
+    def __init__(self):
+        self.sell_stops = _PriceLevels()
+        self.buy_stops = _PriceLevels()
+        self.buy_limits = _PriceLevels()
+        self.sell_limits = _PriceLevels()
+        self.trailing: List[Tuple[float, int]] = []  # min-heap of (peak, order_id); stale entries skipped
+
+    def levels_for(self, order: OrderEvent) -> _PriceLevels:
+        if order.order_type == 'LMT':
+            return self.buy_limits if order.direction == 'BUY' else self.sell_limits
+        return self.buy_stops if order.direction == 'BUY' else self.sell_stops
+
+    def __len__(self) -> int:
+        return len(self.sell_stops) + len(self.buy_stops) + len(self.buy_limits) + len(self.sell_limits)
+
+
+class SimulatedBroker:
+    """Fills orders against the bars of the order's symbol.
+
+    Market orders fill on the next bar's open. Stop, trailing-stop and limit
+    orders rest in per-symbol books sorted by price, so a bar only visits the
+    orders its high/low range crosses (a bisect plus the triggered slice)
+    rather than every resting order. Within a bar, sell stops are processed
+    before limits (the pessimistic assumption), a stop that gaps fills at the
+    open, and trailing stops are re-pegged from the bar's high only after the
+    bar's triggers have been checked.
+
+    Market and stop fills are moved against the trade by SLIPPAGE_PERCENT;
+    limit fills get the limit (or a better open). Commission is
+    max(quantity * COMMISSION_PER_SHARE, COMMISSION_MIN_PER_ORDER).
+    """
+
+    def __init__(self,
+                 commission_per_share: Optional[float] = None,
+                 commission_min_per_order: Optional[float] = None,
+                 slippage_pct: Optional[float] = None):
+        settings = app_config.snapshot()
+        self.commission_per_share = commission_per_share if commission_per_share is not None else \
+            settings.commission_per_share
+        self.commission_min_per_order = commission_min_per_order if commission_min_per_order is not None else \
+            settings.commission_min_per_order
+        self.slippage_pct = slippage_pct if slippage_pct is not None else settings.slippage_pct
+        self.pending_orders: Dict[str, List[OrderEvent]] = defaultdict(list)
+        self._books: Dict[str, _SymbolBook] = defaultdict(_SymbolBook)
+        self._resting: Dict[int, _RestingOrder] = {}
+        self._brackets: Dict[int, Tuple[Optional[float], Optional[float], Optional[Sequence[Tuple[float, float]]]]] = {}
+        self._next_order_id = 1
+
+    def commission_for(self, quantity: float) -> float:
+        return max(quantity * self.commission_per_share, self.commission_min_per_order)
+
+    @property
+    def resting_count(self) -> int:
+        return len(self._resting)
+
+    @property
+    def has_working_orders(self) -> bool:
+        return bool(self._resting or self._brackets or any(self.pending_orders.values()))
+
+    # ------------------------------------------------------------- submission
+    def _assign_id(self, order: OrderEvent):
+        if order.order_id is None:
+            order.order_id = self._next_order_id
+            self._next_order_id += 1
+
+    def execute_order(self, order: OrderEvent):
+        telemetry.count('broker.orders')
+        if order.order_type not in ORDER_TYPES:
+            logger.warning(f"SimulatedBroker does not support {order.order_type} orders; rejected for {order.symbol}.")
+            return
+        self._assign_id(order)
+        if order.order_type == 'MKT':
+            self.pending_orders[order.symbol].append(order)
+            return
+        try:
+            self._rest(order)
+        except ValueError as e:
+            logger.warning(f"Rejected {order.order_type} {order.direction} order for {order.symbol}: {e}")
+
+    def _rest(self, order: OrderEvent, trail_steps: Optional[Sequence[Tuple[float, float]]] = None,
+              anchor: Optional[float] = None) -> _RestingOrder:
+        if order.order_type == 'LMT':
+            if order.limit_price is None:
+                raise ValueError("LMT orders need a limit_price.")
+            record = _RestingOrder(order, float(order.limit_price))
+        elif order.order_type == 'TRAIL':
+            if order.direction != 'SELL' or not order.trail_pct or order.trail_pct <= 0:
+                raise ValueError("TRAIL orders must be SELL with a positive trail_pct.")
+            stop = float(order.stop_price) if order.stop_price is not None else float('-inf')
+            record = _RestingOrder(order, stop, trail_pct=order.trail_pct)
+            record.peak = stop / (1 - order.trail_pct)
+        else:
+            if order.stop_price is None:
+                raise ValueError("STP orders need a stop_price.")
+            record = _RestingOrder(order, float(order.stop_price), trail_pct=order.trail_pct,
+                                   trail_steps=trail_steps, anchor=anchor)
+            if anchor is not None:
+                record.peak = anchor
+        book = self._books[order.symbol]
+        book.levels_for(order).add(record.price, order.order_id)
+        if record.trailing:
+            heapq.heappush(book.trailing, (record.peak, order.order_id))
+        self._resting[order.order_id] = record
+        return record
+
+    def submit_bracket(self, entry: OrderEvent,
+                       stop_loss_pct: Optional[float] = None,
+                       take_profit_pct: Optional[float] = None,
+                       trail_steps: Optional[Sequence[Tuple[float, float]]] = None) -> int:
+        """Entry order whose fill arms a protective stop and/or a take-profit.
+
+        The exits are placed relative to the entry fill price and are
+        one-cancels-other. `trail_steps` is a sequence of (gain, trail)
+        pairs: once the best price is `gain` above entry, the stop trails it
+        by `trail` (the last step reached applies; the stop never moves down).
+        Exits of an entry filled at the open are live on the same bar; those
+        of an entry filled intrabar are armed from the next bar.
+        """
+        if entry.direction != 'BUY':
+            raise ValueError("Bracket entries must be BUY orders.")
+        self._assign_id(entry)
+        steps = tuple(sorted(trail_steps)) if trail_steps else None
+        self._brackets[entry.order_id] = (stop_loss_pct, take_profit_pct, steps)
+        self.execute_order(entry)
+        return entry.order_id
+
+    def oco(self, *order_ids: int):
+        """Link resting orders so that a fill of any one cancels the others."""
+        for order_id in order_ids:
+            record = self._resting.get(order_id)
+            if record is not None:
+                record.oco.extend(i for i in order_ids if i != order_id and i not in record.oco)
+
+    def cancel(self, order_id: int) -> bool:
+        record = self._resting.pop(order_id, None)
+        if record is None:
+            for orders in self.pending_orders.values():
+                for i, order in enumerate(orders):
+                    if order.order_id == order_id:
+                        del orders[i]
+                        self._brackets.pop(order_id, None)
+                        return True
+            return False
+        record.live = False
+        self._books[record.order.symbol].levels_for(record.order).remove(record.price, order_id)
+        self._brackets.pop(order_id, None)
+        return True
+
+    def repeg(self, order_id: int, stop_price: float) -> bool:
+        """Move a resting stop to a new price (e.g. a strategy-managed trail)."""
+        record = self._resting.get(order_id)
+        if record is None or record.order.order_type not in ('STP', 'TRAIL'):
+            return False
+        levels = self._books[record.order.symbol].levels_for(record.order)
+        levels.remove(record.price, order_id)
+        record.price = float(stop_price)
+        record.order.stop_price = record.price
+        levels.add(record.price, order_id)
+        return True
+
+    # ----------------------------------------------------------------- fills
+    def _fill(self, order: OrderEvent, bar: MarketBarEvent, price: float, reference: float) -> FillEvent:
+        telemetry.count('broker.fills')
+        return FillEvent(order.symbol, bar.datetime, order.direction, order.quantity, price,
+                         commission=self.commission_for(order.quantity),
+                         slippage=abs(price - reference) * order.quantity,
+                         order_id=order.order_id)
+
+    def _after_fill(self, order: OrderEvent, fill_price: float, deferred: Optional[List[OrderEvent]],
+                    record: Optional[_RestingOrder] = None):
+        if record is not None:
+            record.live = False
+            self._resting.pop(order.order_id, None)
+            for sibling in record.oco:
+                self.cancel(sibling)
+        bracket = self._brackets.pop(order.order_id, None)
+        if bracket is None:
+            return
+        stop_loss_pct, take_profit_pct, steps = bracket
+        children = []
+        if stop_loss_pct is not None or steps:
+            stop = fill_price * (1 - stop_loss_pct) if stop_loss_pct is not None else float('-inf')
+            children.append((OrderEvent(order.symbol, order.datetime, 'STP', 'SELL', order.quantity,
+                                        stop_price=stop), steps))
+        if take_profit_pct is not None:
+            children.append((OrderEvent(order.symbol, order.datetime, 'LMT', 'SELL', order.quantity,
+                                        limit_price=fill_price * (1 + take_profit_pct)), None))
+        for child, _ in children:
+            self._assign_id(child)
+        if deferred is not None:
+            deferred.append((children, fill_price))
+        else:
+            self._arm(children, fill_price)
+
+    def _arm(self, children, fill_price: float):
+        ids = []
+        for child, steps in children:
+            self._rest(child, trail_steps=steps, anchor=fill_price if steps else None)
+            ids.append(child.order_id)
+        if len(ids) > 1:
+            self.oco(*ids)
+
+    def _take(self, order_ids: List[int]):
+        # Skips orders already cancelled by an OCO sibling filled earlier in the bar.
+        for order_id in order_ids:
+            record = self._resting.get(order_id)
+            if record is not None and record.live:
+                yield record
+
+    def on_market(self, bar: MarketBarEvent) -> List[FillEvent]:
+        orders = self.pending_orders.get(bar.symbol)
+        book = self._books.get(bar.symbol)
+        if (not orders and not book) or bar.open is None:
+            return []
+        fills = []
+        open_ = bar.open
+        if orders:
+            for order in orders:
+                if order.direction == 'BUY':
+                    fill_price = open_ * (1 + self.slippage_pct)
+                else:
+                    fill_price = open_ * (1 - self.slippage_pct)
+                fills.append(self._fill(order, bar, fill_price, open_))
+                self._after_fill(order, fill_price, None)
+            orders.clear()
+        if not book:
+            return fills
+
+        close = bar.close if bar.close is not None else open_
+        high = bar.high if bar.high is not None else max(open_, close)
+        low = bar.low if bar.low is not None else min(open_, close)
+        sell_stops = book.sell_stops.pop_at_or_above(low)
+        buy_stops = book.buy_stops.pop_at_or_below(high)
+        buy_limits = book.buy_limits.pop_at_or_above(low)
+        sell_limits = book.sell_limits.pop_at_or_below(high)
+        heap = book.trailing
+        if not (sell_stops or buy_stops or buy_limits or sell_limits or (heap and heap[0][0] < high)):
+            return fills
+        deferred: List = []
+
+        for record in self._take(sell_stops):
+            reference = min(open_, record.price)
+            price = reference * (1 - self.slippage_pct)
+            fills.append(self._fill(record.order, bar, price, reference))
+            self._after_fill(record.order, price, deferred, record)
+        for record in self._take(buy_stops):
+            reference = max(open_, record.price)
+            price = reference * (1 + self.slippage_pct)
+            fills.append(self._fill(record.order, bar, price, reference))
+            self._after_fill(record.order, price, deferred, record)
+        for record in self._take(buy_limits):
+            price = min(open_, record.price)
+            fills.append(self._fill(record.order, bar, price, price))
+            self._after_fill(record.order, price, deferred, record)
+        for record in self._take(sell_limits):
+            price = max(open_, record.price)
+            fills.append(self._fill(record.order, bar, price, price))
+            self._after_fill(record.order, price, deferred, record)
+
+        # Re-peg trailing stops whose best price this bar's high exceeds; only
+        # those orders are touched.
+        while heap and heap[0][0] < high:
+            peak, order_id = heapq.heappop(heap)
+            record = self._resting.get(order_id)
+            if record is None or not record.live or record.peak != peak:
+                continue
+            record.peak = high
+            trail = record.trail_for(high)
+            if trail is not None:
+                stop = high * (1 - trail)
+                if stop > record.price:
+                    self.repeg(order_id, stop)
+            heapq.heappush(heap, (high, order_id))
+
+        for children, fill_price in deferred:
+            self._arm(children, fill_price)
+        return fills
@@ -1 +1,302 @@
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from ..core.event import OrderEvent
+from ..risk_mgt.risk_mgt.risk_engine import RiskEngine, RiskState
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import logger
+from ..utils.telemetry import telemetry
+
+ACCEPTED = 'accepted'
+DUPLICATE = 'duplicate'
+INVALID = 'invalid'
+REJECTED = 'rejected'  # queue full: backpressure
+
+_HTTP_STATUS = {ACCEPTED: (202, 'Accepted'), DUPLICATE: (409, 'Conflict'), INVALID: (400, 'Bad Request'),
+                REJECTED: (429, 'Too Many Requests')}
+_ACTIONS = {'buy': 'BUY', 'long': 'BUY', 'sell': 'SELL', 'exit': 'SELL', 'close': 'SELL'}
+
+
+class Alert:
+    """One validated TradingView-style alert."""
+
+    __slots__ = ("alert_id", "symbol", "action", "price", "stop_price", "quantity", "received_ns")
+
+    def __init__(self, alert_id: str, symbol: str, action: str, price: float,
+                 stop_price: Optional[float], quantity: Optional[float], received_ns: int):
+        self.alert_id = alert_id
+        self.symbol = symbol
+        self.action = action            # 'BUY' or 'SELL'
+        self.price = price
+        self.stop_price = stop_price    # BUY: protective stop the risk engine sizes against
+        self.quantity = quantity        # SELL: shares to exit (BUY quantity comes from the risk engine)
+        self.received_ns = received_ns  # time.perf_counter_ns() at ingest
+
+
+def _positive_float(payload: Dict[str, Any], *keys: str) -> Optional[float]:
+    for key in keys:
+        if payload.get(key) is not None:
+            try:
+                value = float(payload[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"'{key}' must be a number.") from None
+            if not math.isfinite(value) or value <= 0:
+                raise ValueError(f"'{key}' must be a positive number.")
+            return value
+    return None
+
+
+def parse_alert(payload: Dict[str, Any], received_ns: Optional[int] = None, secret: Optional[str] = None) -> Alert:
+    """Validate an alert payload; raises ValueError with the reason if it is unusable.
+
+    Accepts `ticker`/`symbol`, `action`/`side` (buy/long, sell/exit/close),
+    `price`, `stop` (required for buys) and `quantity` (required for sells).
+    Without an `id`, the alert is identified by ticker, action, price and
+    `time`, so TradingView's retries of the same alert deduplicate.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Alert body must be a JSON object.")
+    if secret and payload.get('secret') != secret:
+        raise ValueError("Bad or missing secret.")
+    symbol = str(payload.get('ticker') or payload.get('symbol') or '').strip().upper()
+    if not symbol:
+        raise ValueError("Missing 'ticker'.")
+    action = _ACTIONS.get(str(payload.get('action') or payload.get('side') or '').strip().lower())
+    if action is None:
+        raise ValueError(f"Unknown action '{payload.get('action', payload.get('side'))}'.")
+    price = _positive_float(payload, 'price', 'close')
+    stop = _positive_float(payload, 'stop', 'stop_price')
+    quantity = _positive_float(payload, 'quantity', 'qty')
+    if price is None:
+        raise ValueError("Missing 'price'.")
+    if action == 'BUY' and (stop is None or stop >= price):
+        raise ValueError("Buy alerts need a 'stop' below 'price'.")
+    if action == 'SELL' and quantity is None:
+        raise ValueError("Sell alerts need a 'quantity'.")
+    alert_id = payload.get('id')
+    if alert_id is None:
+        alert_id = f"{symbol}|{action}|{price}|{payload.get('time', '')}"
+    return Alert(str(alert_id), symbol, action, price, stop, quantity,
+                 time.perf_counter_ns() if received_ns is None else received_ns)
+
+
+class WebhookListener:
+    """Asyncio alert ingest: validate, deduplicate, queue, micro-batch into the risk engine.
+
+    `submit()` is the synchronous ingest step (HTTP handler, tests, load
+    generator): a bad alert is refused, a repeat of one of the last
+    `dedupe_window` alert ids is dropped, and when the bounded queue is full
+    the alert is rejected straight away (HTTP 429) instead of letting latency
+    grow without limit. A single consumer task drains the queue in batches
+    of up to `batch_size`, waiting at most `batch_window_ms` after the first
+    alert for more to arrive, sizes the batch's buys with one
+    `RiskEngine.evaluate_batch` call against `state_provider()` and hands
+    each resulting OrderEvent to `order_sink`. Ingest-to-order latency is
+    kept per order for `latency_summary()`.
+    """
+
+    def __init__(self, risk_engine: RiskEngine,
+                 state_provider: Callable[[], RiskState],
+                 order_sink: Callable[[OrderEvent], Any],
+                 queue_size: Optional[int] = None,
+                 batch_size: Optional[int] = None,
+                 batch_window_ms: Optional[float] = None,
+                 dedupe_window: Optional[int] = None,
+                 secret: Optional[str] = None,
+                 latency_window: int = 10_000):
+        section = 'Webhook'
+        self.queue_size = queue_size if queue_size is not None else \
+            app_config.getint(section, 'QUEUE_MAX_SIZE', 1000)
+        self.batch_size = batch_size if batch_size is not None else \
+            app_config.getint(section, 'BATCH_MAX_SIZE', 64)
+        self.batch_window_ms = batch_window_ms if batch_window_ms is not None else \
+            app_config.getfloat(section, 'BATCH_WINDOW_MS', 2.0)
+        self.dedupe_window = dedupe_window if dedupe_window is not None else \
+            app_config.getint(section, 'DEDUPE_WINDOW', 10_000)
+        self.secret = secret if secret is not None else (app_config.get(section, 'SHARED_SECRET', '') or None)
+        self.risk_engine = risk_engine
+        self.state_provider = state_provider
+        self.order_sink = order_sink
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self.latencies_ns: deque = deque(maxlen=latency_window)
+        self.batch_sizes: deque = deque(maxlen=latency_window)
+        self.counts = {ACCEPTED: 0, DUPLICATE: 0, INVALID: 0, REJECTED: 0, 'orders': 0, 'risk_declined': 0}
+
+    # ----------------------------------------------------------------- ingest
+    async def start(self):
+        """Create the queue and start the batching consumer on the running loop."""
+        if self._consumer is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._consumer = asyncio.get_running_loop().create_task(self._consume())
+
+    def submit(self, payload: Dict[str, Any], received_ns: Optional[int] = None) -> Tuple[str, str]:
+        """Ingest one alert payload; returns (status, detail)."""
+        if self._queue is None:
+            raise RuntimeError("WebhookListener.start() must be awaited before submitting alerts.")
+        try:
+            alert = parse_alert(payload, received_ns, self.secret)
+        except ValueError as e:
+            self.counts[INVALID] += 1
+            return INVALID, str(e)
+        if alert.alert_id in self._seen:
+            self.counts[DUPLICATE] += 1
+            return DUPLICATE, alert.alert_id
+        try:
+            self._queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            # Not remembered as seen, so the sender's retry can still get in.
+            self.counts[REJECTED] += 1
+            return REJECTED, f"Queue full ({self.queue_size} alerts pending)."
+        self._seen[alert.alert_id] = None
+        if len(self._seen) > self.dedupe_window:
+            self._seen.popitem(last=False)
+        self.counts[ACCEPTED] += 1
+        return ACCEPTED, alert.alert_id
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # ---------------------------------------------------------------- batching
+    async def _next_batch(self) -> List[Alert]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.batch_window_ms / 1000
+        while len(batch) < self.batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _consume(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                self.process_batch(batch)
+            except Exception as e:  # keep the consumer alive; the batch is lost, not the listener
+                logger.error(f"Webhook batch of {len(batch)} alerts failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def process_batch(self, batch: List[Alert]) -> List[OrderEvent]:
+        """Turn a batch of alerts into orders, buys sized in one risk-engine pass."""
+        telemetry.count('webhook.alerts', len(batch))
+        now = datetime.now(timezone.utc)
+        orders: List[Tuple[Alert, OrderEvent]] = []
+        buys = [alert for alert in batch if alert.action == 'BUY']
+        if buys:
+            decision = self.risk_engine.evaluate_batch(np.array([a.price for a in buys]),
+                                                       np.array([a.stop_price for a in buys]),
+                                                       self.state_provider())
+            for alert, result in zip(buys, decision.decisions()):
+                if result.approved:
+                    orders.append((alert, OrderEvent(alert.symbol, now, 'MKT', 'BUY', result.quantity)))
+                else:
+                    self.counts['risk_declined'] += 1
+                    logger.info(f"Alert {alert.alert_id} declined by risk engine: {result.reason_name}.")
+        for alert in batch:
+            if alert.action == 'SELL':
+                orders.append((alert, OrderEvent(alert.symbol, now, 'MKT', 'SELL', alert.quantity)))
+        for alert, order in orders:
+            self.order_sink(order)
+            self.latencies_ns.append(time.perf_counter_ns() - alert.received_ns)
+        self.counts['orders'] += len(orders)
+        self.batch_sizes.append(len(batch))
+        return [order for _, order in orders]
+
+    async def drain(self):
+        """Wait until every queued alert has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+
+    def latency_summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = dict(self.counts)
+        if self.latencies_ns:
+            samples = np.fromiter(self.latencies_ns, dtype=float) / 1e3
+            summary.update({'p50_us': float(np.percentile(samples, 50)),
+                            'p99_us': float(np.percentile(samples, 99)),
+                            'max_us': float(samples.max()),
+                            'mean_batch': float(np.mean(self.batch_sizes))})
+        return summary
+
+    # -------------------------------------------------------------------- HTTP
+    async def serve(self, host: Optional[str] = None, port: Optional[int] = None, path: str = '/webhook'):
+        """Listen for `POST <path>` alerts over HTTP/1.1 (keep-alive supported).
+
+        Returns the asyncio server; `port=0` picks a free port
+        (`server.sockets[0].getsockname()[1]`).
+        """
+        host = host or app_config.get('Webhook', 'HOST', '127.0.0.1')
+        port = port if port is not None else app_config.getint('Webhook', 'PORT', 8080)
+        await self.start()
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                while True:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    received_ns = time.perf_counter_ns()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+                    method, target = (request_line.decode('latin-1').split(' ') + ['', ''])[:2]
+                    if method != 'POST' or target.split('?')[0] != path:
+                        status, detail = (404, 'Not Found'), 'Unknown endpoint.'
+                    else:
+                        try:
+                            payload = json.loads(body or b'null')
+                        except ValueError:
+                            payload = None
+                        result, detail = self.submit(payload, received_ns)
+                        status = _HTTP_STATUS[result]
+                    response = json.dumps({'status': status[1], 'detail': detail}).encode()
+                    writer.write(f"HTTP/1.1 {status[0]} {status[1]}\r\nContent-Type: application/json\r\n"
+                                 f"Content-Length: {len(response)}\r\n\r\n".encode() + response)
+                    await writer.drain()
+                    if headers.get('connection', '').lower() == 'close':
+                        break
+            except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                pass
+            finally:
+                writer.close()
+
+        self._server = await asyncio.start_server(handle, host, port)
+        logger.info(f"Webhook listener on http://{host}:{self._server.sockets[0].getsockname()[1]}{path}")
+        return self._server
@@ -1 +1,341 @@
+import argparse
+import json
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
+import pandas as pd
+
+from .core.backtest_result import FILL_COLUMNS, BacktestResult, fills_frame
+from .core.checkpoint import BacktestCheckpoint
+from .core.results_store import ResultsWriter, RunCache
+from .core.event import EventType
+from .core.event_bus import EventBus
+from .core.sharded_engine import run_sharded_backtest
+from .core.vectorized_engine import run_vectorized_backtest
+from .data_mgt.columnar_bars import datetime_to_ns, ns_to_datetime
+from .data_mgt.data_handler import CSVDataHandler
+from .data_mgt.market_data_feed import MarketDataFeed
+from .execution_mgt.simulated_broker import SimulatedBroker
+from .performance_mgt.metrics_calculator import StreamingMetrics, compute_metrics
+from .portfolio_mgt.portfolio import Portfolio
+from .strategy.base_strategy import BaseStrategy
+from .strategy.example_momentum_strategy import ExampleMomentumStrategy, load_params
+from .utils.config_loader import app_config
+from .utils.logging_setup import logger
+from .utils.telemetry import SliceProfiler, telemetry
+
+STRATEGIES: Dict[str, Type[BaseStrategy]] = {
+    'example_momentum': ExampleMomentumStrategy,
+}
+
+BACKTEST_MODES = ('event', 'vectorized', 'sharded')
+
+
+def build_event_bus(strategy: BaseStrategy,
+                    portfolio: Portfolio,
+                    broker: SimulatedBroker,
+                    metrics: Optional[StreamingMetrics] = None,
+                    profile: bool = False,
+                    results: Optional[ResultsWriter] = None) -> EventBus:
+    bus = EventBus(profile=profile, queue=strategy.event_queue)
+    # Orders resting from the previous bar fill on this bar's open before
+    # the portfolio is marked and the strategy sees the close.
+    bus.subscribe(EventType.MARKET, broker.on_market, priority=0)
+    bus.subscribe(EventType.MARKET, portfolio.update_timeindex, priority=10)
+    if metrics is not None:
+        bus.subscribe(EventType.MARKET, metrics.on_bar, priority=20)
+        bus.subscribe(EventType.MARKET, lambda bar: metrics.on_equity(bar.datetime, portfolio.equity_curve[bar.datetime]),
+                      priority=20, name='StreamingMetrics.on_equity')
+    if results is not None:
+        bus.subscribe(EventType.MARKET,
+                      lambda bar: results.on_bar(bar, portfolio.equity_curve[bar.datetime], portfolio.cash),
+                      priority=20, name='ResultsWriter.on_bar')
+    bus.subscribe(EventType.MARKET, strategy.calculate_signals, priority=30)
+    bus.subscribe(EventType.SIGNAL, portfolio.on_signal)
+    bus.subscribe(EventType.ORDER, broker.execute_order)
+    bus.subscribe(EventType.FILL, portfolio.on_fill)
+    if metrics is not None:
+        bus.subscribe(EventType.FILL, metrics.on_fill)
+    if results is not None:
+        bus.subscribe(EventType.FILL, results.on_fill)
+    return bus
+
+
+def run_event_driven_backtest(data_handler: MarketDataFeed,
+                              strategy: BaseStrategy,
+                              portfolio: Portfolio,
+                              broker: SimulatedBroker,
+                              metrics: Optional[StreamingMetrics] = None,
+                              bus: Optional[EventBus] = None,
+                              profiler: Optional[SliceProfiler] = None,
+                              resume_after_ns: Optional[int] = None,
+                              checkpoint_at_ns: Optional[int] = None,
+                              on_checkpoint: Optional[Callable[[], Any]] = None) -> BacktestResult:
+    """Replay the feed through the bus.
+
+    Columnar feeds can skip bars up to `resume_after_ns` (the objects passed
+    in already hold that state) and stop after `checkpoint_at_ns` to call
+    `on_checkpoint()` before replaying the rest.
+    """
+    if bus is None:
+        bus = build_event_bus(strategy, portfolio, broker, metrics)
+    if (resume_after_ns is not None or checkpoint_at_ns is not None) and \
+            getattr(data_handler, 'replay_mode', None) != 'columnar':
+        raise ValueError("Checkpoint and resume need a feed in 'columnar' replay mode.")
+    release = data_handler.event_pool.release if data_handler.event_pool is not None else None
+    start_ns = resume_after_ns + 1 if resume_after_ns is not None else None
+    if checkpoint_at_ns is None:
+        windows = [(start_ns, None)]
+    else:
+        windows = [(start_ns, checkpoint_at_ns), (checkpoint_at_ns + 1, None)]
+    with telemetry.timer('backtest.replay'):
+        try:
+            for k, window in enumerate(windows):
+                if k and on_checkpoint is not None:
+                    on_checkpoint()
+                data_handler.replay_window = window if window != (None, None) else None
+                data_handler.continue_backtest = True
+                events = data_handler.stream_next()
+                if profiler is not None and not k:
+                    events = profiler.wrap(events)
+                bus.run(events, release)
+        finally:
+            data_handler.replay_window = None
+
+    equity_curve = pd.Series(portfolio.equity_curve, name='equity', dtype=float)
+    if len(equity_curve):
+        equity_curve.index = pd.DatetimeIndex(equity_curve.index)
+    return BacktestResult(equity_curve, fills_frame(portfolio.fills), portfolio.cash,
+                          portfolio.open_positions(), portfolio.initial_equity, 'event')
+
+
+def _replay_telemetry(bus: EventBus) -> Dict[str, Any]:
+    # Handler time per component (strategy, broker, portfolio, ...) from the bus
+    # profile; the rest of the replay is the feed plus dispatch overhead.
+    replay_s = telemetry.timers.get('backtest.replay', [0, 0])[0] / 1e9
+    report = bus.profile_report()
+    by_component = report.groupby(report['handler'].str.split('.').str[0])['total_ms'].sum() / 1e3
+    return {
+        'bars': bus.market_events,
+        'bars_per_sec': bus.market_events / replay_s if replay_s else None,
+        'events_by_type': bus.event_type_counts(),
+        'handler_time_s': {name: float(v) for name, v in by_component.sort_values(ascending=False).items()},
+        'feed_and_dispatch_s': replay_s - float(by_component.sum()),
+    }
+
+
+def run_backtest(data_handler: MarketDataFeed,
+                 strategy_name: str = 'example_momentum',
+                 params: Optional[Dict[str, Any]] = None,
+                 mode: str = 'event',
+                 initial_equity: Optional[float] = None,
+                 commission_per_share: Optional[float] = None,
+                 commission_min_per_order: Optional[float] = None,
+                 slippage_pct: Optional[float] = None,
+                 profile: bool = False,
+                 profiler: Optional[SliceProfiler] = None,
+                 workers: Optional[int] = None,
+                 checkpoint_path: Optional[Path] = None,
+                 checkpoint_at: Any = None,
+                 resume_from: Optional[Path] = None,
+                 results_dir: Optional[Path] = None,
+                 run_cache: Optional[RunCache] = None) -> BacktestResult:
+    if mode not in BACKTEST_MODES:
+        raise ValueError(f"Unknown backtest mode '{mode}'. Expected one of {BACKTEST_MODES}.")
+    if strategy_name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy_name}'. Available: {sorted(STRATEGIES)}")
+    columnar = data_handler.replay_mode == 'columnar'
+    if not columnar and mode != 'event':
+        raise ValueError(f"'{mode}' mode requires a feed in 'columnar' replay mode.")
+    if not columnar and (checkpoint_path or resume_from or run_cache is not None):
+        raise ValueError("Checkpoints and the run cache require a feed in 'columnar' replay mode.")
+    if mode != 'event' and (checkpoint_path or checkpoint_at is not None or resume_from):
+        raise ValueError("Checkpoint and resume are only supported in 'event' mode.")
+    if checkpoint_at is not None and not checkpoint_path:
+        raise ValueError("checkpoint_at needs a checkpoint_path to write to.")
+    if run_cache is not None and (checkpoint_path or resume_from):
+        raise ValueError("A run cache cannot be combined with checkpoint or resume.")
+
+    settings = app_config.snapshot()
+    if settings.telemetry:
+        telemetry.enable()
+    if initial_equity is None:
+        initial_equity = settings.initial_equity
+    broker = SimulatedBroker(commission_per_share, commission_min_per_order, slippage_pct)
+    symbols: List[str] = list(data_handler.columnar_data.keys() if columnar else data_handler.symbol_list)
+    strategy = STRATEGIES[strategy_name](symbols, data_feed=data_handler, params=params)
+
+    cache_key = None
+    if run_cache is not None:
+        cache_key = run_cache.make_key(data_handler.columnar_data, data_handler.column_map, strategy_name,
+                                       strategy.params, mode,
+                                       {'initial_equity': initial_equity,
+                                        'commission_per_share': broker.commission_per_share,
+                                        'commission_min_per_order': broker.commission_min_per_order,
+                                        'slippage_pct': broker.slippage_pct})
+        cached = run_cache.load(cache_key)
+        telemetry.count('backtest.cache_hits' if cached is not None else 'backtest.cache_misses')
+        if cached is not None:
+            if telemetry.enabled:
+                cached.telemetry = telemetry.snapshot(mode=mode, cached=True)
+            return cached
+        if results_dir is None:
+            results_dir = run_cache.entry_path(cache_key)
+
+    logger.info(f"Running {mode} backtest for {strategy.strategy_id} on {len(symbols)} symbol(s).")
+    with ResultsWriter(results_dir) if results_dir is not None else nullcontext() as writer:
+        result, extras = _run_engine(data_handler, strategy, broker, mode, initial_equity, params, profile,
+                                     profiler, workers, checkpoint_path, checkpoint_at, resume_from, writer)
+        with telemetry.timer('backtest.metrics'):
+            result.metrics = compute_metrics(result.equity_curve, result.fills, initial_equity,
+                                             data_handler.columnar_data if columnar else None,
+                                             data_handler.column_map)
+        if writer is not None:
+            if mode != 'event':
+                writer.append_result(result)
+            writer.close(result)
+    if cache_key is not None and Path(results_dir) != run_cache.entry_path(cache_key):
+        run_cache.store(cache_key, result)
+    if telemetry.enabled:
+        result.telemetry = telemetry.snapshot(mode=mode, **extras)
+    return result
+
+
+def _run_engine(data_handler: MarketDataFeed, strategy: BaseStrategy, broker: SimulatedBroker, mode: str,
+                initial_equity: float, params: Optional[Dict[str, Any]], profile: bool,
+                profiler: Optional[SliceProfiler], workers: Optional[int], checkpoint_path: Optional[Path],
+                checkpoint_at: Any, resume_from: Optional[Path],
+                writer: Optional[ResultsWriter]) -> Tuple[BacktestResult, Dict[str, Any]]:
+    strategy_name = type(strategy).__name__
+    extras: Dict[str, Any] = {}
+    if mode == 'vectorized':
+        if not strategy.supports_vectorized:
+            raise ValueError(f"Strategy '{strategy_name}' does not implement generate_target_positions().")
+        with telemetry.timer('backtest.vectorized'):
+            result = run_vectorized_backtest(data_handler.columnar_data, strategy, data_handler.column_map,
+                                             initial_equity, broker.commission_per_share,
+                                             broker.commission_min_per_order, broker.slippage_pct)
+        return result, extras
+    if mode == 'sharded':
+        if not strategy.supports_day_sharding:
+            raise ValueError(f"Strategy '{strategy_name}' does not implement prime() for day sharding.")
+        with telemetry.timer('backtest.sharded'):
+            result = run_sharded_backtest(data_handler.columnar_data, type(strategy), params, data_handler.column_map,
+                                          initial_equity, broker.commission_per_share,
+                                          broker.commission_min_per_order, broker.slippage_pct, max_workers=workers)
+        return result, extras
+
+    portfolio = Portfolio(list(strategy.symbol_list), initial_equity)
+    resume_after_ns = None
+    if resume_from:
+        checkpoint = BacktestCheckpoint.load(resume_from)
+        checkpoint.verify(data_handler, strategy, portfolio, broker)
+        strategy, portfolio, broker, _ = checkpoint.restore(data_handler)
+        resume_after_ns = checkpoint.as_of_ns
+        logger.info(f"Resuming from {resume_from} after {ns_to_datetime(resume_after_ns)}.")
+        if writer is not None:
+            # The store covers the whole run, including the part the checkpoint replayed.
+            for fill in portfolio.fills:
+                writer.append('fills', tuple(fill[col] for col in FILL_COLUMNS))
+            for dt, equity in portfolio.equity_curve.items():
+                writer.append('equity', (dt, equity))
+    checkpoint_at_ns = None
+    if checkpoint_path:
+        # Default: after the last bar, so a later run can pick up new data.
+        checkpoint_at_ns = (datetime_to_ns(checkpoint_at) if checkpoint_at is not None else
+                            max((int(b.timestamps[-1]) for b in data_handler.columnar_data.values() if len(b)),
+                                default=resume_after_ns or 0))
+        if resume_after_ns is not None and checkpoint_at_ns < resume_after_ns:
+            raise ValueError("checkpoint_at is before the checkpoint being resumed.")
+
+    def save_checkpoint():
+        with telemetry.timer('backtest.checkpoint'):
+            checkpoint = BacktestCheckpoint.capture(checkpoint_at_ns, data_handler, strategy, portfolio, broker)
+            checkpoint.save(checkpoint_path)
+        logger.info(f"Checkpoint at {ns_to_datetime(checkpoint_at_ns)} written to {checkpoint_path}")
+
+    bus = build_event_bus(strategy, portfolio, broker, profile=profile or telemetry.enabled, results=writer)
+    result = run_event_driven_backtest(data_handler, strategy, portfolio, broker, bus=bus, profiler=profiler,
+                                       resume_after_ns=resume_after_ns, checkpoint_at_ns=checkpoint_at_ns,
+                                       on_checkpoint=save_checkpoint)
+    if profile:
+        result.handler_profile = bus.profile_report()
+        logger.info(f"Handler profile:\n{result.handler_profile.to_string(index=False)}")
+    if telemetry.enabled:
+        extras = _replay_telemetry(bus)
+    return result, extras
+
+
+def export_results(result: BacktestResult, output_dir: Path):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if app_config.getboolean('Backtester', 'EXPORT_TRADE_LOG_CSV', True):
+        result.fills.to_csv(output_dir / 'trade_log.csv', index=False)
+    if app_config.getboolean('Backtester', 'EXPORT_PERFORMANCE_SUMMARY_JSON', True):
+        with open(output_dir / 'performance_summary.json', 'w', encoding='utf-8') as f:
+            json.dump(result.summary(), f, indent=2, default=str)
+    if result.telemetry is not None:
+        with open(output_dir / 'telemetry.json', 'w', encoding='utf-8') as f:
+            json.dump(result.telemetry, f, indent=2, default=str)
+    if result.handler_profile is not None:
+        result.handler_profile.to_csv(output_dir / 'handler_profile.csv', index=False)
+    logger.info(f"Backtest results written to {output_dir}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a CherryAlgo backtest.")
+    parser.add_argument('--strategy', default='example_momentum', choices=sorted(STRATEGIES))
+    parser.add_argument('--params', default='config/strategy_parameters/example_momentum_params.json')
+    parser.add_argument('--data', default='data/sample_market_data.csv', help="OHLCV bar CSV")
+    parser.add_argument('--symbols', default=None, help="Comma-separated tickers (defaults to [MarketData] DEFAULT_TICKERS)")
+    parser.add_argument('--symbol_column', default=None, help="Symbol column for multi-symbol CSVs")
+    parser.add_argument('--start_date', default=None)
+    parser.add_argument('--end_date', default=None)
+    parser.add_argument('--mode', default='event', choices=BACKTEST_MODES,
+                        help="'event' replays bar by bar; 'vectorized' evaluates whole columns for fast screening; "
+                             "'sharded' replays runs of sessions in parallel processes with the event-mode result")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes for --mode sharded (default: CPU count)")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Write the event-mode engine state here after the last bar (or at --checkpoint_at)")
+    parser.add_argument('--checkpoint_at', default=None, help="Timestamp (UTC unless it has an offset) to checkpoint at")
+    parser.add_argument('--resume', default=None,
+                        help="Resume an event-mode run from this checkpoint, replaying only later bars")
+    parser.add_argument('--results_store', action='store_true',
+                        help="Stream fills, equity and per-bar records to <output_dir>/results ([Backtester] RESULTS_STORE)")
+    parser.add_argument('--run_cache', action='store_true',
+                        help="Reuse identical finished runs from [Backtester] RUN_CACHE_DIR")
+    parser.add_argument('--bar_cache', action='store_true', help="Use the [MarketData] BAR_CACHE_DIR bar cache")
+    parser.add_argument('--profile_handlers', action='store_true',
+                        help="Time each event handler (event mode) and write handler_profile.csv")
+    parser.add_argument('--telemetry', action='store_true',
+                        help="Record run telemetry and write telemetry.json (also [Backtester] TELEMETRY)")
+    parser.add_argument('--profile_slice', default=None, choices=SliceProfiler.MODES,
+                        help="Profile a slice of the replay ([Backtester] PROFILE_START_EVENT/PROFILE_EVENTS)")
+    parser.add_argument('--output_dir', default=app_config.get('Backtester', 'OUTPUT_DIR', 'backtest_results/'))
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> BacktestResult:
+    args = parse_args(argv)
+    telemetry.enable(args.telemetry or app_config.snapshot().telemetry)
+    telemetry.reset()
+    profiler = SliceProfiler.from_config(args.profile_slice)
+    symbols = args.symbols.split(',') if args.symbols else app_config.get_list('MarketData', 'DEFAULT_TICKERS')
+    cache_dir = app_config.get('MarketData', 'BAR_CACHE_DIR', '.cache/bars/') if args.bar_cache else None
+    data_handler = CSVDataHandler(args.data, symbols, start_date=args.start_date, end_date=args.end_date,
+                                  symbol_column=args.symbol_column, cache_dir=cache_dir)
+    results_dir = None
+    if args.results_store or app_config.getboolean('Backtester', 'RESULTS_STORE', False):
+        results_dir = Path(args.output_dir) / 'results'
+    run_cache = RunCache(app_config.get('Backtester', 'RUN_CACHE_DIR', '.cache/runs/')) if args.run_cache else None
+    result = run_backtest(data_handler, args.strategy, load_params(args.params), mode=args.mode,
+                          profile=args.profile_handlers, profiler=profiler, workers=args.workers,
+                          checkpoint_path=args.checkpoint, checkpoint_at=args.checkpoint_at, resume_from=args.resume,
+                          results_dir=results_dir, run_cache=run_cache)
+    export_results(result, Path(args.output_dir))
+    profiler.write(args.output_dir)
+    logger.info(f"Summary: {result.summary()}")
+    return result
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..core.results_store import RunCache, bars_digest
+from ..data_mgt.array_data_handler import ArrayDataHandler
+from ..data_mgt.columnar_bars import ColumnarBars, ns_to_datetime
+from ..data_mgt.data_handler import CSVDataHandler
+from ..data_mgt.shared_bars import SharedBarStore
+from ..main_backtest_runner import run_backtest
+from ..utils.config_loader import app_config
+from ..utils.logging_setup import disable_logging, logger
+
+RUNS_FILE_NAME = 'runs.jsonl'
+SWEEP_MODES = ('event', 'vectorized')  # sweeps already run in parallel across parameter sets
+WALK_FORWARD_FILE_NAME = 'walk_forward.json'
+
+Window = Optional[Tuple[int, int]]  # inclusive (start_ns, end_ns); None means the full history
+
+
+def expand_parameter_grid(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # List-valued keys are grid axes; scalars are held fixed.
+    axes = [(key, value) for key, value in spec.items() if isinstance(value, list)]
+    fixed = {key: value for key, value in spec.items() if not isinstance(value, list)}
+    if not axes:
+        return [dict(fixed)]
+    keys = [key for key, _ in axes]
+    return [{**fixed, **dict(zip(keys, combo))} for combo in itertools.product(*(values for _, values in axes))]
+
+
+def load_parameter_grid(paths: Iterable[Union[str, Path]]) -> List[Dict[str, Any]]:
+    param_sets: List[Dict[str, Any]] = []
+    seen = set()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        for params in expand_parameter_grid(spec):
+            key = json.dumps(params, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                param_sets.append(params)
+    return param_sets
+
+
+def walk_forward_windows(timeline: np.ndarray, n_folds: int = 1,
+                         in_sample_fraction: float = 0.3) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Split the bar timeline into consecutive folds of (in-sample, out-of-sample) windows.
+
+    Each fold covers an equal share of the unique timestamps; its first
+    `in_sample_fraction` is used to pick parameters and the remainder to test them.
+    """
+    if not 0 < in_sample_fraction < 1:
+        raise ValueError("in_sample_fraction must be between 0 and 1.")
+    timeline = np.unique(np.asarray(timeline, dtype=np.int64))
+    bounds = np.linspace(0, timeline.size, n_folds + 1).astype(int)
+    windows = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        split = lo + int((hi - lo) * in_sample_fraction)
+        if split <= lo or split >= hi:
+            raise ValueError(f"Fold [{lo}, {hi}) has too few bars for a {in_sample_fraction:.0%} in-sample split.")
+        windows.append(((int(timeline[lo]), int(timeline[split - 1])), (int(timeline[split]), int(timeline[hi - 1]))))
+    return windows
+
+
+def run_key(settings: Dict[str, Any], data_digest: str, params: Dict[str, Any], window: Window) -> str:
+    """Id of one run in runs.jsonl: sweep settings (costs, equity, mode), bars, params and window.
+
+    The config snapshot and cache location don't change a run's result and
+    are left out.
+    """
+    payload = json.dumps({'settings': {k: v for k, v in settings.items() if k not in ('config', 'run_cache_dir')},
+                          'data': data_digest, 'params': params,
+                          'window': list(window) if window else None}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def slice_bars(bars_by_symbol: Dict[str, ColumnarBars], window: Window) -> Dict[str, ColumnarBars]:
+    if window is None:
+        return bars_by_symbol
+    sliced = {}
+    for symbol, bars in bars_by_symbol.items():
+        lo, hi = bars.index_range(*window)
+        if hi > lo:
+            sliced[symbol] = bars.slice(lo, hi)
+    return sliced
+
+
+# Worker-process state, set once per process by _init_worker.
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(manifest: Dict[str, Any], settings: Dict[str, Any]):
+    disable_logging()  # per-run INFO lines from every worker would swamp the parent's log
+    app_config.use_snapshot(settings['config'])  # no settings.ini lookup or parse per worker
+    _WORKER['store'] = SharedBarStore.attach(manifest)
+    _WORKER['settings'] = settings
+
+
+def _evaluate(bars_by_symbol: Dict[str, ColumnarBars], settings: Dict[str, Any],
+              params: Dict[str, Any], window: Window) -> Dict[str, Any]:
+    handler = ArrayDataHandler(slice_bars(bars_by_symbol, window), settings['column_map'])
+    result = run_backtest(handler, settings['strategy_name'], params, mode=settings['mode'],
+                          initial_equity=settings['initial_equity'],
+                          commission_per_share=settings['commission_per_share'],
+                          commission_min_per_order=settings['commission_min_per_order'],
+                          slippage_pct=settings['slippage_pct'],
+                          run_cache=RunCache(settings['run_cache_dir']) if settings['run_cache_dir'] else None)
+    return result.summary()
+
+
+def _complete_task(task: Dict[str, Any], bars_by_symbol: Dict[str, ColumnarBars], settings: Dict[str, Any]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    window = tuple(task['window']) if task['window'] else None
+    summary = _evaluate(bars_by_symbol, settings, task['params'], window)
+    return {**task, 'summary': summary, 'elapsed_sec': time.perf_counter() - t0, 'pid': os.getpid()}
+
+
+def _run_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    return _complete_task(task, _WORKER['store'].bars, _WORKER['settings'])
+
+
+class ParameterSweep:
+    """Fans backtests for a parameter grid out over a process pool.
+
+    Bars are published once into shared memory; workers attach to the block
+    instead of receiving pickled frames. Each finished run is appended to
+    `<output_dir>/runs.jsonl` as it completes, and runs already recorded there
+    are skipped, so an interrupted sweep resumes where it stopped; a run's id
+    covers the bars and cost settings too, so a changed dataset or cost model
+    in the same directory is rerun rather than reused. With
+    `run_cache_dir` finished runs are also kept in a RunCache, so other sweeps
+    over the same bars, parameters and settings reuse them.
+    """
+
+    def __init__(self, bars_by_symbol: Dict[str, ColumnarBars],
+                 column_map: Dict[str, str],
+                 output_dir: Union[str, Path],
+                 strategy_name: str = 'example_momentum',
+                 mode: str = 'vectorized',
+                 max_workers: Optional[int] = None,
+                 initial_equity: Optional[float] = None,
+                 commission_per_share: Optional[float] = None,
+                 commission_min_per_order: Optional[float] = None,
+                 slippage_pct: Optional[float] = None,
+                 run_cache_dir: Optional[Union[str, Path]] = None):
+        if mode not in SWEEP_MODES:
+            raise ValueError(f"Unknown sweep mode '{mode}'. Expected one of {SWEEP_MODES}.")
+        self.bars_by_symbol = bars_by_symbol
+        self.output_dir = Path(output_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Resolved here so every worker uses identical settings without re-reading config.
+        config = app_config.snapshot()
+        self.settings: Dict[str, Any] = {
+            'strategy_name': strategy_name,
+            'mode': mode,
+            'column_map': dict(column_map),
+            'config': config,
+            'initial_equity': initial_equity if initial_equity is not None else config.initial_equity,
+            'commission_per_share': commission_per_share if commission_per_share is not None else
+                config.commission_per_share,
+            'commission_min_per_order': commission_min_per_order if commission_min_per_order is not None else
+                config.commission_min_per_order,
+            'slippage_pct': slippage_pct if slippage_pct is not None else config.slippage_pct,
+            'run_cache_dir': str(run_cache_dir) if run_cache_dir else None,
+        }
+        self.data_digest = bars_digest(bars_by_symbol, self.settings['column_map'])
+
+    @property
+    def runs_path(self) -> Path:
+        return self.output_dir / RUNS_FILE_NAME
+
+    def completed_runs(self) -> Dict[str, Dict[str, Any]]:
+        done: Dict[str, Dict[str, Any]] = {}
+        if not self.runs_path.exists():
+            return done
+        with open(self.runs_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from an interrupted write
+                done[record['run_id']] = record
+        return done
+
+    def _terminate_torn_line(self):
+        # An interrupted write can leave a final line without its newline; close
+        # it off so the next record starts on a line of its own.
+        if not self.runs_path.exists() or self.runs_path.stat().st_size == 0:
+            return
+        with open(self.runs_path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    def _append(self, record: Dict[str, Any]):
+        with open(self.runs_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def run(self, param_sets: List[Dict[str, Any]], window: Window = None, label: str = 'sweep') -> List[Dict[str, Any]]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._terminate_torn_line()
+        done = self.completed_runs()
+        run_ids, tasks, records = [], [], {}
+        for params in param_sets:
+            run_id = run_key(self.settings, self.data_digest, params, window)
+            if run_id in done:
+                records[run_id] = done[run_id]
+            elif run_id not in run_ids:
+                tasks.append({'run_id': run_id, 'label': label, 'params': params,
+                              'window': list(window) if window else None})
+            run_ids.append(run_id)
+        if records:
+            logger.info(f"{label}: {len(records)} run(s) already in {self.runs_path}, {len(tasks)} to go.")
+        if tasks:
+            for record in self._execute(tasks, label):
+                records[record['run_id']] = record
+        # Grid order, whichever order the runs finished in.
+        return [records[run_id] for run_id in run_ids]
+
+    def _execute(self, tasks: List[Dict[str, Any]], label: str) -> Iterator[Dict[str, Any]]:
+        if self.max_workers == 1:
+            for task in tasks:
+                record = _complete_task(task, self.bars_by_symbol, self.settings)
+                self._append(record)
+                yield record
+            return
+
+        with self.worker_pool() as pool:
+            futures = [pool.submit(_run_task, task) for task in tasks]
+            for n, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                self._append(record)
+                logger.info(f"{label}: {n}/{len(tasks)} done (run {record['run_id']}, {record['elapsed_sec']:.2f}s)")
+                yield record
+
+    @contextmanager
+    def worker_pool(self) -> Iterator[ProcessPoolExecutor]:
+        # Reentrant: nested run() calls (e.g. every walk-forward fold) reuse one
+        # pool and one shared-memory publication.
+        if self._pool is not None:
+            yield self._pool
+            return
+        with SharedBarStore() as store:
+            manifest = store.publish(self.bars_by_symbol)
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(manifest, self.settings)) as pool:
+                self._pool = pool
+                try:
+                    yield pool
+                finally:
+                    self._pool = None
+
+    def walk_forward(self, param_sets: List[Dict[str, Any]], n_folds: int = 1,
+                     in_sample_fraction: float = 0.3, objective: str = 'total_return_pct') -> List[Dict[str, Any]]:
+        timeline = np.concatenate([bars.timestamps for bars in self.bars_by_symbol.values()])
+        windows = walk_forward_windows(timeline, n_folds, in_sample_fraction)
+        if self.max_workers > 1:
+            with self.worker_pool():
+                return self._walk_forward(param_sets, windows, objective)
+        return self._walk_forward(param_sets, windows, objective)
+
+    def _walk_forward(self, param_sets: List[Dict[str, Any]], windows: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                      objective: str) -> List[Dict[str, Any]]:
+        folds = []
+        for fold, (in_sample, out_of_sample) in enumerate(windows):
+            in_sample_runs = self.run(param_sets, in_sample, label=f"fold{fold}-in_sample")
+            best = max(in_sample_runs, key=lambda r: (r['summary'].get(objective) is not None,
+                                                      r['summary'].get(objective) or 0.0))
+            oos_run = self.run([best['params']], out_of_sample, label=f"fold{fold}-out_of_sample")[0]
+            folds.append({
+                'fold': fold,
+                'in_sample': [ns_to_datetime(t).isoformat() for t in in_sample],
+                'out_of_sample': [ns_to_datetime(t).isoformat() for t in out_of_sample],
+                'objective': objective,
+                'best_params': best['params'],
+                'in_sample_summary': best['summary'],
+                'out_of_sample_summary': oos_run['summary'],
+            })
+        with open(self.output_dir / WALK_FORWARD_FILE_NAME, 'w', encoding='utf-8') as f:
+            json.dump(folds, f, indent=2, default=str)
+        return folds
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parameter sweep / walk-forward optimisation over a process pool.")
+    parser.add_argument('--strategy', default='example_momentum')
+    parser.add_argument('--grid', nargs='+', default=None,
+                        help="Parameter JSON files; list values are grid axes (default: [StrategyGlobal] STRATEGY_CONFIG_DIR/*.json)")
+    parser.add_argument('--data', default='data/sample_market_data.csv')
+    parser.add_argument('--symbols', default=None)
+    parser.add_argument('--symbol_column', default=None)
+    parser.add_argument('--start_date', default=None)
+    parser.add_argument('--end_date', default=None)
+    parser.add_argument('--mode', default='vectorized', choices=SWEEP_MODES)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--walk_forward_folds', type=int, default=0, help="0 runs a plain sweep over the full history")
+    parser.add_argument('--in_sample_fraction', type=float, default=0.3)
+    parser.add_argument('--objective', default='total_return_pct')
+    parser.add_argument('--run_cache', action='store_true',
+                        help="Reuse finished runs from [Backtester] RUN_CACHE_DIR across sweeps")
+    parser.add_argument('--output_dir', default=str(Path(app_config.get('Backtester', 'OUTPUT_DIR', 'backtest_results/')) / 'sweep'))
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    grid_paths = args.grid or sorted(glob.glob(str(Path(app_config.get('StrategyGlobal', 'STRATEGY_CONFIG_DIR', 'config/strategy_parameters/')) / '*.json')))
+    param_sets = load_parameter_grid(grid_paths)
+    symbols = args.symbols.split(',') if args.symbols else app_config.get_list('MarketData', 'DEFAULT_TICKERS')
+    handler = CSVDataHandler(args.data, symbols, start_date=args.start_date, end_date=args.end_date,
+                             symbol_column=args.symbol_column)
+    sweep = ParameterSweep(handler.columnar_data, handler.column_map, args.output_dir,
+                           strategy_name=args.strategy, mode=args.mode, max_workers=args.workers,
+                           run_cache_dir=app_config.get('Backtester', 'RUN_CACHE_DIR', '.cache/runs/')
+                           if args.run_cache else None)
+    logger.info(f"{len(param_sets)} parameter set(s) from {len(grid_paths)} file(s).")
+    if args.walk_forward_folds > 0:
+        return sweep.walk_forward(param_sets, args.walk_forward_folds, args.in_sample_fraction, args.objective)
+    return sweep.run(param_sets)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,272 @@
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
+
+from ..core.event import Event, EventType, FillEvent, MarketBarEvent
+from ..data_mgt.columnar_bars import ColumnarBars, datetime_to_ns
+
+ROUND_TRIP_COLUMNS = ['symbol', 'entry_datetime', 'exit_datetime', 'quantity', 'entry_price',
+                      'pnl', 'mfe_pct', 'mae_pct']
+
+
+def _finalize(initial_equity: float, equity: float, periods_per_year: float,
+              n: int, mean: float, m2: float, downside_sq: float,
+              max_drawdown: float, current_drawdown: float,
+              trades: int, wins: int, gross_profit: float, gross_loss: float,
+              sum_mfe: float, sum_mae: float) -> Dict[str, Any]:
+    # Shared by the streaming and batch paths so both report identical formulas.
+    std = math.sqrt(m2 / (n - 1)) if n > 1 else None
+    downside = math.sqrt(downside_sq / n) if n else None
+    scale = math.sqrt(periods_per_year)
+    losses = trades - wins
+    return {
+        'equity': equity,
+        'total_return_pct': (equity / initial_equity - 1) * 100,
+        'periods': n,
+        'mean_return': mean if n else None,
+        'std_return': std,
+        'sharpe_ratio': mean / std * scale if std else None,
+        'sortino_ratio': mean / downside * scale if downside else None,
+        'max_drawdown_pct': max_drawdown * 100,
+        'current_drawdown_pct': current_drawdown * 100,
+        'num_trades': trades,
+        'win_rate': wins / trades if trades else None,
+        'avg_win': gross_profit / wins if wins else None,
+        'avg_loss': -gross_loss / losses if losses else None,
+        'expectancy': (gross_profit - gross_loss) / trades if trades else None,
+        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else None,
+        'avg_mfe_pct': sum_mfe / trades * 100 if trades else None,
+        'avg_mae_pct': sum_mae / trades * 100 if trades else None,
+    }
+
+
+class _OpenTrade:
+    __slots__ = ("entry_datetime", "quantity", "max_quantity", "buy_quantity", "buy_cost", "net_cash", "high", "low")
+
+    def __init__(self, entry_datetime: datetime, price: float):
+        self.entry_datetime = entry_datetime
+        self.quantity = 0.0
+        self.max_quantity = 0.0
+        self.buy_quantity = 0.0
+        self.buy_cost = 0.0
+        self.net_cash = 0.0
+        self.high = price
+        self.low = price
+
+    def apply_fill(self, direction: str, quantity: float, price: float, commission: float):
+        if direction == 'BUY':
+            self.quantity += quantity
+            self.buy_quantity += quantity
+            self.buy_cost += quantity * price
+            self.net_cash -= quantity * price + commission
+            self.max_quantity = max(self.max_quantity, self.quantity)
+        else:
+            self.quantity -= quantity
+            self.net_cash += quantity * price - commission
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+
+    def close(self, exit_datetime: datetime) -> Dict[str, Any]:
+        entry_price = self.buy_cost / self.buy_quantity
+        return {
+            'entry_datetime': self.entry_datetime,
+            'exit_datetime': exit_datetime,
+            'quantity': self.max_quantity,
+            'entry_price': entry_price,
+            'pnl': self.net_cash,
+            'mfe_pct': self.high / entry_price - 1,
+            'mae_pct': 1 - self.low / entry_price,
+        }
+
+
+def round_trips(fills: pd.DataFrame,
+                bars_by_symbol: Optional[Dict[str, ColumnarBars]] = None,
+                column_map: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Closed flat -> long -> flat trades in a fills frame, in closing order.
+
+    P&L is net of the commissions on every leg. Excursions cover the fill
+    prices plus, when bars are given, the high/low of the symbol's bars from
+    the entry bar up to (not including) the exit bar, which is what the
+    streaming accumulator sees in the event loop.
+    """
+    if fills.empty:
+        return pd.DataFrame(columns=ROUND_TRIP_COLUMNS)
+    column_map = column_map or {'high': 'high', 'low': 'low', 'close': 'close'}
+    ordered = fills.sort_values('datetime', kind='stable')
+    open_trades: Dict[str, _OpenTrade] = {}
+    rows: List[Dict[str, Any]] = []
+    for dt, symbol, direction, quantity, price, commission in ordered[
+            ['datetime', 'symbol', 'direction', 'quantity', 'fill_price', 'commission']].itertuples(index=False):
+        trade = open_trades.get(symbol)
+        if trade is None:
+            trade = open_trades[symbol] = _OpenTrade(dt, price)
+        trade.apply_fill(direction, quantity, price, commission)
+        if trade.quantity == 0:
+            del open_trades[symbol]
+            bars = bars_by_symbol.get(symbol) if bars_by_symbol else None
+            if bars is not None:
+                lo, hi = np.searchsorted(bars.timestamps, [datetime_to_ns(trade.entry_datetime),
+                                                           datetime_to_ns(dt)], side='left')
+                if hi > lo:
+                    highs = bars.get_column(column_map.get('high', 'high'))
+                    lows = bars.get_column(column_map.get('low', 'low'))
+                    if highs is None or lows is None:
+                        highs = lows = bars.get_column(column_map.get('close', 'close'))
+                    if highs is not None:
+                        trade.high = max(trade.high, float(np.max(highs[lo:hi])))
+                        trade.low = min(trade.low, float(np.min(lows[lo:hi])))
+            rows.append({'symbol': symbol, **trade.close(dt)})
+    return pd.DataFrame(rows, columns=ROUND_TRIP_COLUMNS)
+
+
+def compute_metrics(equity_curve: pd.Series, fills: pd.DataFrame, initial_equity: float,
+                    bars_by_symbol: Optional[Dict[str, ColumnarBars]] = None,
+                    column_map: Optional[Dict[str, str]] = None,
+                    periods_per_year: float = 252) -> Dict[str, Any]:
+    """End-of-run metrics from a full equity curve and fill log.
+
+    Agrees with `StreamingMetrics.snapshot()` fed the same run, to
+    floating-point tolerance.
+    """
+    equity = equity_curve.to_numpy(dtype=float)
+    n = equity.size
+    if n:
+        path = np.concatenate(([initial_equity], equity))
+        returns = path[1:] / path[:-1] - 1
+        mean = float(returns.mean())
+        m2 = float(((returns - mean) ** 2).sum())
+        downside_sq = float((np.minimum(returns, 0.0) ** 2).sum())
+        peak = np.maximum.accumulate(path)
+        drawdown = (peak - path) / peak
+        max_drawdown, current_drawdown = float(drawdown.max()), float(drawdown[-1])
+        last = float(equity[-1])
+    else:
+        mean = m2 = downside_sq = max_drawdown = current_drawdown = 0.0
+        last = float(initial_equity)
+
+    trades = round_trips(fills, bars_by_symbol, column_map)
+    pnl = trades['pnl'].to_numpy(dtype=float)
+    return _finalize(float(initial_equity), last, periods_per_year, n, mean, m2, downside_sq,
+                     max_drawdown, current_drawdown,
+                     int(pnl.size), int((pnl > 0).sum()), float(pnl[pnl > 0].sum()), float(-pnl[pnl <= 0].sum()),
+                     float(trades['mfe_pct'].sum()), float(trades['mae_pct'].sum()))
+
+
+class StreamingMetrics:
+    """Constant-time performance metrics for live dashboards and long runs.
+
+    Feed it FILL events (`on_fill`), MARKET bars (`on_bar`, for trade
+    excursions) and portfolio equity updates (`on_equity`), or everything via
+    `on_event`. Returns use Welford moments and drawdown a running peak.
+    Several equity updates for one timestamp (one per symbol bar) collapse to
+    the last, matching the portfolio's equity curve; the latest timestamp stays
+    provisional until the next one arrives, and `snapshot()` folds it in
+    without committing it, so snapshots are O(1) and can be taken every bar.
+    """
+
+    def __init__(self, initial_equity: float, periods_per_year: float = 252):
+        self.initial_equity = float(initial_equity)
+        self.periods_per_year = periods_per_year
+
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0
+        self._last_equity = self.initial_equity
+        self._peak = self.initial_equity
+        self._max_drawdown = 0.0
+        self._pending_dt: Optional[datetime] = None
+        self._pending_equity: Optional[float] = None
+
+        self._trades = 0
+        self._wins = 0
+        self._gross_profit = 0.0
+        self._gross_loss = 0.0
+        self._sum_mfe = 0.0
+        self._sum_mae = 0.0
+        self._open: Dict[str, _OpenTrade] = {}
+
+    # ----------------------------------------------------------------- equity
+    @staticmethod
+    def _welford(n: int, mean: float, m2: float, x: float):
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        return n, mean, m2
+
+    def _commit(self, equity: float):
+        r = equity / self._last_equity - 1
+        self._n, self._mean, self._m2 = self._welford(self._n, self._mean, self._m2, r)
+        if r < 0:
+            self._downside_sq += r * r
+        self._last_equity = equity
+        if equity > self._peak:
+            self._peak = equity
+        self._max_drawdown = max(self._max_drawdown, (self._peak - equity) / self._peak)
+
+    def on_equity(self, dt: datetime, equity: float):
+        if dt != self._pending_dt and self._pending_dt is not None:
+            self._commit(self._pending_equity)
+        self._pending_dt = dt
+        self._pending_equity = float(equity)
+
+    # ----------------------------------------------------------------- trades
+    def on_fill(self, fill: FillEvent):
+        trade = self._open.get(fill.symbol)
+        if trade is None:
+            trade = self._open[fill.symbol] = _OpenTrade(fill.datetime, fill.fill_price)
+        trade.apply_fill(fill.direction, fill.quantity, fill.fill_price, fill.commission)
+        if trade.quantity == 0:
+            del self._open[fill.symbol]
+            closed = trade.close(fill.datetime)
+            pnl = closed['pnl']
+            self._trades += 1
+            if pnl > 0:
+                self._wins += 1
+                self._gross_profit += pnl
+            else:
+                self._gross_loss -= pnl
+            self._sum_mfe += closed['mfe_pct']
+            self._sum_mae += closed['mae_pct']
+
+    def on_bar(self, bar: MarketBarEvent):
+        trade = self._open.get(bar.symbol)
+        if trade is None:
+            return
+        high = bar.high if bar.high is not None else bar.close
+        low = bar.low if bar.low is not None else bar.close
+        if high is not None and high > trade.high:
+            trade.high = high
+        if low is not None and low < trade.low:
+            trade.low = low
+
+    def on_event(self, event: Event):
+        if event.type == EventType.FILL:
+            self.on_fill(event)
+        elif event.type == EventType.MARKET:
+            self.on_bar(event)
+        elif event.type == EventType.PORTFOLIO_UPDATE:
+            self.on_equity(event.datetime, event.equity)
+
+    # --------------------------------------------------------------- snapshot
+    def snapshot(self) -> Dict[str, Any]:
+        n, mean, m2, downside_sq = self._n, self._mean, self._m2, self._downside_sq
+        equity, peak, max_drawdown = self._last_equity, self._peak, self._max_drawdown
+        current_drawdown = (peak - equity) / peak
+        if self._pending_dt is not None:
+            equity = self._pending_equity
+            r = equity / self._last_equity - 1
+            n, mean, m2 = self._welford(n, mean, m2, r)
+            if r < 0:
+                downside_sq += r * r
+            peak = max(peak, equity)
+            current_drawdown = (peak - equity) / peak
+            max_drawdown = max(max_drawdown, current_drawdown)
+        return _finalize(self.initial_equity, equity, self.periods_per_year, n, mean, m2, downside_sq,
+                         max_drawdown, current_drawdown,
+                         self._trades, self._wins, self._gross_profit, self._gross_loss,
+                         self._sum_mfe, self._sum_mae)
@@ -1 +1,88 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+
+from ..core.event import FillEvent, MarketBarEvent, OrderEvent, SignalEvent
+from .position import Position
+from .position_ledger import PositionLedger
+from ..utils.logging_setup import logger
+
+
+class Portfolio:
+    def __init__(self, symbol_list: List[str], initial_equity: float):
+        self.symbol_list = [s.upper() for s in symbol_list]
+        self.initial_equity = float(initial_equity)
+        self.cash: float = float(initial_equity)
+        # Position state lives in the ledger's arrays; `positions` holds views.
+        # Ledger ids follow the feed's symbol order and equity sums follow them.
+        self.ledger = PositionLedger(self.symbol_list)
+        self.positions: Dict[str, Position] = OrderedDict((s, Position(s, self.ledger)) for s in self.symbol_list)
+        self.equity_curve: Dict[datetime, float] = {}
+        self.fills: List[Dict[str, Any]] = []
+        self.current_datetime: Optional[datetime] = None
+
+    def _position(self, symbol: str) -> Position:
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = Position(symbol, self.ledger)
+        return position
+
+    def on_signal(self, signal: SignalEvent) -> Optional[OrderEvent]:
+        position = self._position(signal.symbol)
+        if signal.signal_type == 'LONG' and not position.is_open:
+            if not signal.quantity:
+                logger.warning(f"LONG signal for {signal.symbol} at {signal.datetime} has no quantity; ignored.")
+                return None
+            return OrderEvent(signal.symbol, signal.datetime, 'MKT', 'BUY', signal.quantity)
+        if signal.signal_type == 'EXIT' and position.quantity > 0:
+            return OrderEvent(signal.symbol, signal.datetime, 'MKT', 'SELL', position.quantity)
+        return None
+
+    def on_fill(self, fill: FillEvent):
+        self.ledger.apply_fill(self._position(fill.symbol)._id, fill.direction, fill.quantity,
+                               fill.fill_price, fill.commission)
+        if fill.direction == 'BUY':
+            self.cash -= fill.fill_price * fill.quantity + fill.commission
+        else:
+            self.cash += fill.fill_price * fill.quantity - fill.commission
+        self.fills.append({
+            'datetime': fill.datetime,
+            'symbol': fill.symbol,
+            'direction': fill.direction,
+            'quantity': fill.quantity,
+            'fill_price': fill.fill_price,
+            'commission': fill.commission,
+        })
+
+    def update_timeindex(self, bar: MarketBarEvent):
+        if bar.close is not None:
+            self.ledger.mark(self._position(bar.symbol)._id, bar.close, bar.high, bar.low)
+        self.current_datetime = bar.datetime
+        self.equity_curve[bar.datetime] = self.total_equity
+
+    def mark_to_market(self, dt: datetime, symbols: List[str], closes: np.ndarray,
+                       highs: Optional[np.ndarray] = None, lows: Optional[np.ndarray] = None):
+        """Vectorised update_timeindex for all bars sharing one timestamp."""
+        ids = np.fromiter((self._position(s)._id for s in symbols), dtype=np.intp, count=len(symbols))
+        self.ledger.mark_many(ids, closes, highs, lows)
+        self.current_datetime = dt
+        self.equity_curve[dt] = self.total_equity
+
+    @property
+    def last_close(self) -> Dict[str, float]:
+        ledger = self.ledger
+        return {ledger.symbols[i]: float(ledger.last_price[i]) for i in np.flatnonzero(ledger.has_price[:len(ledger)])}
+
+    @property
+    def holdings_value(self) -> float:
+        return self.ledger.holdings_value()
+
+    @property
+    def total_equity(self) -> float:
+        return self.cash + self.holdings_value
+
+    def open_positions(self) -> Dict[str, float]:
+        quantity = self.ledger.quantity
+        return {self.ledger.symbols[i]: float(quantity[i]) for i in self.ledger.open_ids()}
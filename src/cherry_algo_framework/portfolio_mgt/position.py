@@ -1 +1,64 @@
+from typing import Optional
 
+from .position_ledger import PositionLedger
+
+
+class Position:
+    """View of one symbol's row in a PositionLedger.
+
+    Strategy and portfolio code keep the attribute interface of a per-object
+    position while the state itself lives in the ledger's arrays. Constructed
+    without a ledger, it gets a private one-row ledger.
+    """
+
+    __slots__ = ("symbol", "_ledger", "_id")
+
+    def __init__(self, symbol: str, ledger: Optional[PositionLedger] = None):
+        self.symbol = symbol
+        self._ledger = ledger if ledger is not None else PositionLedger(capacity=1)
+        self._id = self._ledger.symbol_id(symbol)
+
+    @property
+    def quantity(self) -> float:
+        return float(self._ledger.quantity[self._id])
+
+    @property
+    def avg_cost(self) -> float:
+        return float(self._ledger.avg_cost[self._id])
+
+    @property
+    def realized_pnl(self) -> float:
+        return float(self._ledger.realized_pnl[self._id])
+
+    @property
+    def total_commission(self) -> float:
+        return float(self._ledger.total_commission[self._id])
+
+    @property
+    def mfe(self) -> float:
+        # Best unrealised P&L since entry; 0 when flat.
+        ledger, i = self._ledger, self._id
+        return float((ledger.max_price[i] - ledger.avg_cost[i]) * ledger.quantity[i]) if self.is_open else 0.0
+
+    @property
+    def mae(self) -> float:
+        ledger, i = self._ledger, self._id
+        return float((ledger.avg_cost[i] - ledger.min_price[i]) * ledger.quantity[i]) if self.is_open else 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._ledger.quantity[self._id] != 0
+
+    def market_value(self, price: Optional[float]) -> float:
+        return self.quantity * price if price is not None else 0.0
+
+    def unrealized_pnl(self, price: Optional[float]) -> float:
+        if price is None or self.quantity == 0:
+            return 0.0
+        return (price - self.avg_cost) * self.quantity
+
+    def apply_fill(self, direction: str, quantity: float, price: float, commission: float):
+        self._ledger.apply_fill(self._id, direction, quantity, price, commission)
+
+    def __repr__(self) -> str:
+        return f"Position(symbol={self.symbol}, quantity={self.quantity}, avg_cost={self.avg_cost:.4f})"
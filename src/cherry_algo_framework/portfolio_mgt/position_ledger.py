@@ -0,0 +1,148 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_FIELDS = (("quantity", np.float64), ("avg_cost", np.float64), ("realized_pnl", np.float64),
+           ("total_commission", np.float64), ("last_price", np.float64), ("has_price", np.bool_),
+           ("max_price", np.float64), ("min_price", np.float64))
+
+
+class PositionLedger:
+    """Struct-of-arrays store for every position in a portfolio.
+
+    Each symbol gets a dense integer id (in registration order) and its state
+    lives in parallel arrays indexed by that id, so marking the whole
+    book to market, valuing it and scanning open positions (e.g. for trailing
+    stops) are array operations instead of a loop over objects.
+
+    `max_price` / `min_price` track the best and worst price seen since the
+    position was opened (fills and marks), from which MFE / MAE follow.
+    Arrays are reallocated when the universe outgrows them, so callers should
+    index through the ledger rather than hold on to an array.
+
+    The holdings total and the open ids are cached: marking a flat symbol
+    leaves both as they are, and the total is re-summed over open positions
+    only after a fill or a mark of a held symbol, so per-bar valuation does
+    not scale with the size of the universe.
+    """
+
+    def __init__(self, symbols: Optional[List[str]] = None, capacity: int = 16):
+        self.symbols: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._capacity = 0
+        self._holdings: Optional[float] = 0.0  # cached holdings_value(); None when stale
+        self._open: Optional[np.ndarray] = None  # cached open_ids(); None when stale
+        self._grow(max(capacity, len(symbols or ())))
+        for symbol in symbols or ():
+            self.symbol_id(symbol)
+
+    def _grow(self, capacity: int):
+        size = len(self.symbols)
+        for name, dtype in _FIELDS:
+            arr = np.zeros(capacity, dtype=dtype)
+            if size:
+                arr[:size] = getattr(self, name)[:size]
+            setattr(self, name, arr)
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def symbol_id(self, symbol: str) -> int:
+        sid = self.ids.get(symbol)
+        if sid is None:
+            sid = len(self.symbols)
+            if sid == self._capacity:
+                self._grow(2 * self._capacity)
+            self.symbols.append(symbol)
+            self.ids[symbol] = sid
+        return sid
+
+    # ------------------------------------------------------------------ fills
+    def apply_fill(self, sid: int, direction: str, quantity: float, price: float, commission: float):
+        # Long-only bookkeeping: buys average in, sells realise against avg_cost.
+        self.total_commission[sid] += commission
+        held = float(self.quantity[sid])
+        if direction == 'BUY':
+            new_qty = held + quantity
+            self.avg_cost[sid] = (float(self.avg_cost[sid]) * held + price * quantity) / new_qty
+            self.quantity[sid] = new_qty
+            if held == 0:
+                self.max_price[sid] = self.min_price[sid] = price
+        elif direction == 'SELL':
+            if quantity > held:
+                raise ValueError(f"Cannot sell {quantity} {self.symbols[sid]}; only {held} held.")
+            self.realized_pnl[sid] += (price - float(self.avg_cost[sid])) * quantity
+            self.quantity[sid] = held - quantity
+            if held - quantity == 0:
+                self.avg_cost[sid] = 0.0
+        else:
+            raise ValueError(f"Unknown fill direction '{direction}'.")
+        self._holdings = None
+        if (held == 0) != (self.quantity[sid] == 0):
+            self._open = None
+        self._touch(sid, price, price)
+
+    def _touch(self, sid: int, high: float, low: float):
+        if high > self.max_price[sid]:
+            self.max_price[sid] = high
+        if low < self.min_price[sid]:
+            self.min_price[sid] = low
+
+    # ---------------------------------------------------------- mark to market
+    def mark(self, sid: int, price: float, high: Optional[float] = None, low: Optional[float] = None):
+        self.last_price[sid] = price
+        self.has_price[sid] = True
+        if self.quantity[sid] != 0:
+            self._holdings = None
+            self._touch(sid, price if high is None else high, price if low is None else low)
+
+    def mark_many(self, ids: np.ndarray, prices: np.ndarray,
+                  highs: Optional[np.ndarray] = None, lows: Optional[np.ndarray] = None):
+        """Vectorised `mark` for a set of distinct symbol ids (e.g. one timestamp)."""
+        ids = np.asarray(ids, dtype=np.intp)
+        prices = np.asarray(prices, dtype=float)
+        self.last_price[ids] = prices
+        self.has_price[ids] = True
+        held = self.quantity[ids] != 0
+        if held.any():
+            self._holdings = None
+            ids = ids[held]
+            self.max_price[ids] = np.maximum(self.max_price[ids],
+                                             (prices if highs is None else np.asarray(highs, dtype=float))[held])
+            self.min_price[ids] = np.minimum(self.min_price[ids],
+                                             (prices if lows is None else np.asarray(lows, dtype=float))[held])
+
+    # -------------------------------------------------------------- valuation
+    def _view(self, name: str) -> np.ndarray:
+        return getattr(self, name)[:len(self.symbols)]
+
+    def market_values(self) -> np.ndarray:
+        return self._view('quantity') * self._view('last_price')
+
+    def holdings_value(self) -> float:
+        if self._holdings is None:
+            ids = self.open_ids()
+            # cumsum adds strictly left to right (np.sum would add pairwise), and
+            # flat rows only add exact zeros, so summing the open rows matches
+            # summing every position one by one in symbol order.
+            self._holdings = float(np.cumsum(self.quantity[ids] * self.last_price[ids])[-1]) if ids.size else 0.0
+        return self._holdings
+
+    def unrealized_pnl(self) -> np.ndarray:
+        return (self._view('last_price') - self._view('avg_cost')) * self._view('quantity')
+
+    def mfe(self) -> np.ndarray:
+        # Best unrealised P&L seen since entry, per open position (0 when flat).
+        return np.where(self.open_mask(), (self._view('max_price') - self._view('avg_cost')) * self._view('quantity'), 0.0)
+
+    def mae(self) -> np.ndarray:
+        return np.where(self.open_mask(), (self._view('avg_cost') - self._view('min_price')) * self._view('quantity'), 0.0)
+
+    def open_mask(self) -> np.ndarray:
+        return self._view('quantity') != 0
+
+    def open_ids(self) -> np.ndarray:
+        if self._open is None:
+            self._open = np.flatnonzero(self.open_mask())
+        return self._open
@@ -1 +1,333 @@
+import argparse
+import json
+import math
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
+
+from ...performance_mgt.metrics_calculator import round_trips
+from ...utils.config_loader import app_config
+from ...utils.logging_setup import logger
+
+MC_METHODS = ('bootstrap', 'reshuffle')
+REPORT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+METRICS = ('final_return_pct', 'max_drawdown_pct', 'win_rate', 'mean_trade_pnl', 'trade_sharpe')
+
+# Upper bound on elements in one (simulations x trades) matrix. A chunk holds a
+# couple of these, so memory stays flat however many simulations are requested.
+_MAX_CHUNK_ELEMENTS = 2_000_000
+
+
+def trade_pnls_from_fills(fills: pd.DataFrame) -> np.ndarray:
+    """Net P&L of each closed round trip, in closing order (see `round_trips`)."""
+    return round_trips(fills)['pnl'].to_numpy(dtype=float)
+
+
+def simulate_paths(trade_pnls: np.ndarray, indices: np.ndarray, initial_equity: float,
+                   ruin_equity: float) -> Dict[str, np.ndarray]:
+    """Per-simulation statistics for a (simulations x trades) index matrix.
+
+    Row i replays `trade_pnls[indices[i]]` from `initial_equity`. Everything is
+    computed with whole-matrix NumPy operations; the only temporaries are the
+    sampled P&L matrix (turned into equity paths in place) and its running peak.
+    """
+    samples = trade_pnls[indices]
+    n_trades = samples.shape[1]
+    wins = np.count_nonzero(samples > 0, axis=1) / n_trades
+    mean_pnl = samples.mean(axis=1)
+    if n_trades > 1:
+        std_pnl = samples.std(axis=1, ddof=1)
+        sharpe = np.divide(mean_pnl, std_pnl, out=np.full_like(mean_pnl, np.nan), where=std_pnl > 0)
+    else:
+        sharpe = np.full_like(mean_pnl, np.nan)
+
+    equity = np.cumsum(samples, axis=1, out=samples)
+    equity += initial_equity
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, initial_equity, out=peak)
+    drawdown = np.divide(peak - equity, peak, out=np.ones_like(equity), where=peak > 0)
+
+    return {
+        'final_return_pct': (equity[:, -1] / initial_equity - 1) * 100,
+        'max_drawdown_pct': drawdown.max(axis=1) * 100,
+        'win_rate': wins,
+        'mean_trade_pnl': mean_pnl,
+        'trade_sharpe': sharpe,
+        'ruined': equity.min(axis=1) <= ruin_equity,
+    }
+
+
+class StreamingQuantiles:
+    """Mergeable quantile sketch with bounded memory.
+
+    Values are kept exactly until more than `capacity` have been seen; after
+    that the fullest level is sorted and every other value is promoted to the
+    next level with twice the weight (a KLL-style compaction). Quantiles from a
+    compacted sketch are weighted order statistics with rank error on the order
+    of count / capacity.
+    """
+
+    def __init__(self, capacity: int = 100_000, seed: Optional[int] = None):
+        if capacity < 16:
+            raise ValueError("capacity must be at least 16 values.")
+        self.capacity = capacity
+        self.count = 0
+        self.compacted = False
+        self._levels: List[List[np.ndarray]] = [[]]
+        self._rng = np.random.default_rng(seed)
+
+    def _stored(self) -> int:
+        return sum(arr.size for level in self._levels for arr in level)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self._levels[0].append(values)
+        self.count += values.size
+        while self._stored() > self.capacity:
+            self._compact()
+
+    def _compact(self):
+        sizes = [sum(arr.size for arr in level) for level in self._levels]
+        h = int(np.argmax(sizes))
+        values = np.sort(np.concatenate(self._levels[h]))
+        keep = values[-1:] if values.size % 2 else values[:0]
+        paired = values[:values.size - keep.size]
+        self._levels[h] = [keep] if keep.size else []
+        if h + 1 == len(self._levels):
+            self._levels.append([])
+        self._levels[h + 1].append(paired[self._rng.integers(2)::2])
+        self.compacted = True
+
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.asarray(qs, dtype=float)
+        if not self.count:
+            return np.full(qs.shape, np.nan)
+        if not self.compacted:
+            return np.quantile(np.concatenate(self._levels[0]), qs)
+        values = np.concatenate([arr for level in self._levels for arr in level])
+        weights = np.concatenate([np.full(arr.size, 2.0 ** h)
+                                  for h, level in enumerate(self._levels) for arr in level])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        ranks = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        return values[order][np.minimum(ranks, values.size - 1)]
+
+
+class _RunningMoments:
+    # Chunk-wise mean / variance merge (Chan et al.), so no per-simulation
+    # values have to be kept to report a mean and its confidence interval.
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        n = values.size
+        if not n:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    if not trials:
+        return (float('nan'), float('nan'))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denom = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+class MonteCarloResult:
+    def __init__(self, method: str, n_simulations: int, n_trades: int, seed: Optional[int],
+                 initial_equity: float, ruin_equity: float, ruin_threshold: float, confidence: float,
+                 ruined: int, profitable: int, moments: Dict[str, _RunningMoments],
+                 sketches: Dict[str, StreamingQuantiles]):
+        self.method = method
+        self.n_simulations = n_simulations
+        self.n_trades = n_trades
+        self.seed = seed
+        self.initial_equity = initial_equity
+        self.ruin_equity = ruin_equity
+        self.ruin_threshold = ruin_threshold
+        self.confidence = confidence
+        self.ruin_probability = ruined / n_simulations
+        self.ruin_ci = wilson_interval(ruined, n_simulations, confidence)
+        self.profitable_fraction = profitable / n_simulations
+
+        tail = (1 - confidence) / 2
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        for name in METRICS:
+            m = moments[name]
+            q = sketches[name].quantiles(list(REPORT_QUANTILES) + [tail, 1 - tail])
+            half = z * m.std / math.sqrt(m.count) if m.count > 1 else float('nan')
+            self.metrics[name] = {
+                'mean': m.mean if m.count else float('nan'),
+                'std': m.std,
+                'mean_ci': (m.mean - half, m.mean + half),
+                'quantiles': {f"p{round(p * 100):02d}": float(v) for p, v in zip(REPORT_QUANTILES, q)},
+                'interval': (float(q[-2]), float(q[-1])),
+            }
+
+    @property
+    def passed(self) -> bool:
+        # Judged on the upper confidence bound so a lucky draw cannot pass.
+        return self.ruin_ci[1] < self.ruin_threshold
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'method': self.method,
+            'n_simulations': self.n_simulations,
+            'n_trades': self.n_trades,
+            'seed': self.seed,
+            'initial_equity': self.initial_equity,
+            'ruin_equity': self.ruin_equity,
+            'ruin_probability': self.ruin_probability,
+            'ruin_probability_ci': self.ruin_ci,
+            'ruin_probability_threshold': self.ruin_threshold,
+            'passed': self.passed,
+            'profitable_fraction': self.profitable_fraction,
+            'confidence': self.confidence,
+            'metrics': self.metrics,
+        }
+
+
+class MonteCarloValidator:
+    """Bootstrap / reshuffle Monte Carlo over a trade log.
+
+    'bootstrap' resamples trades with replacement; 'reshuffle' permutes the
+    observed sequence (same final equity, different paths and drawdowns). All
+    resample indices of a chunk are drawn as one matrix and evaluated with
+    `simulate_paths`, so there is no Python loop over simulations. Results are
+    reproducible for a given seed and chunk size.
+    """
+
+    def __init__(self, initial_equity: Optional[float] = None,
+                 n_simulations: Optional[int] = None,
+                 ruin_drawdown_pct: Optional[float] = None,
+                 ruin_probability_threshold: Optional[float] = None,
+                 confidence: float = 0.95,
+                 chunk_size: Optional[int] = None,
+                 seed: Optional[int] = None,
+                 sketch_capacity: int = 100_000):
+        if initial_equity is None:
+            initial_equity = app_config.getfloat('BrokerSimulated', 'INITIAL_EQUITY', 25000.0)
+        if n_simulations is None:
+            n_simulations = app_config.getint('RiskManagement', 'MONTE_CARLO_SIMULATIONS_COUNT', 10000)
+        if ruin_drawdown_pct is None:
+            ruin_drawdown_pct = app_config.getfloat('RiskManagement', 'RUIN_EQUITY_DRAWDOWN_PCT', 0.5)
+        if ruin_probability_threshold is None:
+            ruin_probability_threshold = app_config.getfloat('RiskManagement', 'RUIN_PROBABILITY_VALIDATION_THRESHOLD', 0.05)
+        if n_simulations <= 0:
+            raise ValueError("n_simulations must be positive.")
+        if not 0 < ruin_drawdown_pct <= 1:
+            raise ValueError("ruin_drawdown_pct must be in (0, 1].")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
+
+        self.initial_equity = float(initial_equity)
+        self.n_simulations = int(n_simulations)
+        self.ruin_drawdown_pct = float(ruin_drawdown_pct)
+        self.ruin_probability_threshold = float(ruin_probability_threshold)
+        self.confidence = confidence
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.sketch_capacity = sketch_capacity
+
+    @property
+    def ruin_equity(self) -> float:
+        return self.initial_equity * (1 - self.ruin_drawdown_pct)
+
+    def _chunk_rows(self, n_trades: int) -> int:
+        if self.chunk_size is not None:
+            return self.chunk_size
+        return max(1, _MAX_CHUNK_ELEMENTS // n_trades)
+
+    def run(self, trade_pnls, method: str = 'bootstrap') -> MonteCarloResult:
+        if method not in MC_METHODS:
+            raise ValueError(f"Unknown Monte Carlo method '{method}'. Expected one of {MC_METHODS}.")
+        pnls = np.asarray(trade_pnls, dtype=float)
+        if pnls.ndim != 1 or not pnls.size:
+            raise ValueError("trade_pnls must be a non-empty 1-D sequence of trade P&L.")
+        n_trades = pnls.size
+
+        seeds = np.random.SeedSequence(self.seed)
+        rng = np.random.default_rng(seeds)
+        sketches = {name: StreamingQuantiles(self.sketch_capacity, seed=child)
+                    for name, child in zip(METRICS, seeds.spawn(len(METRICS)))}
+        moments = {name: _RunningMoments() for name in METRICS}
+        ruined = profitable = 0
+
+        rows = self._chunk_rows(n_trades)
+        base = np.arange(n_trades) if method == 'reshuffle' else None
+        done = 0
+        while done < self.n_simulations:
+            size = min(rows, self.n_simulations - done)
+            if method == 'bootstrap':
+                indices = rng.integers(0, n_trades, size=(size, n_trades))
+            else:
+                indices = rng.permuted(np.broadcast_to(base, (size, n_trades)), axis=1)
+            stats = simulate_paths(pnls, indices, self.initial_equity, self.ruin_equity)
+            for name in METRICS:
+                moments[name].update(stats[name])
+                sketches[name].update(stats[name])
+            ruined += int(np.count_nonzero(stats['ruined']))
+            profitable += int(np.count_nonzero(stats['final_return_pct'] > 0))
+            done += size
+
+        result = MonteCarloResult(method, self.n_simulations, n_trades, self.seed, self.initial_equity,
+                                  self.ruin_equity, self.ruin_probability_threshold, self.confidence,
+                                  ruined, profitable, moments, sketches)
+        logger.info(f"Monte Carlo ({method}, {self.n_simulations} runs x {n_trades} trades): "
+                    f"ruin probability {result.ruin_probability:.4f} "
+                    f"(CI {result.ruin_ci[0]:.4f}-{result.ruin_ci[1]:.4f}), passed={result.passed}")
+        return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Monte Carlo validation of a backtest trade log.")
+    parser.add_argument('--trade_log', required=True, help="trade_log.csv written by the backtest runner")
+    parser.add_argument('--method', default='bootstrap', choices=MC_METHODS)
+    parser.add_argument('--simulations', type=int, default=None,
+                        help="Defaults to [RiskManagement] MONTE_CARLO_SIMULATIONS_COUNT")
+    parser.add_argument('--initial_equity', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=None, help="Optional JSON file for the summary")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> MonteCarloResult:
+    args = parse_args(argv)
+    fills = pd.read_csv(args.trade_log, parse_dates=['datetime'])
+    validator = MonteCarloValidator(initial_equity=args.initial_equity, n_simulations=args.simulations, seed=args.seed)
+    result = validator.run(trade_pnls_from_fills(fills), method=args.method)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result.summary(), f, indent=2, default=str)
+    return result
+
+
+if __name__ == '__main__':
+    main()
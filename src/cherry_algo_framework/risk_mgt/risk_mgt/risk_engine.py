@@ -1 +1,386 @@
+import importlib.util
+import math
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from ...utils.config_loader import app_config
+from ...utils.telemetry import telemetry
+
+# torch is in requirements.txt but takes seconds to import, so it is only
+# imported when a torch-backed engine is built; NumPy keeps the engine usable without it.
+torch = None
+
+
+def torch_available() -> bool:
+    return torch is not None or importlib.util.find_spec('torch') is not None
+
+
+def _load_torch():
+    global torch
+    if torch is None:
+        import torch as torch_module
+        torch = _TorchOps.xp = torch_module
+    return torch
+
+APPROVED = 0
+INVALID_PRICES = 1
+BELOW_MIN_SIZE = 2
+MAX_POSITIONS = 3
+BUDGET_EXHAUSTED = 4
+REASONS = ('approved', 'invalid_prices', 'below_min_size', 'max_positions', 'budget_exhausted')
+
+
+class _NumpyOps:
+    name = 'numpy'
+    xp = np
+
+    @staticmethod
+    def as_float(values) -> np.ndarray:
+        return np.asarray(values, dtype=np.float64)
+
+    @staticmethod
+    def first_true(mask) -> int:
+        idx = np.flatnonzero(mask)
+        return int(idx[0]) if idx.size else -1
+
+
+class _TorchOps:
+    name = 'torch'
+    xp = None  # set by _load_torch()
+
+    @staticmethod
+    def as_float(values):
+        return torch.as_tensor(values, dtype=torch.float64)
+
+    @staticmethod
+    def first_true(mask) -> int:
+        idx = torch.nonzero(mask).flatten()
+        return int(idx[0]) if idx.numel() else -1
+
+
+class RiskState:
+    """Portfolio figures the engine sizes against, plus what it has reserved.
+
+    `reserved_*` accumulate approvals made against this state (by either the
+    per-signal or the batch path) until the fills arrive and a fresh state is
+    taken from the portfolio.
+    """
+
+    __slots__ = ("equity", "cash", "open_positions", "open_exposure", "risk_committed_today",
+                 "reserved_notional", "reserved_risk", "reserved_positions")
+
+    def __init__(self, equity: float, cash: float, open_positions: int = 0,
+                 open_exposure: float = 0.0, risk_committed_today: float = 0.0):
+        self.equity = float(equity)
+        self.cash = float(cash)
+        self.open_positions = int(open_positions)
+        self.open_exposure = float(open_exposure)
+        self.risk_committed_today = float(risk_committed_today)
+        self.reserved_notional = 0.0
+        self.reserved_risk = 0.0
+        self.reserved_positions = 0
+
+    @classmethod
+    def from_portfolio(cls, portfolio, risk_committed_today: float = 0.0) -> "RiskState":
+        return cls(portfolio.total_equity, portfolio.cash, len(portfolio.open_positions()),
+                   portfolio.holdings_value, risk_committed_today)
+
+    def copy(self) -> "RiskState":
+        clone = RiskState(self.equity, self.cash, self.open_positions, self.open_exposure, self.risk_committed_today)
+        clone.reserved_notional = self.reserved_notional
+        clone.reserved_risk = self.reserved_risk
+        clone.reserved_positions = self.reserved_positions
+        return clone
+
+
+class RiskDecision:
+    __slots__ = ("quantity", "reason")
+
+    def __init__(self, quantity: float, reason: int):
+        self.quantity = quantity
+        self.reason = reason
+
+    @property
+    def approved(self) -> bool:
+        return self.reason == APPROVED
+
+    @property
+    def reason_name(self) -> str:
+        return REASONS[self.reason]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RiskDecision) and (self.quantity, self.reason) == (other.quantity, other.reason)
+
+    def __repr__(self) -> str:
+        return f"RiskDecision(quantity={self.quantity}, reason={self.reason_name})"
+
+
+class BatchDecision:
+    """Result of `RiskEngine.evaluate_batch`.
+
+    `quantity` and `reason` are views into the engine's reusable buffers: they
+    are only valid until the next `evaluate_batch` call (copy them to keep).
+    """
+
+    __slots__ = ("quantity", "reason", "latency_sec")
+
+    def __init__(self, quantity, reason, latency_sec: float):
+        self.quantity = quantity
+        self.reason = reason
+        self.latency_sec = latency_sec
+
+    @property
+    def approved(self):
+        return self.reason == APPROVED
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    def decisions(self) -> List[RiskDecision]:
+        return [RiskDecision(float(q), int(r)) for q, r in zip(self.quantity.tolist(), self.reason.tolist())]
+
+
+class RiskEngine:
+    """Rule-based sizing and approval of entry signals.
+
+    A candidate long entry at `entry_price` with protective `stop_price` is
+    sized to the smallest of: MAX_EQUITY_AT_RISK_PER_TRADE_PCT of equity over
+    the per-share risk, MAX_PORTFOLIO_ALLOCATION_PER_TRADE_PCT of equity, and
+    TRADE_SIZE_LIQUIDITY_CAP_USD, in whole shares. Candidates are then taken in
+    order against the shared budgets: free position slots
+    (MAX_CONCURRENT_OPEN_POSITIONS), notional (cash and
+    PORTFOLIO_LIQUIDITY_CAP_USD less open exposure) and the daily dollar-risk
+    flow (MAX_PORTFOLIO_DOLLAR_FLOW_CAP_PCT_DAILY of equity). A candidate that
+    would overrun a dollar budget is cut down to what is left.
+
+    `evaluate` is the per-signal path; `evaluate_batch` takes a whole bar's
+    candidates as tensors and returns identical decisions.
+    """
+
+    def __init__(self, max_equity_at_risk_pct: Optional[float] = None,
+                 max_allocation_pct: Optional[float] = None,
+                 daily_flow_cap_pct: Optional[float] = None,
+                 max_open_positions: Optional[int] = None,
+                 portfolio_liquidity_cap_usd: Optional[float] = None,
+                 trade_liquidity_cap_usd: Optional[float] = None,
+                 backend: Optional[str] = None,
+                 capacity: int = 64,
+                 latency_window: int = 1024):
+        settings = app_config.snapshot()
+        if max_equity_at_risk_pct is None:
+            max_equity_at_risk_pct = settings.max_equity_at_risk_pct
+        if max_allocation_pct is None:
+            max_allocation_pct = settings.max_allocation_pct
+        if daily_flow_cap_pct is None:
+            daily_flow_cap_pct = settings.daily_flow_cap_pct
+        if max_open_positions is None:
+            max_open_positions = settings.max_open_positions
+        if portfolio_liquidity_cap_usd is None:
+            portfolio_liquidity_cap_usd = settings.portfolio_liquidity_cap_usd
+        if trade_liquidity_cap_usd is None:
+            trade_liquidity_cap_usd = settings.trade_liquidity_cap_usd
+
+        self.max_equity_at_risk_pct = float(max_equity_at_risk_pct)
+        self.max_allocation_pct = float(max_allocation_pct)
+        self.daily_flow_cap_pct = float(daily_flow_cap_pct)
+        self.max_open_positions = int(max_open_positions)
+        self.portfolio_liquidity_cap_usd = float(portfolio_liquidity_cap_usd)
+        self.trade_liquidity_cap_usd = float(trade_liquidity_cap_usd)
+
+        if backend is None:
+            backend = 'torch' if torch_available() else 'numpy'
+        if backend == 'torch' and not torch_available():
+            raise ImportError("backend='torch' requires PyTorch to be installed.")
+        if backend not in ('torch', 'numpy'):
+            raise ValueError(f"Unknown backend '{backend}'. Expected 'torch' or 'numpy'.")
+        if backend == 'torch':
+            _load_torch()
+        self._ops = _TorchOps if backend == 'torch' else _NumpyOps
+        self.backend = backend
+
+        self.batch_latencies: deque = deque(maxlen=latency_window)
+        self._capacity = 0
+        self._allocate_buffers(capacity)
+
+    # ------------------------------------------------------------------ shared
+    def _budgets(self, state: RiskState) -> Tuple[float, float, float, float, float]:
+        notional_budget = min(state.cash, self.portfolio_liquidity_cap_usd - state.open_exposure)
+        flow_budget = state.equity * self.daily_flow_cap_pct - state.risk_committed_today
+        slots = self.max_open_positions - state.open_positions
+        risk_budget = state.equity * self.max_equity_at_risk_pct
+        allocation_budget = state.equity * self.max_allocation_pct
+        return notional_budget, flow_budget, slots, risk_budget, allocation_budget
+
+    @staticmethod
+    def _reserve(quantity: float, entry: float, risk_per_share: float, state: RiskState,
+                 notional_budget: float, flow_budget: float, slots: int) -> Tuple[float, int]:
+        # The order-dependent step, shared verbatim by both paths.
+        if state.reserved_positions >= slots:
+            return 0.0, MAX_POSITIONS
+        notional = quantity * entry
+        risk = quantity * risk_per_share
+        if state.reserved_notional + notional > notional_budget or state.reserved_risk + risk > flow_budget:
+            quantity = float(math.floor(min((notional_budget - state.reserved_notional) / entry,
+                                            (flow_budget - state.reserved_risk) / risk_per_share)))
+            while quantity >= 1 and (state.reserved_notional + quantity * entry > notional_budget
+                                     or state.reserved_risk + quantity * risk_per_share > flow_budget):
+                quantity -= 1
+            if quantity < 1:
+                return 0.0, BUDGET_EXHAUSTED
+            notional = quantity * entry
+            risk = quantity * risk_per_share
+        state.reserved_notional += notional
+        state.reserved_risk += risk
+        state.reserved_positions += 1
+        return quantity, APPROVED
+
+    # -------------------------------------------------------------- per signal
+    def evaluate(self, entry_price: float, stop_price: Optional[float], state: RiskState) -> RiskDecision:
+        notional_budget, flow_budget, slots, risk_budget, allocation_budget = self._budgets(state)
+        entry = float(entry_price)
+        stop = float('nan') if stop_price is None else float(stop_price)
+        risk_per_share = entry - stop
+        if not (math.isfinite(entry) and math.isfinite(stop) and entry > 0 and risk_per_share > 0):
+            return RiskDecision(0.0, INVALID_PRICES)
+        quantity = float(math.floor(min(min(risk_budget / risk_per_share, allocation_budget / entry),
+                                        self.trade_liquidity_cap_usd / entry)))
+        if quantity < 1:
+            return RiskDecision(0.0, BELOW_MIN_SIZE)
+        return RiskDecision(*self._reserve(quantity, entry, risk_per_share, state,
+                                           notional_budget, flow_budget, slots))
+
+    # ------------------------------------------------------------------- batch
+    def _allocate_buffers(self, n: int):
+        xp = self._ops.xp
+        size = max(1, n)
+        self._entry = xp.zeros(size, dtype=xp.float64)
+        self._stop = xp.zeros(size, dtype=xp.float64)
+        self._risk_ps = xp.zeros(size, dtype=xp.float64)
+        self._qty = xp.zeros(size, dtype=xp.float64)
+        self._scratch = xp.zeros(size, dtype=xp.float64)
+        self._notional = xp.zeros(size + 1, dtype=xp.float64)
+        self._risk = xp.zeros(size + 1, dtype=xp.float64)
+        self._cum_notional = xp.zeros(size + 1, dtype=xp.float64)
+        self._cum_risk = xp.zeros(size + 1, dtype=xp.float64)
+        self._reason = xp.zeros(size, dtype=xp.int64)
+        self._capacity = size
+
+    def evaluate_batch(self, entry_prices, stop_prices, state: RiskState) -> BatchDecision:
+        """Size a bar's candidate entries in one pass, in the order given.
+
+        Accepts 1-D tensors, arrays or sequences (NaN stop = no stop). Updates
+        `state` exactly as calling `evaluate` on each candidate in turn would.
+        """
+        t0 = time.perf_counter()
+        ops, xp = self._ops, self._ops.xp
+        entry_in = ops.as_float(entry_prices)
+        stop_in = ops.as_float(stop_prices)
+        n = len(entry_in)
+        if len(stop_in) != n:
+            raise ValueError("entry_prices and stop_prices must have the same length.")
+        if n > self._capacity:
+            self._allocate_buffers(1 << (n - 1).bit_length())
+
+        notional_budget, flow_budget, slots, risk_budget, allocation_budget = self._budgets(state)
+        entry, stop, risk_ps = self._entry[:n], self._stop[:n], self._risk_ps[:n]
+        qty, scratch, reason = self._qty[:n], self._scratch[:n], self._reason[:n]
+        entry[:] = entry_in
+        stop[:] = stop_in
+        xp.subtract(entry, stop, out=risk_ps)
+
+        # Per-candidate size: same operations, in the same order, as evaluate().
+        # Budgets are broadcast into scratch first so every division is
+        # tensor / tensor (torch.divide does not take a scalar dividend).
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scratch[:] = risk_budget
+            xp.divide(scratch, risk_ps, out=qty)
+            scratch[:] = allocation_budget
+            xp.divide(scratch, entry, out=scratch)
+            xp.minimum(qty, scratch, out=qty)
+            scratch[:] = self.trade_liquidity_cap_usd
+            xp.divide(scratch, entry, out=scratch)
+            xp.minimum(qty, scratch, out=qty)
+        valid = xp.isfinite(entry) & xp.isfinite(stop) & (entry > 0) & (risk_ps > 0)
+        qty[~valid] = 0.0
+        xp.floor(qty, out=qty)
+        reason[:] = APPROVED
+        reason[~valid] = INVALID_PRICES
+        small = valid & (qty < 1)
+        reason[small] = BELOW_MIN_SIZE
+        qty[small] = 0.0
+        sizable = valid & ~small
+
+        # Order-dependent budgets. Runs of candidates that fit in full are
+        # accepted from running sums; the candidate that first overruns a
+        # budget goes through the scalar _reserve(), then the scan resumes.
+        notional, risk = self._notional[:n + 1], self._risk[:n + 1]
+        cum_notional, cum_risk = self._cum_notional[:n + 1], self._cum_risk[:n + 1]
+        with np.errstate(invalid='ignore'):
+            xp.multiply(qty, entry, out=notional[1:])
+            xp.multiply(qty, risk_ps, out=risk[1:])
+        notional[1:][~sizable] = 0.0
+        risk[1:][~sizable] = 0.0
+
+        # Candidates retired because not even one share fits; they turn into
+        # MAX_POSITIONS instead if the slots run out before they are reached.
+        retired = xp.zeros_like(sizable)
+        start = 0
+        while start < n:
+            if state.reserved_positions >= slots:
+                rest = sizable[start:] | retired[start:]
+                reason[start:][rest] = MAX_POSITIONS
+                qty[start:][rest] = 0.0
+                break
+            # Slot start holds the running total so cumsum adds in the same
+            # sequence as the scalar path.
+            notional[start] = state.reserved_notional
+            risk[start] = state.reserved_risk
+            xp.cumsum(notional[start:], 0, out=cum_notional[start:])
+            xp.cumsum(risk[start:], 0, out=cum_risk[start:])
+            positions = state.reserved_positions + xp.cumsum(sizable[start:], 0)
+            fits = (cum_notional[start + 1:] <= notional_budget) & (cum_risk[start + 1:] <= flow_budget) \
+                & (positions <= slots)
+            k = ops.first_true(sizable[start:] & ~fits)
+            stop_at = n if k < 0 else start + k
+            state.reserved_notional = float(cum_notional[stop_at])
+            state.reserved_risk = float(cum_risk[stop_at])
+            state.reserved_positions = int(positions[stop_at - start - 1]) if stop_at > start else state.reserved_positions
+            if k < 0:
+                break
+            q, r = self._reserve(float(qty[stop_at]), float(entry[stop_at]), float(risk_ps[stop_at]), state,
+                                 notional_budget, flow_budget, slots)
+            qty[stop_at] = q
+            reason[stop_at] = r
+            start = stop_at + 1
+            if start < n:
+                # Remaining budgets only shrink, so a candidate that cannot take
+                # one share now never will; _reserve() would reject it the same way.
+                hopeless = sizable[start:] & ((state.reserved_notional + entry[start:] > notional_budget)
+                                              | (state.reserved_risk + risk_ps[start:] > flow_budget))
+                reason[start:][hopeless] = BUDGET_EXHAUSTED
+                qty[start:][hopeless] = 0.0
+                notional[start + 1:][hopeless] = 0.0
+                risk[start + 1:][hopeless] = 0.0
+                sizable[start:][hopeless] = False
+                retired[start:][hopeless] = True
+
+        latency = time.perf_counter() - t0
+        self.batch_latencies.append(latency)
+        telemetry.add_time('risk.evaluate_batch', latency * 1e9)
+        telemetry.count('risk.candidates', n)
+        return BatchDecision(qty, reason, latency)
+
+    def latency_summary(self) -> Dict[str, Any]:
+        if not self.batch_latencies:
+            return {'batches': 0}
+        samples = np.fromiter(self.batch_latencies, dtype=float) * 1e6
+        return {
+            'batches': len(samples),
+            'mean_us': float(samples.mean()),
+            'p50_us': float(np.percentile(samples, 50)),
+            'p99_us': float(np.percentile(samples, 99)),
+            'max_us': float(samples.max()),
+        }
@@ -1 +1,93 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
 
+import numpy as np
+
+from ..core.event import Event, SignalEvent
+from ..data_mgt.columnar_bars import ColumnarBars
+from ..data_mgt.market_data_feed import MarketDataFeed
+from .indicators import Indicator, IndicatorSet, compute_batch
+
+
+class BaseStrategy(ABC):
+    """Per-event strategy interface.
+
+    Event-driven subclasses implement `calculate_signals`, which is called on
+    every MARKET event and puts SignalEvents on the shared queue. Strategies
+    that can also be expressed over whole columns override
+    `generate_target_positions` so they can run in the vectorized mode.
+
+    Indicators registered with `register_indicator` are kept per symbol and
+    advanced by `update_indicators(event)`, which subclasses call at the top
+    of `calculate_signals`; `batch_indicators` gives the same values over a
+    whole ColumnarBars for research.
+    """
+
+    def __init__(self, strategy_id: str,
+                 symbol_list: List[str],
+                 data_feed: Optional[MarketDataFeed] = None,
+                 event_queue: Optional[Deque[Event]] = None,
+                 params: Optional[Dict[str, Any]] = None):
+        self.strategy_id = strategy_id
+        self.symbol_list = [s.upper() for s in symbol_list]
+        self.data_feed = data_feed
+        self.event_queue: Deque[Event] = event_queue if event_queue is not None else deque()
+        self.params: Dict[str, Any] = dict(params or {})
+        self.indicator_prototypes: Dict[str, Indicator] = {}
+        self.indicators: Dict[str, IndicatorSet] = {}
+
+    def register_indicator(self, name: str, indicator: Indicator):
+        # Each symbol gets its own fresh copy of the prototype.
+        self.indicator_prototypes[name] = indicator
+        self.indicators = {s: IndicatorSet(self.indicator_prototypes) for s in self.symbol_list}
+
+    def update_indicators(self, event: Event) -> Optional[IndicatorSet]:
+        """Advance the symbol's indicators with a MARKET event; returns them (None for unknown symbols)."""
+        indicators = self.indicators.get(event.symbol)
+        if indicators is not None:
+            indicators.on_bar(event)
+        return indicators
+
+    def batch_indicators(self, bars: ColumnarBars, column_map: Optional[Dict[str, str]] = None) -> Dict[str, np.ndarray]:
+        return compute_batch(self.indicator_prototypes, bars, column_map)
+
+    @abstractmethod
+    def calculate_signals(self, event: Event):
+        raise NotImplementedError("Should implement calculate_signals()")
+
+    def generate_target_positions(self, symbol: str, bars: ColumnarBars, column_map: Dict[str, str]) -> np.ndarray:
+        # Target position in shares after each bar. The vectorized engine turns
+        # changes into market orders filled on the following bar's open, which
+        # is what the event-driven loop does with the equivalent signals.
+        raise NotImplementedError(f"{type(self).__name__} does not support the vectorized mode.")
+
+    @property
+    def supports_vectorized(self) -> bool:
+        return type(self).generate_target_positions is not BaseStrategy.generate_target_positions
+
+    # Day sharding (mode='sharded') replays runs of whole sessions in separate
+    # processes. A strategy opts in by overriding `prime`, which rebuilds the
+    # state it carries from one session into the next out of the last
+    # `warmup_bars` bars per symbol, and `is_flat`, which reports that nothing
+    # else (an open position it believes it holds) would carry over.
+    warmup_bars: int = 0
+
+    def prime(self, event: Event):
+        raise NotImplementedError(f"{type(self).__name__} does not support day sharding.")
+
+    def is_flat(self) -> bool:
+        raise NotImplementedError(f"{type(self).__name__} does not support day sharding.")
+
+    @property
+    def supports_day_sharding(self) -> bool:
+        return type(self).prime is not BaseStrategy.prime
+
+    def emit_signal(self, symbol: str, signal_datetime: datetime, signal_type: str,
+                    strength: float = 1.0, quantity: Optional[float] = None,
+                    stop_price: Optional[float] = None) -> SignalEvent:
+        signal = SignalEvent(symbol, signal_datetime, signal_type, strength=strength,
+                             strategy_id=self.strategy_id, quantity=quantity, stop_price=stop_price)
+        self.event_queue.append(signal)
+        return signal
@@ -1 +1,111 @@
+import json
+from collections import deque
+from datetime import time
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
 
+import numpy as np
+
+from ..core.event import Event, EventType
+from ..data_mgt.columnar_bars import ColumnarBars
+from ..data_mgt.market_data_feed import MarketDataFeed
+from .base_strategy import BaseStrategy
+
+DEFAULT_PARAMS: Dict[str, Any] = {
+    'strategy_id': 'EXAMPLE_MOMENTUM_V1',
+    'lookback_bars': 3,
+    'entry_threshold_pct': 0.002,
+    'exit_threshold_pct': -0.001,
+    'order_quantity': 100,
+    'flatten_time_utc': '19:55',
+}
+
+
+def load_params(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return {**DEFAULT_PARAMS, **json.load(f)}
+
+
+class ExampleMomentumStrategy(BaseStrategy):
+    """Generic, non-proprietary momentum example.
+
+    Goes long `order_quantity` shares when the `lookback_bars` close-to-close
+    return exceeds `entry_threshold_pct`, exits when it drops below
+    `exit_threshold_pct`, and is flat from `flatten_time_utc` onwards each day.
+    """
+
+    def __init__(self, symbol_list: List[str],
+                 data_feed: Optional[MarketDataFeed] = None,
+                 event_queue: Optional[Deque[Event]] = None,
+                 params: Optional[Dict[str, Any]] = None):
+        merged = {**DEFAULT_PARAMS, **(params or {})}
+        super().__init__(merged['strategy_id'], symbol_list, data_feed, event_queue, merged)
+        self.lookback_bars = int(merged['lookback_bars'])
+        if self.lookback_bars < 1:
+            raise ValueError("lookback_bars must be at least 1.")
+        self.entry_threshold = float(merged['entry_threshold_pct'])
+        self.exit_threshold = float(merged['exit_threshold_pct'])
+        self.order_quantity = float(merged['order_quantity'])
+        hours, minutes = (int(part) for part in str(merged['flatten_time_utc']).split(':'))
+        self.flatten_time = time(hours, minutes)
+
+        self.closes: Dict[str, Deque[float]] = {s: deque(maxlen=self.lookback_bars + 1) for s in self.symbol_list}
+        self.in_market: Dict[str, bool] = {s: False for s in self.symbol_list}
+        self.warmup_bars = self.lookback_bars + 1
+
+    def prime(self, event: Event):
+        closes = self.closes.get(event.symbol)
+        if closes is not None:
+            closes.append(event.close)
+
+    def is_flat(self) -> bool:
+        return not any(self.in_market.values())
+
+    def calculate_signals(self, event: Event):
+        if event.type != EventType.MARKET:
+            return
+        symbol = event.symbol
+        closes = self.closes.get(symbol)
+        if closes is None:
+            return
+        closes.append(event.close)
+
+        was_long = self.in_market[symbol]
+        if event.datetime.time() >= self.flatten_time:
+            want_long = False
+        elif len(closes) > self.lookback_bars:
+            momentum = closes[-1] / closes[0] - 1
+            if momentum > self.entry_threshold:
+                want_long = True
+            elif momentum < self.exit_threshold:
+                want_long = False
+            else:
+                want_long = was_long
+        else:
+            want_long = was_long
+
+        if want_long != was_long:
+            self.in_market[symbol] = want_long
+            if want_long:
+                self.emit_signal(symbol, event.datetime, 'LONG', quantity=self.order_quantity)
+            else:
+                self.emit_signal(symbol, event.datetime, 'EXIT')
+
+    def generate_target_positions(self, symbol: str, bars: ColumnarBars, column_map: Dict[str, str]) -> np.ndarray:
+        close = np.asarray(bars.columns[column_map['close']], dtype=np.float64)
+        n = len(close)
+        momentum = np.full(n, np.nan)
+        if n > self.lookback_bars:
+            momentum[self.lookback_bars:] = close[self.lookback_bars:] / close[:-self.lookback_bars] - 1
+
+        seconds_of_day = (bars.timestamps // 1_000_000_000) % 86_400
+        flatten_seconds = self.flatten_time.hour * 3600 + self.flatten_time.minute * 60
+
+        # 1 = long, 0 = flat, NaN = keep the previous state; forward-filling
+        # reproduces the event-driven hysteresis.
+        state = np.where(momentum > self.entry_threshold, 1.0, np.where(momentum < self.exit_threshold, 0.0, np.nan))
+        state[seconds_of_day >= flatten_seconds] = 0.0
+        known = ~np.isnan(state)
+        last_known = np.maximum.accumulate(np.where(known, np.arange(n), -1))
+        filled = np.where(last_known >= 0, state[np.maximum(last_known, 0)], 0.0)
+        return filled * self.order_quantity
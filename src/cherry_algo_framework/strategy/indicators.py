@@ -0,0 +1,425 @@
+import copy
+import math
+from collections import deque
+from datetime import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from ..data_mgt.bar_history import _to_ns
+from ..data_mgt.columnar_bars import ColumnarBars
+
+NS_PER_DAY = 86_400 * 1_000_000_000
+_NAN = float('nan')
+
+
+def _time_ns(value: Union[str, time]) -> int:
+    if isinstance(value, str):
+        value = time.fromisoformat(value)
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000_000
+
+
+def _session_starts(ts_ns: np.ndarray) -> np.ndarray:
+    # Index of the first bar of each UTC day, plus len(ts_ns) as a terminator.
+    day = ts_ns // NS_PER_DAY
+    return np.concatenate(([0], np.flatnonzero(np.diff(day)) + 1, [len(ts_ns)]))
+
+
+def _session_cumsum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # cumsum restarted at each session, adding left to right from 0.0 like the
+    # streaming accumulators do (a global cumsum minus an offset would round differently).
+    out = np.empty_like(values)
+    for lo, hi in zip(starts[:-1].tolist(), starts[1:].tolist()):
+        np.cumsum(values[lo:hi], out=out[lo:hi])
+    return out
+
+
+class Indicator:
+    """Base class for indicators with an O(1) streaming update and a batch twin.
+
+    `update(*values)` consumes one bar's inputs (named by `fields`; indicators
+    with `timed = True` take the bar's UTC epoch nanoseconds first) and returns
+    the current value, NaN while warming up. `batch(*arrays)` computes the
+    whole series at once from the same inputs, performing the same floating
+    point operations in the same order, so both paths agree exactly. `batch`
+    only reads the indicator's parameters, never its streaming state. Inputs
+    must be finite.
+    """
+
+    fields: Tuple[str, ...] = ('close',)
+    timed = False
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = _NAN
+
+    def update(self, *values) -> float:
+        raise NotImplementedError
+
+    def batch(self, *arrays) -> np.ndarray:
+        raise NotImplementedError
+
+    def fresh(self) -> "Indicator":
+        """A copy with the same parameters and no history."""
+        clone = copy.copy(self)
+        clone.reset()
+        return clone
+
+    def reset(self):
+        self.value = _NAN
+
+    def on_bar(self, bar: Any) -> float:
+        values = [float(bar.get(name)) for name in self.fields]
+        if self.timed:
+            return self.update(_to_ns(bar.get('datetime')), *values)
+        return self.update(*values)
+
+    def batch_bars(self, bars: ColumnarBars, column_map: Optional[Dict[str, str]] = None) -> np.ndarray:
+        column_map = column_map or {}
+        arrays = [np.asarray(bars.columns[column_map.get(name, name)], dtype=np.float64) for name in self.fields]
+        if self.timed:
+            return self.batch(bars.timestamps, *arrays)
+        return self.batch(*arrays)
+
+
+class _Windowed(Indicator):
+    __slots__ = ("window", "fields")
+
+    def __init__(self, window: int, field: str = 'close'):
+        if window < 1:
+            raise ValueError(f"{type(self).__name__} window must be at least 1.")
+        self.window = int(window)
+        self.fields = (field,)
+        super().__init__()
+
+
+class RollingSum(_Windowed):
+    """Sum of the last `window` values.
+
+    Kept as the difference of two running totals, which is what a cumsum
+    gives the batch path; precision degrades slowly as the total grows, so
+    very long streams of large values are better served by a session reset.
+    """
+
+    __slots__ = ("_totals", "_total")
+
+    def __init__(self, window: int, field: str = 'close'):
+        super().__init__(window, field)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._total = 0.0
+        self._totals = deque([0.0], maxlen=self.window + 1)
+
+    def _window_sum(self) -> float:
+        return self._totals[-1] - self._totals[0] if len(self._totals) > self.window else _NAN
+
+    def update(self, x: float) -> float:
+        self._total += x
+        self._totals.append(self._total)
+        self.value = self._window_sum()
+        return self.value
+
+    def _batch_sum(self, x: np.ndarray) -> np.ndarray:
+        totals = np.concatenate(([0.0], np.cumsum(x)))
+        out = np.full(len(x), np.nan)
+        if len(x) >= self.window:
+            out[self.window - 1:] = totals[self.window:] - totals[:len(totals) - self.window]
+        return out
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        return self._batch_sum(np.asarray(x, dtype=np.float64))
+
+
+class RollingMean(RollingSum):
+    __slots__ = ()
+
+    def update(self, x: float) -> float:
+        super().update(x)
+        self.value = self.value / self.window
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        return super().batch(x) / self.window
+
+
+class RollingStd(_Windowed):
+    """Sample standard deviation (ddof=1) of the last `window` values.
+
+    Sums of (x - x0) and (x - x0)^2, with x0 the first value seen, keep the
+    sum-of-squares form from cancelling badly at price levels far from zero.
+    """
+
+    __slots__ = ("_shift", "_s1", "_s2", "_totals")
+
+    def __init__(self, window: int, field: str = 'close'):
+        if window < 2:
+            raise ValueError("RollingStd window must be at least 2.")
+        super().__init__(window, field)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._shift = None
+        self._s1 = self._s2 = 0.0
+        self._totals = deque([(0.0, 0.0)], maxlen=self.window + 1)
+
+    def _variance(self, w1, w2):
+        return (w2 - w1 * w1 / self.window) / (self.window - 1)
+
+    def update(self, x: float) -> float:
+        if self._shift is None:
+            self._shift = x
+        y = x - self._shift
+        self._s1 += y
+        self._s2 += y * y
+        self._totals.append((self._s1, self._s2))
+        if len(self._totals) > self.window:
+            (a1, a2), (b1, b2) = self._totals[0], self._totals[-1]
+            self.value = math.sqrt(max(self._variance(b1 - a1, b2 - a2), 0.0))
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        out = np.full(len(x), np.nan)
+        if len(x) < self.window:
+            return out
+        y = x - x[0]
+        s1 = np.concatenate(([0.0], np.cumsum(y)))
+        s2 = np.concatenate(([0.0], np.cumsum(y * y)))
+        n = self.window
+        var = self._variance(s1[n:] - s1[:len(s1) - n], s2[n:] - s2[:len(s2) - n])
+        out[n - 1:] = np.sqrt(np.maximum(var, 0.0))
+        return out
+
+
+class EMA(Indicator):
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the first value.
+
+    The recurrence is inherently sequential, so `batch` runs the same update
+    over the array rather than a vectorised approximation.
+    """
+
+    __slots__ = ("span", "alpha", "fields")
+
+    def __init__(self, span: float, field: str = 'close'):
+        if span < 1:
+            raise ValueError("EMA span must be at least 1.")
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.fields = (field,)
+        super().__init__()
+
+    def update(self, x: float) -> float:
+        value = self.value
+        self.value = x if value != value else value + self.alpha * (x - value)
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        out = np.empty(len(x))
+        alpha = self.alpha
+        value = _NAN
+        for i, v in enumerate(np.asarray(x, dtype=np.float64).tolist()):
+            value = v if value != value else value + alpha * (v - value)
+            out[i] = value
+        return out
+
+
+class RollingMax(_Windowed):
+    """Maximum of the last `window` values via a monotonic deque (amortised O(1))."""
+
+    __slots__ = ("_deque", "_count")
+    _dominates = staticmethod(lambda new, old: new >= old)  # an older value can never be the answer again
+    _reduce = staticmethod(np.max)
+
+    def __init__(self, window: int, field: str = 'high'):
+        super().__init__(window, field)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._deque: deque = deque()
+        self._count = 0
+
+    def update(self, x: float) -> float:
+        dq = self._deque
+        while dq and self._dominates(x, dq[-1][1]):
+            dq.pop()
+        dq.append((self._count, x))
+        self._count += 1
+        if dq[0][0] <= self._count - 1 - self.window:
+            dq.popleft()
+        self.value = dq[0][1] if self._count >= self.window else _NAN
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        out = np.full(len(x), np.nan)
+        if len(x) >= self.window:
+            out[self.window - 1:] = self._reduce(np.lib.stride_tricks.sliding_window_view(x, self.window), axis=1)
+        return out
+
+
+class RollingMin(RollingMax):
+    __slots__ = ()
+    _dominates = staticmethod(lambda new, old: new <= old)
+    _reduce = staticmethod(np.min)
+
+    def __init__(self, window: int, field: str = 'low'):
+        super().__init__(window, field)
+
+
+class RelativeVolume(RollingSum):
+    """Current value over the mean of the previous `window` values (NaN until they exist or if it is 0)."""
+
+    __slots__ = ()
+
+    def __init__(self, window: int, field: str = 'volume'):
+        super().__init__(window, field)
+
+    def update(self, x: float) -> float:
+        mean = self._window_sum() / self.window
+        self._total += x
+        self._totals.append(self._total)
+        self.value = x / mean if mean > 0 else _NAN
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        out = np.full(len(x), np.nan)
+        if len(x) > self.window:
+            mean = self._batch_sum(x)[self.window - 1:-1] / self.window
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out[self.window:] = np.where(mean > 0, x[self.window:] / mean, np.nan)
+        return out
+
+
+class SessionSum(Indicator):
+    """Running total of `field` over a time-of-day window, reset every UTC day.
+
+    With start='08:00', end='13:30' on volume this is cumulative pre-market
+    volume; after the window closes the value holds the window's total.
+    """
+
+    timed = True
+    __slots__ = ("fields", "start_ns", "end_ns", "_day", "_total")
+
+    def __init__(self, field: str = 'volume', start: Union[str, time] = '00:00',
+                 end: Optional[Union[str, time]] = None):
+        self.fields = (field,)
+        self.start_ns = _time_ns(start)
+        self.end_ns = NS_PER_DAY if end is None else _time_ns(end)
+        super().__init__()
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._day = None
+        self._total = 0.0
+
+    def update(self, ts_ns: int, x: float) -> float:
+        day, tod = divmod(ts_ns, NS_PER_DAY)
+        if day != self._day:
+            self._day = day
+            self._total = 0.0
+        if self.start_ns <= tod < self.end_ns:
+            self._total += x
+        self.value = self._total
+        return self.value
+
+    def batch(self, ts_ns: np.ndarray, x: np.ndarray) -> np.ndarray:
+        tod = ts_ns % NS_PER_DAY
+        masked = np.where((tod >= self.start_ns) & (tod < self.end_ns), np.asarray(x, dtype=np.float64), 0.0)
+        return _session_cumsum(masked, _session_starts(ts_ns))
+
+
+class VWAP(Indicator):
+    """Session VWAP of the typical price (high + low + close) / 3, reset every UTC day."""
+
+    timed = True
+    fields = ('high', 'low', 'close', 'volume')
+    __slots__ = ("_day", "_pv", "_v")
+
+    def __init__(self):
+        super().__init__()
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._day = None
+        self._pv = self._v = 0.0
+
+    def update(self, ts_ns: int, high: float, low: float, close: float, volume: float) -> float:
+        day = ts_ns // NS_PER_DAY
+        if day != self._day:
+            self._day = day
+            self._pv = self._v = 0.0
+        self._pv += (high + low + close) / 3 * volume
+        self._v += volume
+        self.value = self._pv / self._v if self._v > 0 else _NAN
+        return self.value
+
+    def batch(self, ts_ns: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+              volume: np.ndarray) -> np.ndarray:
+        starts = _session_starts(ts_ns)
+        pv = _session_cumsum((high + low + close) / 3 * volume, starts)
+        v = _session_cumsum(np.asarray(volume, dtype=np.float64), starts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(v > 0, pv / v, np.nan)
+
+
+class GapPct(Indicator):
+    """Session open over the previous session's last close, minus 1 (NaN on the first session)."""
+
+    timed = True
+    fields = ('open', 'close')
+    __slots__ = ("_day", "_last_close")
+
+    def __init__(self):
+        super().__init__()
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._day = None
+        self._last_close = _NAN
+
+    def update(self, ts_ns: int, open: float, close: float) -> float:
+        day = ts_ns // NS_PER_DAY
+        if day != self._day:
+            self._day = day
+            self.value = open / self._last_close - 1
+        self._last_close = close
+        return self.value
+
+    def batch(self, ts_ns: np.ndarray, open: np.ndarray, close: np.ndarray) -> np.ndarray:
+        starts = _session_starts(ts_ns)[:-1]
+        gaps = np.full(len(starts), np.nan)
+        gaps[1:] = open[starts[1:]] / close[starts[1:] - 1] - 1
+        return np.repeat(gaps, np.diff(np.append(starts, len(ts_ns))))
+
+
+class IndicatorSet:
+    """Named indicators for one symbol, updated together from each bar."""
+
+    __slots__ = ("indicators",)
+
+    def __init__(self, prototypes: Dict[str, Indicator]):
+        self.indicators: Dict[str, Indicator] = {name: proto.fresh() for name, proto in prototypes.items()}
+
+    def on_bar(self, bar: Any):
+        for indicator in self.indicators.values():
+            indicator.on_bar(bar)
+
+    def __getitem__(self, name: str) -> float:
+        return self.indicators[name].value
+
+    def values(self) -> Dict[str, float]:
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+
+
+def compute_batch(prototypes: Dict[str, Indicator], bars: ColumnarBars,
+                  column_map: Optional[Dict[str, str]] = None) -> Dict[str, np.ndarray]:
+    """Whole-array values of each named indicator over one symbol's bars (research / notebooks)."""
+    return {name: proto.batch_bars(bars, column_map) for name, proto in prototypes.items()}
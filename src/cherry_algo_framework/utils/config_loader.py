@@ -1,6 +1,8 @@
 import configparser
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, Optional
 import logging
 
 APP_NAME = "CherryAlgoFramework"
@@ -46,30 +48,106 @@ def find_config_path() -> Path:
         f"Neither '{CONFIG_FILE_NAME}' nor '{CONFIG_TEMPLATE_NAME}' found in '{project_root / CONFIG_DIR_NAME}'"
     )
 
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable, typed snapshot of the configuration, resolved once.
+
+    Built by `Config.snapshot()`. Constructors that run once per backtest
+    (broker, feeds, risk engine) read its attributes instead of parsing
+    strings, and sweep workers are handed it at start-up instead of locating
+    and parsing settings.ini themselves. `get()` returns any other key as its raw string.
+    """
+    source: Optional[str] = None
+    initial_equity: float = 25000.0
+    commission_per_share: float = 0.0035
+    commission_min_per_order: float = 0.50
+    slippage_pct: float = 0.0002
+    history_bars: int = 500
+    max_equity_at_risk_pct: float = 0.01
+    max_allocation_pct: float = 0.25
+    daily_flow_cap_pct: float = 0.08
+    max_open_positions: int = 3
+    portfolio_liquidity_cap_usd: float = 1_000_000.0
+    trade_liquidity_cap_usd: float = 250_000.0
+    telemetry: bool = False
+    sections: Dict[str, Dict[str, str]] = field(default_factory=dict)  # raw values as in the file, keys lower-case
+
+    def get(self, section: str, key: str, fallback: str = None) -> str | None:
+        return self.sections.get(section, {}).get(key.lower(), fallback)
+
+
 class Config:
     _instance = None
     _config_parser = None
     _config_path = None
+    _snapshot = None
 
     def __new__(cls):
+        # The file is located and parsed on first lookup, not at import.
         if cls._instance is None:
             cls._instance = super(Config, cls).__new__(cls)
-            try:
-                cls._config_path = find_config_path()
-                cls._config_parser = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
-                cls._config_parser.read(cls._config_path)
-                module_logger.info(f"Configuration loaded from: {cls._config_path}")
-            except (FileNotFoundError, configparser.Error) as e:
-                module_logger.error(f"Failed to load configuration: {e}", exc_info=False)
-                 
-                cls._config_parser = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation()) # Empty parser
-                module_logger.warning("Operating with an empty configuration due to previous errors.")
         return cls._instance
 
+    @classmethod
+    def _load(cls):
+        try:
+            cls._config_path = find_config_path()
+            cls._config_parser = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+            cls._config_parser.read(cls._config_path)
+            module_logger.info(f"Configuration loaded from: {cls._config_path}")
+        except (FileNotFoundError, configparser.Error) as e:
+            module_logger.error(f"Failed to load configuration: {e}", exc_info=False)
+
+            cls._config_parser = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation()) # Empty parser
+            module_logger.warning("Operating with an empty configuration due to previous errors.")
+
+    @property
+    def _parser(self) -> configparser.ConfigParser:
+        if self._config_parser is None:
+            self._load()
+        return self._config_parser
+
+    def snapshot(self) -> Settings:
+        """The typed settings, resolved on first call and cached."""
+        if self._snapshot is None:
+            section = 'RiskManagement'
+            Config._snapshot = Settings(
+                source=str(self.config_file_loaded) if self.config_file_loaded else None,
+                initial_equity=self.getfloat('BrokerSimulated', 'INITIAL_EQUITY', 25000.0),
+                commission_per_share=self.getfloat('BrokerSimulated', 'COMMISSION_PER_SHARE', 0.0035),
+                commission_min_per_order=self.getfloat('BrokerSimulated', 'COMMISSION_MIN_PER_ORDER', 0.50),
+                slippage_pct=self.getfloat('BrokerSimulated', 'SLIPPAGE_PERCENT', 0.0002),
+                history_bars=self.getint('MarketData', 'HISTORY_BARS', 500),
+                max_equity_at_risk_pct=self.getfloat(section, 'MAX_EQUITY_AT_RISK_PER_TRADE_PCT', 0.01),
+                max_allocation_pct=self.getfloat(section, 'MAX_PORTFOLIO_ALLOCATION_PER_TRADE_PCT', 0.25),
+                daily_flow_cap_pct=self.getfloat(section, 'MAX_PORTFOLIO_DOLLAR_FLOW_CAP_PCT_DAILY', 0.08),
+                max_open_positions=self.getint(section, 'MAX_CONCURRENT_OPEN_POSITIONS', 3),
+                portfolio_liquidity_cap_usd=self.getfloat(section, 'PORTFOLIO_LIQUIDITY_CAP_USD', 1_000_000.0),
+                trade_liquidity_cap_usd=self.getfloat(section, 'TRADE_SIZE_LIQUIDITY_CAP_USD', 250_000.0),
+                telemetry=bool(self.getboolean('Backtester', 'TELEMETRY', False)),
+                sections={name: dict(self._parser.items(name, raw=True)) for name in self._parser.sections()},
+            )
+        return self._snapshot
+
+    @classmethod
+    def use_snapshot(cls, settings: Settings):
+        """Serve lookups from `settings` (e.g. in a worker process) without reading any file."""
+        parser = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+        parser.read_dict(settings.sections)
+        cls._config_parser = parser
+        cls._config_path = Path(settings.source) if settings.source else None
+        cls._snapshot = settings
+
     def get(self, section: str, key: str, fallback: str = None) -> str | None:
         try:
-            value = self._config_parser.get(section, key)
-             
+            # ExtendedInterpolation would read a whole-value "${NAME}" as a reference
+            # to option NAME; when no such option exists it names an environment variable.
+            value = self._parser.get(section, key, raw=True)
+            if not (value and value.startswith("${") and value.endswith("}") and ':' not in value
+                    and not self._parser.has_option(section, value[2:-1])):
+                value = self._parser.get(section, key)
+
             if value and value.startswith("${") and value.endswith("}"):
                 env_var_name = value[2:-1]
                 env_value = os.getenv(env_var_name)
@@ -116,7 +194,7 @@ class Config:
         value_str = self.get(section, key)
         if value_str is not None:
             try:
-                return self._config_parser.getboolean(section, key)  
+                return self._parser.getboolean(section, key)  
             except ValueError:  
                 module_logger.error(f"Config value for {section}.{key} ('{value_str}') is not a standard boolean.")
                 if fallback is not None: return fallback
@@ -131,6 +209,7 @@ class Config:
 
     @property
     def config_file_loaded(self) -> Path | None:
+        self._parser
         return self._config_path if self._config_path and self._config_path.exists() else None
 
 app_config = Config()
@@ -1,17 +1,57 @@
 import sys
 import os
 from pathlib import Path
-from loguru import logger
 from .config_loader import app_config
 
 INITIALIZED_LOGGING = False
+_HANDLER_IDS = []  # loguru sinks added by setup_logging()
+
+
+class _LazyLogger:
+    """Stands in for loguru's logger until the first attribute access.
+
+    That access imports loguru and runs `setup_logging()` unless logging
+    was already configured (or disabled) explicitly, so importing a module
+    neither creates the log directory nor opens sinks. Every attribute is
+    then cached on the proxy: `logger.info(...)` is a plain lookup of
+    loguru's own bound method, and loguru still sees the caller's frame.
+    """
+
+    def __getattr__(self, name):
+        from loguru import logger as loguru_logger
+        if not INITIALIZED_LOGGING:
+            setup_logging()
+        value = getattr(loguru_logger, name)
+        if callable(value):
+            self.__dict__[name] = value
+        return value
+
+
+logger = _LazyLogger()
+
+
+def disable_logging():
+    """Drop every sink and skip the default setup (workers, benchmarks)."""
+    global INITIALIZED_LOGGING
+    from loguru import logger as loguru_logger
+    loguru_logger.remove()
+    INITIALIZED_LOGGING = True
+
 
 def setup_logging():
     global INITIALIZED_LOGGING
     if INITIALIZED_LOGGING:
         return
+    from loguru import logger
 
-    logger.remove()
+    # Replace loguru's default stderr sink (id 0) and our own earlier sinks;
+    # sinks the application added itself keep receiving records.
+    for handler_id in [0] + _HANDLER_IDS:
+        try:
+            logger.remove(handler_id)
+        except ValueError:
+            pass
+    _HANDLER_IDS.clear()
 
     log_level = app_config.get("Logging", "LOG_LEVEL", "INFO").upper()
     
@@ -40,41 +80,41 @@ def setup_logging():
     log_rotation = app_config.get("Logging", "LOG_ROTATION_SIZE", "10 MB")
     log_retention = app_config.get("Logging", "LOG_RETENTION_PERIOD", "7 days")
     log_compression = app_config.get("Logging", "LOG_COMPRESSION_FORMAT", "zip")
+    # enqueue starts a writer thread; diagnose renders local variables into every traceback.
+    log_enqueue = app_config.getboolean("Logging", "LOG_ENQUEUE", False)
+    log_diagnose = app_config.getboolean("Logging", "LOG_DIAGNOSE", False)
 
     try:
-        logger.add(
+        _HANDLER_IDS.append(logger.add(
             sys.stderr,
             level=log_level,
             format=log_format_template,
             colorize=True,
             backtrace=True,
-            diagnose=True 
-        )
+            diagnose=log_diagnose
+        ))
 
-        logger.add(
+        _HANDLER_IDS.append(logger.add(
             log_file_full_path,
             level=log_level,
             format=log_format_template,
             rotation=log_rotation,
             retention=log_retention,
             compression=log_compression,
-            enqueue=True,
+            enqueue=log_enqueue,
             backtrace=True,
-            diagnose=True,
+            diagnose=log_diagnose,
             encoding="utf-8"
-        )
+        ))
         INITIALIZED_LOGGING = True
         logger.info(f"Logging initialized. Level: {log_level}. Outputting to console and file: {log_file_full_path}")
     
     except Exception as e:
         sys.stderr.write(f"Critical error during logging setup: {e}\n")
         sys.stderr.write("Logging to file might not be available. Basic console logging will be used.\n")
-        logger.add(sys.stderr, level="INFO", format=log_format_template, colorize=True) # Fallback to console
+        _HANDLER_IDS.append(logger.add(sys.stderr, level="INFO", format=log_format_template, colorize=True)) # Fallback to console
         INITIALIZED_LOGGING = True  
 
-if not INITIALIZED_LOGGING and __name__ != "__main__":
-    setup_logging()
-
 if __name__ == '__main__':
     setup_logging()
     logger.debug("This is a debug message from logging_setup.")
@@ -0,0 +1,235 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .config_loader import app_config
+from .logging_setup import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None where it is unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == 'darwin' else peak * 1024)  # macOS reports bytes, Linux KiB
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("timers", "name", "t0")
+
+    def __init__(self, timers: Dict[str, List[int]], name: str):
+        self.timers = timers
+        self.name = name
+        self.t0 = 0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.t0
+        entry = self.timers.get(self.name)
+        if entry is None:
+            self.timers[self.name] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+        return False
+
+
+class Telemetry:
+    """Named counters and monotonic-clock stage timers for one run.
+
+    The module-level instance starts disabled, so importing it reads no
+    configuration; the runner enables it from [Backtester] TELEMETRY (or
+    --telemetry) once the settings are resolved. Disabled, `count()` is one
+    attribute test and `timer()` returns a shared no-op context manager, so
+    instrumented code costs next to nothing. Timers are for stages and
+    batches (data load, the replay loop, a risk batch); per-event handler
+    time comes from the EventBus profile instead.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, List[int]] = {}  # name -> [total_ns, calls]
+        self.started_ns = time.perf_counter_ns()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.started_ns = time.perf_counter_ns()
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timer(self, name: str):
+        return _Timer(self.timers, name) if self.enabled else _NULL_TIMER
+
+    def add_time(self, name: str, elapsed_ns: int, calls: int = 1):
+        if self.enabled:
+            entry = self.timers.setdefault(name, [0, 0])
+            entry[0] += int(elapsed_ns)
+            entry[1] += calls
+
+    def snapshot(self, **extra: Any) -> Dict[str, Any]:
+        rss = peak_rss_bytes()
+        return {
+            'wall_s': (time.perf_counter_ns() - self.started_ns) / 1e9,
+            'peak_rss_mb': rss / 2**20 if rss is not None else None,
+            'counters': dict(sorted(self.counters.items())),
+            'timers': {name: {'total_s': total / 1e9, 'calls': calls, 'mean_us': total / calls / 1e3 if calls else 0.0}
+                       for name, (total, calls) in sorted(self.timers.items())},
+            **extra,
+        }
+
+    def write(self, path: Union[str, Path], **extra: Any) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(**extra), indent=2, default=str), encoding='utf-8')
+        return path
+
+
+telemetry = Telemetry(enabled=False)
+
+
+class _StackSampler(threading.Thread):
+    def __init__(self, thread_id: int, interval_s: float):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class SliceProfiler:
+    """Profiles events [start_event, start_event + n_events) of a replay.
+
+    'cprofile' runs the deterministic profiler over the slice and writes
+    `profile.pstats` plus a cumulative-time listing `profile.txt`;
+    'sampling' records the replay thread's stack every
+    `sample_interval_ms` from a background thread and writes collapsed
+    stacks (`profile_samples.txt`, flamegraph.pl format), which perturbs
+    the timings far less.
+    """
+
+    MODES = ('off', 'cprofile', 'sampling')
+
+    def __init__(self, mode: str = 'cprofile', start_event: int = 0, n_events: int = 10_000,
+                 sample_interval_ms: float = 1.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'. Expected one of {self.MODES}.")
+        self.mode = mode
+        self.start_event = int(start_event)
+        self.n_events = int(n_events)
+        self.sample_interval_ms = float(sample_interval_ms)
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self.samples: Counter = Counter()
+        self.profiled_events = 0
+
+    @classmethod
+    def from_config(cls, mode: Optional[str] = None) -> "SliceProfiler":
+        return cls(mode or app_config.get('Backtester', 'PROFILE_MODE', 'off'),
+                   app_config.getint('Backtester', 'PROFILE_START_EVENT', 0),
+                   app_config.getint('Backtester', 'PROFILE_EVENTS', 10_000),
+                   app_config.getfloat('Backtester', 'PROFILE_SAMPLE_INTERVAL_MS', 1.0))
+
+    def _start(self):
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == 'sampling':
+            self._sampler = _StackSampler(threading.get_ident(), self.sample_interval_ms / 1000)
+            self._sampler.start()
+
+    def _stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None and self._sampler.is_alive():
+            self._sampler.stop()
+            self.samples = self._sampler.samples
+
+    def wrap(self, events: Iterable[Any]) -> Iterator[Any]:
+        """Yield `events` unchanged, profiling while the slice's events are processed."""
+        if self.mode == 'off' or self.n_events <= 0:
+            yield from events
+            return
+        end = self.start_event + self.n_events
+        active = False
+        try:
+            for i, event in enumerate(events):
+                if i == self.start_event:
+                    self._start()
+                    active = True
+                elif i == end:
+                    self._stop()
+                    active = False
+                if active:
+                    self.profiled_events += 1
+                yield event
+        finally:
+            if active:
+                self._stop()
+
+    def write(self, output_dir: Union[str, Path]) -> List[Path]:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if self._profile is not None:
+            self._profile.dump_stats(output_dir / 'profile.pstats')
+            text = io.StringIO()
+            pstats.Stats(self._profile, stream=text).sort_stats('cumulative').print_stats(40)
+            (output_dir / 'profile.txt').write_text(text.getvalue(), encoding='utf-8')
+            written += [output_dir / 'profile.pstats', output_dir / 'profile.txt']
+        if self.samples:
+            lines = [f"{stack} {n}" for stack, n in self.samples.most_common()]
+            (output_dir / 'profile_samples.txt').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+            written.append(output_dir / 'profile_samples.txt')
+        if written:
+            logger.info(f"Profile of {self.profiled_events} events ({self.mode}) written to {output_dir}")
+        return written
@@ -1 +1,48 @@
+"""Paper-trading entry point: TradingView-style alerts -> risk engine -> SimulatedBroker.
 
+Usage (from the repository root):
+    PYTHONPATH=src python src/paper_trading_pipeline/webhook_listener_example.py --port 8080
+
+Then POST alerts, e.g.
+    curl -X POST localhost:8080/webhook -d '{"ticker": "AAPL", "action": "buy", "price": 190.5, "stop": 177.2}'
+Set CHERRY_WEBHOOK_SECRET to require a matching "secret" field.
+"""
+import argparse
+import asyncio
+
+from cherry_algo_framework.execution_mgt.simulated_broker import SimulatedBroker
+from cherry_algo_framework.execution_mgt.webhook_listener import WebhookListener
+from cherry_algo_framework.portfolio_mgt.portfolio import Portfolio
+from cherry_algo_framework.risk_mgt.risk_mgt.risk_engine import RiskEngine, RiskState
+from cherry_algo_framework.utils.config_loader import app_config
+from cherry_algo_framework.utils.logging_setup import logger
+
+
+async def main(host: str, port: int, report_every: float):
+    portfolio = Portfolio([], app_config.getfloat('BrokerSimulated', 'INITIAL_EQUITY', 25000.0))
+    broker = SimulatedBroker()
+
+    def sink(order):
+        logger.info(f"Order: {order.direction} {order.quantity:g} {order.symbol} ({order.order_type})")
+        broker.execute_order(order)
+
+    listener = WebhookListener(RiskEngine(), lambda: RiskState.from_portfolio(portfolio), sink)
+    await listener.serve(host, port)
+    try:
+        while True:
+            await asyncio.sleep(report_every)
+            logger.info(f"Webhook stats: {listener.latency_summary()}")
+    finally:
+        await listener.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--report_every', type=float, default=30.0, help="seconds between latency reports")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.report_every))
+    except KeyboardInterrupt:
+        pass
@@ -1 +1,103 @@
+from pathlib import Path
 
+import numpy as np
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+from cherry_algo_framework.data_mgt.directory_data_handler import DirectoryDataHandler
+from cherry_algo_framework.main_backtest_runner import run_backtest
+
+SAMPLE_CSV = Path(__file__).resolve().parents[2] / "data" / "sample_market_data.csv"
+BROKER = dict(initial_equity=25000.0, commission_per_share=0.0035,
+              commission_min_per_order=0.50, slippage_pct=0.0002)
+
+
+def _write_synthetic_csv(path: Path, seed: int = 11) -> list:
+    # Three symbols with different start times, missing bars and shared
+    # timestamps, spanning the 19:55 UTC flatten cutoff on two sessions.
+    rng = np.random.default_rng(seed)
+    frames = []
+    symbols = ["AAA", "BBB", "CCC"]
+    for k, symbol in enumerate(symbols):
+        day1 = pd.date_range("2023-03-01 19:00", "2023-03-01 20:00", freq="1min", tz="UTC")
+        day2 = pd.date_range("2023-03-02 14:30", "2023-03-02 20:00", freq="1min", tz="UTC")
+        index = day1.append(day2)[k * 3:]
+        index = index[rng.random(len(index)) > 0.1]
+        close = 5.0 * (k + 1) * np.exp(np.cumsum(rng.normal(0.0, 0.004, len(index))))
+        open_ = close * (1 + rng.normal(0.0, 0.001, len(index)))
+        frames.append(pd.DataFrame({
+            "datetime": index, "symbol": symbol, "open": open_, "high": np.maximum(open_, close) * 1.001,
+            "low": np.minimum(open_, close) * 0.999, "close": close, "volume": rng.integers(100, 10_000, len(index)),
+        }))
+    pd.concat(frames).sample(frac=1.0, random_state=seed).to_csv(path, index=False)
+    return symbols
+
+
+def _run_both(csv_path, symbols, params, **handler_kwargs):
+    results = {}
+    for mode in ("event", "vectorized"):
+        handler = CSVDataHandler(csv_path, symbols, **handler_kwargs)
+        results[mode] = run_backtest(handler, "example_momentum", params, mode=mode, **BROKER)
+    return results["event"], results["vectorized"]
+
+
+def _assert_parity(event, vectorized):
+    pd.testing.assert_frame_equal(event.fills, vectorized.fills, check_exact=True, check_dtype=False)
+    np.testing.assert_array_equal(event.equity_curve.index.as_unit("ns").asi8,
+                                  vectorized.equity_curve.index.as_unit("ns").asi8)
+    np.testing.assert_array_equal(event.equity_curve.to_numpy(), vectorized.equity_curve.to_numpy())
+    assert event.final_cash == vectorized.final_cash
+    assert event.final_positions == vectorized.final_positions
+
+
+def test_vectorized_matches_event_driven_on_sample_data():
+    params = {"lookback_bars": 1, "entry_threshold_pct": 0.001, "exit_threshold_pct": -0.001, "order_quantity": 10}
+    event, vectorized = _run_both(SAMPLE_CSV, ["AAPL"], params)
+    assert len(event.fills) > 0
+    _assert_parity(event, vectorized)
+
+
+@pytest.mark.parametrize("params", [
+    {"lookback_bars": 3, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100},
+    {"lookback_bars": 1, "entry_threshold_pct": 0.0, "exit_threshold_pct": 0.0, "order_quantity": 7},
+    {"lookback_bars": 10, "entry_threshold_pct": 0.01, "exit_threshold_pct": -0.005, "order_quantity": 50,
+     "flatten_time_utc": "19:30"},
+])
+def test_vectorized_matches_event_driven_multi_symbol(tmp_path, params):
+    csv_path = tmp_path / "bars.csv"
+    symbols = _write_synthetic_csv(csv_path)
+    event, vectorized = _run_both(csv_path, symbols, params, symbol_column="symbol")
+    assert len(event.fills) > 4
+    assert set(event.fills["symbol"]) == set(symbols)
+    _assert_parity(event, vectorized)
+
+
+def test_handler_profiling_leaves_results_unchanged(tmp_path):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    params = {"lookback_bars": 3, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100}
+    plain, profiled = (run_backtest(CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol"),
+                                    "example_momentum", params, profile=profile, **BROKER) for profile in (False, True))
+    _assert_parity(plain, profiled)
+    report = profiled.handler_profile.set_index("handler")
+    n_bars = len(profiled.equity_curve)
+    assert report.loc["ExampleMomentumStrategy.calculate_signals", "calls"] >= n_bars
+    assert report.loc["Portfolio.on_fill", "calls"] == len(profiled.fills)
+
+
+def test_row_streaming_feeds_run_in_event_mode(tmp_path):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    frame = pd.read_csv(tmp_path / "bars.csv")
+    (tmp_path / "by_symbol").mkdir()
+    for symbol, rows in frame.groupby("symbol"):
+        rows.drop(columns="symbol").sort_values("datetime").to_csv(tmp_path / "by_symbol" / f"{symbol}.csv",
+                                                                   index=False)
+    params = {"lookback_bars": 3, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100}
+    columnar = run_backtest(CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol"),
+                            "example_momentum", params, **BROKER)
+    streamed = run_backtest(DirectoryDataHandler(tmp_path / "by_symbol", symbols), "example_momentum", params, **BROKER)
+    assert len(streamed.fills) > 4
+    _assert_parity(columnar, streamed)
+    with pytest.raises(ValueError, match="columnar"):
+        run_backtest(DirectoryDataHandler(tmp_path / "by_symbol", symbols), "example_momentum", params,
+                     mode="vectorized", **BROKER)
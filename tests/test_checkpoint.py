@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.core.checkpoint import BacktestCheckpoint, _HEADER
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+from cherry_algo_framework.main_backtest_runner import run_backtest
+
+from tests.integration.test_backtest_pipeline import BROKER, _write_synthetic_csv
+
+PARAMS = {"lookback_bars": 3, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100}
+
+
+def _assert_identical(full, resumed):
+    pd.testing.assert_frame_equal(full.fills, resumed.fills, check_exact=True)
+    pd.testing.assert_series_equal(full.equity_curve, resumed.equity_curve, check_exact=True)
+    assert full.final_cash == resumed.final_cash
+    assert full.final_positions == resumed.final_positions
+    assert full.metrics == resumed.metrics
+
+
+@pytest.mark.parametrize("params", [PARAMS, {**PARAMS, "entry_threshold_pct": -0.5, "exit_threshold_pct": -0.9}])
+def test_resume_from_mid_session_checkpoint_matches_full_replay(tmp_path, params):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    full = run_backtest(CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol"),
+                        "example_momentum", params, **BROKER)
+    checkpointed = run_backtest(CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol"),
+                                "example_momentum", params, checkpoint_path=tmp_path / "run.ckpt",
+                                checkpoint_at="2023-03-02 16:00", **BROKER)
+    _assert_identical(full, checkpointed)
+
+    resumed = run_backtest(CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol"),
+                           "example_momentum", params, resume_from=tmp_path / "run.ckpt", **BROKER)
+    assert len(full.fills) > 0
+    _assert_identical(full, resumed)
+
+
+def test_incremental_run_on_appended_bars(tmp_path):
+    # Yesterday's run checkpoints after its last bar; today's resumes on the
+    # extended file and replays only the new session.
+    symbols = _write_synthetic_csv(tmp_path / "full.csv")
+    frame = pd.read_csv(tmp_path / "full.csv", parse_dates=["datetime"])
+    frame[frame["datetime"] < "2023-03-02"].to_csv(tmp_path / "day1.csv", index=False)
+
+    run_backtest(CSVDataHandler(tmp_path / "day1.csv", symbols, symbol_column="symbol"), "example_momentum",
+                 PARAMS, checkpoint_path=tmp_path / "run.ckpt", **BROKER)
+    checkpoint = BacktestCheckpoint.load(tmp_path / "run.ckpt")
+    assert checkpoint.as_of_ns == pd.Timestamp("2023-03-01 20:00", tz="UTC").value
+
+    full = run_backtest(CSVDataHandler(tmp_path / "full.csv", symbols, symbol_column="symbol"),
+                        "example_momentum", PARAMS, **BROKER)
+    resumed = run_backtest(CSVDataHandler(tmp_path / "full.csv", symbols, symbol_column="symbol"),
+                           "example_momentum", PARAMS, resume_from=tmp_path / "run.ckpt", **BROKER)
+    _assert_identical(full, resumed)
+
+
+def test_resume_rejects_changed_history_settings_and_version(tmp_path):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    run_backtest(CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol"), "example_momentum",
+                 PARAMS, checkpoint_path=tmp_path / "run.ckpt", checkpoint_at="2023-03-02 16:00", **BROKER)
+
+    with pytest.raises(ValueError, match="lookback_bars|params"):
+        run_backtest(CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol"), "example_momentum",
+                     {**PARAMS, "lookback_bars": 4}, resume_from=tmp_path / "run.ckpt", **BROKER)
+
+    frame = pd.read_csv(tmp_path / "bars.csv", parse_dates=["datetime"])
+    frame.loc[frame["datetime"].idxmin(), "close"] += 0.01
+    frame.to_csv(tmp_path / "edited.csv", index=False)
+    with pytest.raises(ValueError, match="differs"):
+        run_backtest(CSVDataHandler(tmp_path / "edited.csv", symbols, symbol_column="symbol"), "example_momentum",
+                     PARAMS, resume_from=tmp_path / "run.ckpt", **BROKER)
+
+    raw = (tmp_path / "run.ckpt").read_bytes()
+    magic, _ = _HEADER.unpack_from(raw)
+    (tmp_path / "future.ckpt").write_bytes(_HEADER.pack(magic, 99) + raw[_HEADER.size:])
+    with pytest.raises(ValueError, match="version 99"):
+        BacktestCheckpoint.load(tmp_path / "future.ckpt")
@@ -0,0 +1,152 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+from cherry_algo_framework.data_mgt.directory_data_handler import DirectoryDataHandler
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "data" / "sample_market_data.csv"
+
+MULTI_SYMBOL_CSV = """datetime,symbol,open,high,low,close,volume,vwap
+2023-01-03T09:30:00Z,aapl,150.00,150.50,149.80,150.25,10000,150.1
+2023-01-03T09:30:00Z,msft,250.00,250.50,249.80,250.25,20000,250.1
+2023-01-03T09:31:00Z,msft,250.25,250.60,250.10,250.55,22000,250.3
+2023-01-03T09:31:00Z,aapl,150.25,150.60,150.10,150.55,12000,150.3
+2023-01-03T09:33:00Z,aapl,150.55,151.00,150.50,150.95,15000,150.8
+"""
+
+
+def _replay(source, *args, **kwargs):
+    if source.is_dir():
+        handler = DirectoryDataHandler(source, *args, **kwargs)
+    else:
+        handler = CSVDataHandler(source, *args, **kwargs)
+    return [(event.type, event.data) for event in handler.stream_next()]
+
+
+def _assert_identical(legacy, columnar, strict_types=True):
+    assert len(legacy) == len(columnar)
+    for (legacy_type, legacy_data), (columnar_type, columnar_data) in zip(legacy, columnar):
+        assert legacy_type == columnar_type
+        assert list(legacy_data) == list(columnar_data)
+        for key, value in legacy_data.items():
+            assert columnar_data[key] == value
+            if strict_types:
+                assert type(columnar_data[key]) is type(value)
+
+
+def test_columnar_replay_matches_iterrows_single_symbol():
+    legacy = _replay(SAMPLE_CSV, ["AAPL"], replay_mode="iterrows")
+    columnar = _replay(SAMPLE_CSV, ["AAPL"], replay_mode="columnar")
+    assert len(legacy) == 5
+    _assert_identical(legacy, columnar)
+
+
+def test_columnar_replay_matches_iterrows_multi_symbol(tmp_path):
+    csv_path = tmp_path / "multi.csv"
+    csv_path.write_text(MULTI_SYMBOL_CSV)
+    symbols = ["MSFT", "AAPL"]
+    legacy = _replay(csv_path, symbols, symbol_column="symbol", replay_mode="iterrows")
+    columnar = _replay(csv_path, symbols, symbol_column="symbol", replay_mode="columnar")
+    _assert_identical(legacy, columnar)
+    assert [data["symbol"] for _, data in columnar] == ["MSFT", "AAPL", "MSFT", "AAPL", "AAPL"]
+
+
+def test_unknown_replay_mode_rejected():
+    with pytest.raises(ValueError):
+        CSVDataHandler(SAMPLE_CSV, ["AAPL"], replay_mode="rowwise")
+
+
+def test_directory_feed_merges_chunked_files_like_csv_handler(tmp_path):
+    csv_path = tmp_path / "multi.csv"
+    csv_path.write_text(MULTI_SYMBOL_CSV)
+    data_dir = tmp_path / "per_symbol"
+    data_dir.mkdir()
+    lines = MULTI_SYMBOL_CSV.strip().splitlines()
+    header = lines[0].replace(",symbol", "")
+    for symbol in ("aapl", "msft"):
+        rows = [line.replace(f",{symbol},", ",") for line in lines[1:] if f",{symbol}," in line]
+        (data_dir / f"{symbol.upper()}.csv").write_text("\n".join([header] + rows) + "\n")
+
+    expected = _replay(csv_path, ["AAPL", "MSFT"], symbol_column="symbol")
+    streamed = _replay(data_dir, chunk_size=1)
+    assert [data["symbol"] for _, data in streamed] == ["AAPL", "MSFT", "AAPL", "MSFT", "AAPL"]
+    # Without a text symbol column the per-symbol files decode as float64, not object.
+    _assert_identical(expected, streamed, strict_types=False)
+
+
+def test_directory_feed_rejects_unsorted_file(tmp_path):
+    (tmp_path / "AAPL.csv").write_text(
+        "datetime,open,high,low,close,volume\n"
+        "2023-01-03T09:31:00Z,1,1,1,1,1\n"
+        "2023-01-03T09:30:00Z,1,1,1,1,1\n"
+    )
+    with pytest.raises(ValueError):
+        list(DirectoryDataHandler(tmp_path, chunk_size=1).stream_next())
+
+
+def test_bar_cache_round_trip_is_memory_mapped(tmp_path):
+    csv_path = tmp_path / "multi.csv"
+    csv_path.write_text(MULTI_SYMBOL_CSV)
+    cache_dir = tmp_path / "cache"
+    kwargs = dict(symbol_column="symbol", cache_dir=cache_dir)
+
+    cold = CSVDataHandler(csv_path, ["MSFT", "AAPL"], **kwargs)
+    assert len(list(cache_dir.iterdir())) == 1
+    warm = CSVDataHandler(csv_path, ["MSFT", "AAPL"], **kwargs)
+    assert warm.data_frames == {}
+    assert isinstance(warm.columnar_data["AAPL"].columns["close"], np.memmap)
+
+    _assert_identical([(e.type, e.data) for e in cold.stream_next()],
+                      [(e.type, e.data) for e in warm.stream_next()])
+
+    window = warm.get_historical_bars(["aapl"], "2023-01-03T09:31:00Z", "2023-01-03T09:33:00Z")["AAPL"]
+    assert list(window.columns["close"]) == [150.55, 150.95]
+    assert np.shares_memory(window.columns["close"], warm.columnar_data["AAPL"].columns["close"])
+    frame = warm.get_historical_data(["AAPL"], "2023-01-03T09:31:00Z", "2023-01-03T09:33:00Z")["AAPL"]
+    assert list(frame["volume"]) == [12000, 15000]
+
+    # Different loader options must not reuse the entry.
+    CSVDataHandler(csv_path, ["AAPL"], **kwargs)
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+@pytest.mark.parametrize("replay_mode", ["iterrows", "columnar"])
+def test_latest_bars_are_point_in_time_views(tmp_path, replay_mode):
+    csv_path = tmp_path / "multi.csv"
+    csv_path.write_text(MULTI_SYMBOL_CSV)
+    handler = CSVDataHandler(csv_path, ["MSFT", "AAPL"], symbol_column="symbol", replay_mode=replay_mode)
+    handler.history_capacity = 2  # AAPL's three bars wrap the buffer
+    seen = {"AAPL": [], "MSFT": []}
+    for event in handler.stream_next():
+        seen[event.data["symbol"]].append(event.data["close"])
+        for symbol, closes in seen.items():
+            window = handler.get_latest_bars(symbol, 2, "close")
+            assert window.tolist() == closes[-2:]  # only bars already published
+            if closes:
+                assert not window.flags.writeable and window.base is not None
+    assert handler.get_latest_bars("AAPL", field="volume").tolist() == [12000.0, 15000.0]
+    assert handler.get_latest_bars("AAPL", 1, "datetime")[0] == np.datetime64("2023-01-03T09:33", "ns").astype(np.int64)
+    assert handler.get_latest_bars("TSLA", 2).size == 0
+    with pytest.raises(ValueError):
+        handler.get_latest_bars("AAPL", 3)
+
+
+@pytest.mark.parametrize("symbols, symbol_column", [(["AAPL"], None), (["MSFT", "AAPL"], "symbol")])
+def test_historical_data_keeps_source_columns_and_dtypes(tmp_path, symbols, symbol_column):
+    csv_path = tmp_path / "bars.csv"
+    csv_path.write_text(SAMPLE_CSV.read_text() if symbol_column is None else MULTI_SYMBOL_CSV)
+    kwargs = dict(symbol_column=symbol_column, cache_dir=tmp_path / "cache")
+    cold = CSVDataHandler(csv_path, symbols, **kwargs)
+    warm = CSVDataHandler(csv_path, symbols, **kwargs)
+    assert warm.data_frames == {}
+
+    window = ("2023-01-03T09:31:00Z", "2023-01-03T09:33:00Z")
+    source = cold.data_frames["AAPL"]
+    expected = source.loc[pd.Timestamp(window[0]):pd.Timestamp(window[1])]
+    for handler in (cold, warm):
+        frame = handler.get_historical_data(["AAPL"], *window)["AAPL"]
+        assert frame.dtypes.to_dict() == source.dtypes.to_dict()
+        pd.testing.assert_frame_equal(frame, expected, check_index_type=False)
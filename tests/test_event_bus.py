@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from cherry_algo_framework.core.event import EventType, FillEvent, MarketBarEvent, MarketBarEventPool, OrderEvent
+from cherry_algo_framework.core.event_bus import EventBus
+
+T0 = datetime(2024, 1, 2, 14, 30)
+
+
+def _bars():
+    # Two symbols per timestamp, three timestamps.
+    return [MarketBarEvent(symbol, T0 + timedelta(minutes=m), close=10.0 + m)
+            for m in range(3) for symbol in ('AAA', 'BBB')]
+
+
+def test_priority_order_and_return_values_dispatch_immediately():
+    bus = EventBus()
+    calls = []
+    bus.subscribe(EventType.MARKET, lambda e: calls.append(('late', e.symbol)), priority=5)
+    bus.subscribe(EventType.MARKET,
+                  lambda e: [FillEvent(e.symbol, e.datetime, 'BUY', 1, e.close)] if e.symbol == 'AAA' else None,
+                  priority=0)
+    bus.subscribe(EventType.MARKET, lambda e: bus.publish(OrderEvent(e.symbol, e.datetime, 'MKT', 'BUY', 1)), priority=5)
+    bus.subscribe(EventType.FILL, lambda e: calls.append(('fill', e.symbol)))
+    bus.subscribe(EventType.ORDER, lambda e: calls.append(('order', e.symbol)))
+
+    bus.run(_bars()[:2])
+    # The fill returned by the first handler lands before later handlers; the published order waits for drain().
+    assert calls == [('fill', 'AAA'), ('late', 'AAA'), ('order', 'AAA'), ('late', 'BBB'), ('order', 'BBB')]
+
+
+def test_same_timestamp_batches_and_release():
+    pool = MarketBarEventPool()
+    bus = EventBus()
+    batches, released = [], []
+    bus.subscribe(EventType.MARKET, lambda e: None)
+    bus.subscribe_batch(lambda bars: batches.append([(b.close, b.symbol) for b in bars]))
+    bus.run(_bars(), release=lambda e: (released.append(e.symbol), pool.release(e)))
+    assert batches == [[(10.0, 'AAA'), (10.0, 'BBB')], [(11.0, 'AAA'), (11.0, 'BBB')], [(12.0, 'AAA'), (12.0, 'BBB')]]
+    assert len(released) == 6 and len(pool) == 6
+    assert (bus.market_events, bus.market_timestamps) == (6, 3)
+
+
+def test_profile_report_counts_calls_per_handler():
+    class Slow:
+        def on_bar(self, bar):
+            sum(range(2000))
+
+    bus = EventBus(profile=True)
+    bus.subscribe(EventType.MARKET, Slow().on_bar)
+    bus.subscribe(EventType.MARKET, lambda e: None, name='noop')
+    bus.run(_bars())
+    report = bus.profile_report().set_index('handler')
+    assert list(report.index) == ['Slow.on_bar', 'noop']
+    assert report.loc['Slow.on_bar', 'calls'] == 6
+    assert report.loc['Slow.on_bar', 'total_ms'] > report.loc['noop', 'total_ms']
+    assert abs(report['share'].sum() - 1) < 1e-9
+    bus.reset_profile()
+    assert bus.profile_report()['calls'].sum() == 0
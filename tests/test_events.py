@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from cherry_algo_framework.core.event import (
+    EventType, FillEvent, MarketBarEvent, MarketBarEventPool, OrderEvent, SignalEvent,
+)
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "data" / "sample_market_data.csv"
+T0 = datetime(2023, 1, 3, 9, 30, tzinfo=timezone.utc)
+
+
+def test_typed_events_are_slotted_and_expose_data_view():
+    bar = MarketBarEvent("AAPL", T0, 1.0, 2.0, 0.5, 1.5, 100.0, extras={"vwap": 1.2})
+    signal = SignalEvent("AAPL", T0, "LONG", strength=0.5)
+    order = OrderEvent("AAPL", T0, "MKT", "BUY", 100)
+    fill = FillEvent("AAPL", T0, "BUY", 100, 1.5, commission=0.5)
+    for event in (bar, signal, order, fill):
+        assert not hasattr(event, "__dict__")
+
+    assert bar.type is EventType.MARKET
+    assert bar.data == {"symbol": "AAPL", "datetime": T0, "open": 1.0, "high": 2.0,
+                        "low": 0.5, "close": 1.5, "volume": 100.0, "vwap": 1.2}
+    assert bar.get("close") == 1.5 and bar.get("vwap") == 1.2
+    assert signal.data["signal_type"] == "LONG"
+    assert order.data["direction"] == "BUY"
+    assert fill.data["commission"] == 0.5
+
+
+def test_pooled_replay_recycles_events_without_corrupting_latest_bar():
+    pool = MarketBarEventPool()
+    handler = CSVDataHandler(SAMPLE_CSV, ["AAPL"], event_pool=pool)
+    closes = []
+    for event in handler.stream_next():
+        closes.append(event.close)
+        assert handler.get_latest_bar_value("AAPL", "close") == event.close
+        pool.release(event)
+    assert pool.allocated == 1
+    assert closes == [150.25, 150.55, 150.95, 150.10, 150.30]
+    assert handler.get_latest_bar_all_values("AAPL")["close"] == 150.30
+
+
+def test_pool_rejects_double_release():
+    pool = MarketBarEventPool()
+    event = pool.acquire("AAPL", None, close=1.0)
+    pool.release(event)
+    with pytest.raises(ValueError):
+        pool.release(event)
+    assert len(pool) == 1
+    first, second = pool.acquire("AAPL", None, close=2.0), pool.acquire("MSFT", None, close=3.0)
+    assert first is not second and first.close == 2.0
+    pool.release(first)  # handed out again, so it can be released again
+    assert len(pool) == 1
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.core.event import MarketBarEvent
+from cherry_algo_framework.data_mgt.columnar_bars import ColumnarBars, ns_to_datetime
+from cherry_algo_framework.strategy.base_strategy import BaseStrategy
+from cherry_algo_framework.strategy.indicators import (
+    EMA, VWAP, GapPct, RelativeVolume, RollingMax, RollingMean, RollingMin, RollingStd, RollingSum, SessionSum,
+)
+
+
+def _bars(seed=3, days=4, per_day=97):
+    # 07:00-15:00 UTC 5-minute bars over a few days: covers warm-up, session resets and pre-market windows.
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex([ts for d in pd.date_range("2023-03-01", periods=days, freq="D", tz="UTC")
+                              for ts in pd.date_range(d + pd.Timedelta(hours=7), periods=per_day, freq="5min")])
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    open_ = close * (1 + rng.normal(0, 0.003, len(index)))
+    frame = pd.DataFrame({'open': open_, 'high': np.maximum(open_, close) * 1.002,
+                          'low': np.minimum(open_, close) * 0.998, 'close': close,
+                          'volume': rng.integers(100, 50_000, len(index)).astype(float)}, index=index)
+    return ColumnarBars.from_frame(frame), frame
+
+
+PROTOTYPES = {
+    'sum': RollingSum(12, 'volume'), 'mean': RollingMean(20), 'std': RollingStd(20), 'ema': EMA(9),
+    'hi': RollingMax(14), 'lo': RollingMin(14), 'rvol': RelativeVolume(10),
+    'premarket_volume': SessionSum('volume', '07:00', '13:30'), 'vwap': VWAP(), 'gap': GapPct(),
+}
+
+
+class _Recorder(BaseStrategy):
+    def __init__(self):
+        super().__init__('REC', ['AAA'])
+        for name, proto in PROTOTYPES.items():
+            self.register_indicator(name, proto)
+        self.history = {name: [] for name in PROTOTYPES}
+
+    def calculate_signals(self, event):
+        for name, value in self.update_indicators(event).values().items():
+            self.history[name].append(value)
+
+
+def test_streaming_matches_batch_exactly():
+    bars, frame = _bars()
+    strategy = _Recorder()
+    for i in range(len(bars)):
+        c = bars.columns
+        strategy.calculate_signals(MarketBarEvent('AAA', ns_to_datetime(bars.timestamps[i]), c['open'][i],
+                                                  c['high'][i], c['low'][i], c['close'][i], c['volume'][i]))
+    batch = strategy.batch_indicators(bars)
+    for name in PROTOTYPES:
+        assert np.array_equal(np.array(strategy.history[name]), batch[name], equal_nan=True), name
+    # The prototypes themselves are never advanced.
+    assert np.isnan(PROTOTYPES['mean'].value)
+
+
+def test_batch_values_match_references():
+    bars, frame = _bars()
+    out = {name: proto.batch_bars(bars) for name, proto in PROTOTYPES.items()}
+    np.testing.assert_allclose(out['mean'], frame['close'].rolling(20).mean(), rtol=1e-12)
+    np.testing.assert_allclose(out['std'], frame['close'].rolling(20).std(), rtol=1e-8)
+    np.testing.assert_allclose(out['ema'], frame['close'].ewm(span=9, adjust=False).mean(), rtol=1e-12)
+    np.testing.assert_array_equal(out['hi'], frame['high'].rolling(14).max())
+    np.testing.assert_array_equal(out['lo'], frame['low'].rolling(14).min())
+    np.testing.assert_allclose(out['rvol'], frame['volume'] / frame['volume'].rolling(10).mean().shift(), rtol=1e-12)
+
+    day = frame.index.normalize()
+    premarket = frame['volume'].where(frame.index.time < pd.Timestamp("13:30").time(), 0.0)
+    np.testing.assert_allclose(out['premarket_volume'], premarket.groupby(day).cumsum(), rtol=1e-12)
+    typical = (frame['high'] + frame['low'] + frame['close']) / 3
+    vwap = (typical * frame['volume']).groupby(day).cumsum() / frame['volume'].groupby(day).cumsum()
+    np.testing.assert_allclose(out['vwap'], vwap, rtol=1e-12)
+    gaps = frame['open'].groupby(day).transform('first') / frame['close'].groupby(day).last().shift().reindex(day).to_numpy() - 1
+    np.testing.assert_allclose(out['gap'], gaps, rtol=1e-12)
+
+
+def test_windows_validate_and_fresh_copies_are_independent():
+    with pytest.raises(ValueError):
+        RollingStd(1)
+    proto = RollingMean(2)
+    a, b = proto.fresh(), proto.fresh()
+    a.update(1.0)
+    a.update(3.0)
+    assert (a.value, np.isnan(b.value)) == (2.0, True)
+    assert np.isnan(RollingSum(5).batch(np.ones(3))).all()
@@ -0,0 +1,79 @@
+import os
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+from cherry_algo_framework.utils.config_loader import Config, Settings, app_config
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _run(code: str) -> str:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    return subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+
+def test_package_import_is_lazy():
+    out = _run(
+        "import sys, cherry_algo_framework as caf\n"
+        "print(sorted(m for m in ('loguru', 'pandas', 'numpy', 'configparser', 'cherry_algo_framework.utils')"
+        " if m in sys.modules))\n"
+        "print(caf.data_mgt.BarRingBuffer.__name__, caf.app_config.getint('MarketData', 'HISTORY_BARS', 0))\n"
+    )
+    assert out.splitlines() == ["[]", "BarRingBuffer 500"]
+
+
+def test_logging_sinks_open_on_first_use():
+    out = _run(
+        "import sys\n"
+        "import cherry_algo_framework.main_backtest_runner\n"
+        "from cherry_algo_framework.utils import logging_setup\n"
+        "print(logging_setup.INITIALIZED_LOGGING, 'loguru' in sys.modules)\n"
+        "logging_setup.disable_logging()\n"
+        "logging_setup.logger.info('silent')\n"
+        "print(logging_setup.INITIALIZED_LOGGING)\n"
+    )
+    assert out.splitlines() == ["False False", "True"]
+
+
+def test_logging_setup_keeps_application_sinks():
+    out = _run(
+        "from loguru import logger as loguru_logger\n"
+        "records = []\n"
+        "loguru_logger.add(records.append, format='{message}')\n"
+        "from cherry_algo_framework.utils import logging_setup\n"
+        "logging_setup.logger.info('from the framework')\n"
+        "logging_setup.INITIALIZED_LOGGING = False\n"
+        "logging_setup.setup_logging()\n"
+        "print(len(logging_setup._HANDLER_IDS), [m.split('.')[0].strip() for m in records])\n"
+    )
+    # The sink added before setup (and again after a second setup) still gets every record.
+    assert out.splitlines()[-1] == "2 ['Logging initialized', 'from the framework', 'Logging initialized']"
+
+
+def test_importing_the_runner_reads_no_config():
+    out = _run(
+        "import cherry_algo_framework.main_backtest_runner\n"
+        "from cherry_algo_framework.utils.config_loader import Config\n"
+        "from cherry_algo_framework.utils.telemetry import telemetry\n"
+        "print(Config._config_parser is None, Config._snapshot is None, telemetry.enabled)\n"
+    )
+    assert out.splitlines() == ["True True False"]
+
+
+def test_settings_snapshot_is_typed_and_reusable(monkeypatch):
+    # use_snapshot() swaps the process-wide config; put it back afterwards.
+    for name in ("_config_parser", "_config_path", "_snapshot"):
+        monkeypatch.setattr(Config, name, getattr(Config, name))
+    snapshot = app_config.snapshot()
+    assert isinstance(snapshot, Settings) and app_config.snapshot() is snapshot
+    assert snapshot.initial_equity == app_config.getfloat('BrokerSimulated', 'INITIAL_EQUITY')
+    assert snapshot.max_open_positions == app_config.getint('RiskManagement', 'MAX_CONCURRENT_OPEN_POSITIONS')
+    assert snapshot.get('Backtester', 'OUTPUT_DIR') == app_config.get('Backtester', 'OUTPUT_DIR')
+
+    restored = pickle.loads(pickle.dumps(snapshot))
+    assert restored == snapshot
+    Config.use_snapshot(restored)  # as a sweep worker does
+    assert app_config.getfloat('BrokerSimulated', 'SLIPPAGE_PERCENT') == snapshot.slippage_pct
+    assert app_config.get_list('MarketData', 'DEFAULT_TICKERS') == snapshot.get('MarketData', 'DEFAULT_TICKERS').split(',')
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.core.event import PortfolioUpdateEvent
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+from cherry_algo_framework.execution_mgt.simulated_broker import SimulatedBroker
+from cherry_algo_framework.main_backtest_runner import run_backtest, run_event_driven_backtest
+from cherry_algo_framework.performance_mgt.metrics_calculator import StreamingMetrics, compute_metrics
+from cherry_algo_framework.portfolio_mgt.portfolio import Portfolio
+from cherry_algo_framework.strategy.example_momentum_strategy import ExampleMomentumStrategy
+
+from tests.integration.test_backtest_pipeline import BROKER, _write_synthetic_csv
+
+
+def _assert_close(streaming, batch):
+    assert streaming.keys() == batch.keys()
+    for key, value in batch.items():
+        if value is None:
+            assert streaming[key] is None, key
+        else:
+            assert streaming[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+
+
+def test_streaming_metrics_match_batch_on_event_backtest(tmp_path):
+    csv_path = tmp_path / "bars.csv"
+    symbols = _write_synthetic_csv(csv_path)
+    params = {"lookback_bars": 2, "entry_threshold_pct": 0.0005, "exit_threshold_pct": -0.0005,
+              "order_quantity": 50, "flatten_time_utc": "20:55"}
+    handler = CSVDataHandler(csv_path, symbols, symbol_column="symbol")
+    strategy = ExampleMomentumStrategy(symbols, data_feed=handler, params=params)
+    broker = SimulatedBroker(BROKER["commission_per_share"], BROKER["commission_min_per_order"],
+                             BROKER["slippage_pct"])
+    metrics = StreamingMetrics(BROKER["initial_equity"])
+    result = run_event_driven_backtest(handler, strategy, Portfolio(symbols, BROKER["initial_equity"]),
+                                       broker, metrics=metrics)
+
+    batch = compute_metrics(result.equity_curve, result.fills, BROKER["initial_equity"],
+                            handler.columnar_data, handler.column_map)
+    assert batch["num_trades"] > 3 and batch["avg_mfe_pct"] > 0
+    _assert_close(metrics.snapshot(), batch)
+    # Snapshots do not commit the provisional last point.
+    assert metrics.snapshot() == metrics.snapshot()
+
+
+def test_backtest_summary_carries_metrics_for_both_modes(tmp_path):
+    csv_path = tmp_path / "bars.csv"
+    symbols = _write_synthetic_csv(csv_path, seed=5)
+    handler = CSVDataHandler(csv_path, symbols, symbol_column="symbol")
+    event = run_backtest(handler, params={"lookback_bars": 3, "order_quantity": 40}, mode="event", **BROKER)
+    vectorized = run_backtest(handler, params={"lookback_bars": 3, "order_quantity": 40}, mode="vectorized",
+                              **BROKER)
+    assert event.summary()["metrics"] == vectorized.summary()["metrics"]
+
+
+def test_streaming_equity_updates_and_drawdown():
+    metrics = StreamingMetrics(100.0, periods_per_year=1)
+    ts = pd.date_range("2024-01-02", periods=5, freq="D", tz="UTC")
+    path = [110.0, 99.0, 121.0, 108.9, 130.0]
+    for dt, equity in zip(ts, path):
+        metrics.on_event(PortfolioUpdateEvent(dt, equity - 5.0))  # superseded by the same-timestamp update
+        metrics.on_event(PortfolioUpdateEvent(dt, equity))
+    snap = metrics.snapshot()
+    returns = np.array([110.0, 99.0, 121.0, 108.9, 130.0]) / np.array([100.0, 110.0, 99.0, 121.0, 108.9]) - 1
+    assert snap["periods"] == 5
+    assert snap["mean_return"] == pytest.approx(returns.mean())
+    assert snap["sharpe_ratio"] == pytest.approx(returns.mean() / returns.std(ddof=1))
+    assert snap["sortino_ratio"] == pytest.approx(returns.mean() / math.sqrt((np.minimum(returns, 0) ** 2).mean()))
+    assert snap["max_drawdown_pct"] == pytest.approx(10.0)
+    assert snap["current_drawdown_pct"] == 0.0
+    assert snap["num_trades"] == 0 and snap["win_rate"] is None
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.risk_mgt.risk_mgt.monte_carlo_validator import (
+    MonteCarloValidator, StreamingQuantiles, simulate_paths, trade_pnls_from_fills,
+)
+
+TRADES = np.array([120.0, -80.0, 45.0, -200.0, 310.0, -15.0, 60.0, -95.0, 150.0, -40.0])
+
+
+def _naive(pnls, indices, initial_equity, ruin_equity):
+    rows = []
+    for idx in indices:
+        equity, peak, max_dd, lowest = initial_equity, initial_equity, 0.0, initial_equity
+        for pnl in pnls[idx]:
+            equity += pnl
+            peak = max(peak, equity)
+            max_dd = max(max_dd, (peak - equity) / peak)
+            lowest = min(lowest, equity)
+        rows.append(((equity / initial_equity - 1) * 100, max_dd * 100, lowest <= ruin_equity))
+    return np.array(rows)
+
+
+def test_simulate_paths_matches_per_path_loop():
+    rng = np.random.default_rng(0)
+    indices = rng.integers(0, TRADES.size, size=(50, TRADES.size))
+    stats = simulate_paths(TRADES, indices, 1000.0, 700.0)
+    expected = _naive(TRADES, indices, 1000.0, 700.0)
+    np.testing.assert_allclose(stats['final_return_pct'], expected[:, 0], rtol=1e-12)
+    np.testing.assert_allclose(stats['max_drawdown_pct'], expected[:, 1], rtol=1e-12)
+    assert (stats['ruined'] == expected[:, 2].astype(bool)).all()
+    assert stats['ruined'].any() and not stats['ruined'].all()
+
+
+def test_seeded_runs_are_reproducible():
+    kwargs = dict(initial_equity=1000.0, n_simulations=3000, ruin_drawdown_pct=0.3,
+                  ruin_probability_threshold=0.05, chunk_size=700)
+    a = MonteCarloValidator(seed=42, **kwargs).run(TRADES).summary()
+    b = MonteCarloValidator(seed=42, **kwargs).run(TRADES).summary()
+    c = MonteCarloValidator(seed=43, **kwargs).run(TRADES).summary()
+    assert a == b
+    assert a != c
+
+
+def test_reshuffle_keeps_final_equity_and_flags_ruin():
+    validator = MonteCarloValidator(initial_equity=1000.0, n_simulations=2000, ruin_drawdown_pct=0.3,
+                                    ruin_probability_threshold=0.05, chunk_size=256, seed=1)
+    result = validator.run(TRADES, method='reshuffle')
+    final = result.metrics['final_return_pct']
+    assert final['quantiles']['p01'] == pytest.approx(TRADES.sum() / 10, abs=1e-9)
+    assert final['quantiles']['p99'] == pytest.approx(TRADES.sum() / 10, abs=1e-9)
+    lo, hi = result.ruin_ci
+    assert lo <= result.ruin_probability <= hi
+
+    losing = MonteCarloValidator(initial_equity=1000.0, n_simulations=500, ruin_drawdown_pct=0.3,
+                                 ruin_probability_threshold=0.05, seed=1).run([-100.0, -120.0, -140.0, -160.0, -180.0])
+    assert losing.ruin_probability == 1.0
+    assert not losing.passed
+
+
+def test_streaming_quantiles_bounded_and_close_to_exact():
+    values = np.random.default_rng(5).normal(size=200_000)
+    sketch = StreamingQuantiles(capacity=4_096, seed=0)
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+    assert sketch.compacted and sketch._stored() <= 4_096
+    qs = [0.05, 0.5, 0.95]
+    exact_ranks = np.searchsorted(np.sort(values), sketch.quantiles(qs)) / values.size
+    np.testing.assert_allclose(exact_ranks, qs, atol=0.01)
+
+
+def test_trade_pnls_from_fills_nets_round_trips():
+    fills = pd.DataFrame({
+        'datetime': pd.to_datetime(['2023-01-03 14:31', '2023-01-03 14:32', '2023-01-03 14:33',
+                                    '2023-01-03 14:34', '2023-01-03 14:35'], utc=True),
+        'symbol': ['AAA', 'BBB', 'AAA', 'BBB', 'AAA'],
+        'direction': ['BUY', 'BUY', 'SELL', 'SELL', 'BUY'],
+        'quantity': [100, 10, 100, 10, 5],
+        'fill_price': [10.0, 50.0, 10.5, 49.0, 11.0],
+        'commission': [0.5, 0.5, 0.5, 0.5, 0.5],
+    })
+    np.testing.assert_allclose(trade_pnls_from_fills(fills), [49.0, -11.0])
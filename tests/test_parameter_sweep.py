@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+from cherry_algo_framework.data_mgt.columnar_bars import ColumnarBars
+from cherry_algo_framework.optimization.parameter_sweep import (
+    ParameterSweep, expand_parameter_grid, walk_forward_windows,
+)
+
+BROKER = dict(initial_equity=25000.0, commission_per_share=0.0035,
+              commission_min_per_order=0.50, slippage_pct=0.0002)
+GRID = {"lookback_bars": [1, 3], "entry_threshold_pct": [0.0, 0.002], "exit_threshold_pct": -0.001,
+        "order_quantity": 10}
+
+
+def _bars(seed=3, n=400):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2023-03-01T14:30", "ns").astype(np.int64)
+    bars = {}
+    for k, symbol in enumerate(["AAA", "BBB"]):
+        ts = start + np.arange(n, dtype=np.int64) * 60_000_000_000 + k * 60_000_000_000
+        close = 10.0 * np.exp(np.cumsum(rng.normal(0.0, 0.003, n)))
+        bars[symbol] = ColumnarBars(ts, {"open": close * (1 + rng.normal(0, 0.001, n)), "high": close * 1.002,
+                                         "low": close * 0.998, "close": close, "volume": np.full(n, 1000.0)})
+    return bars
+
+
+def test_expand_parameter_grid_crosses_list_values():
+    grid = expand_parameter_grid(GRID)
+    assert len(grid) == 4
+    assert {(p["lookback_bars"], p["entry_threshold_pct"]) for p in grid} == {(1, 0.0), (1, 0.002), (3, 0.0), (3, 0.002)}
+    assert all(p["order_quantity"] == 10 for p in grid)
+
+
+def test_walk_forward_windows_split_each_fold_30_70():
+    timeline = np.arange(100, dtype=np.int64)
+    windows = walk_forward_windows(timeline, n_folds=2, in_sample_fraction=0.3)
+    assert windows == [((0, 14), (15, 49)), ((50, 64), (65, 99))]
+    with pytest.raises(ValueError):
+        walk_forward_windows(timeline, in_sample_fraction=1.0)
+
+
+def test_process_pool_sweep_matches_inline_and_resumes(tmp_path):
+    bars = _bars()
+    column_map = {c: c for c in ("open", "high", "low", "close", "volume")}
+    param_sets = expand_parameter_grid(GRID)
+
+    inline = ParameterSweep(bars, column_map, tmp_path / "inline", max_workers=1, **BROKER).run(param_sets)
+    pooled_sweep = ParameterSweep(bars, column_map, tmp_path / "pooled", max_workers=2, **BROKER)
+    pooled = pooled_sweep.run(param_sets)
+    assert [r["summary"] for r in pooled] == [r["summary"] for r in inline]
+    assert any(r["summary"]["num_fills"] > 0 for r in pooled)
+
+    # Simulate a crash after the first run: keep one record plus a torn line.
+    lines = pooled_sweep.runs_path.read_text().splitlines()
+    pooled_sweep.runs_path.write_text(lines[0] + "\n" + lines[1][:20])
+    resumed = pooled_sweep.run(param_sets)
+    records = [json.loads(line) for line in pooled_sweep.runs_path.read_text().splitlines()[2:]]
+    assert len(records) == 3
+    assert [r["summary"] for r in resumed] == [r["summary"] for r in inline]
+
+
+def test_walk_forward_picks_in_sample_best_and_tests_out_of_sample(tmp_path):
+    bars = _bars()
+    column_map = {c: c for c in ("open", "high", "low", "close", "volume")}
+    sweep = ParameterSweep(bars, column_map, tmp_path, max_workers=2, **BROKER)
+    folds = sweep.walk_forward(expand_parameter_grid(GRID), n_folds=2)
+    assert len(folds) == 2
+    for fold in folds:
+        assert fold["best_params"] in expand_parameter_grid(GRID)
+        assert fold["in_sample"][1] < fold["out_of_sample"][0]
+    assert json.loads((tmp_path / "walk_forward.json").read_text()) == json.loads(json.dumps(folds, default=str))
+
+
+def test_changed_costs_or_bars_are_not_served_from_runs_file(tmp_path):
+    bars = _bars()
+    column_map = {c: c for c in ("open", "high", "low", "close", "volume")}
+    param_sets = expand_parameter_grid(GRID)[:2]
+    base = ParameterSweep(bars, column_map, tmp_path, max_workers=1, **BROKER).run(param_sets)
+
+    costly = ParameterSweep(bars, column_map, tmp_path, max_workers=1,
+                            **dict(BROKER, commission_per_share=0.5)).run(param_sets)
+    assert {r["run_id"] for r in costly}.isdisjoint(r["run_id"] for r in base)
+    assert [r["summary"] for r in costly] != [r["summary"] for r in base]
+
+    other_bars = ParameterSweep(_bars(seed=4), column_map, tmp_path, max_workers=1, **BROKER).run(param_sets)
+    assert {r["run_id"] for r in other_bars}.isdisjoint(r["run_id"] for r in base)
+    assert len((tmp_path / "runs.jsonl").read_text().splitlines()) == 6
+
+    again = ParameterSweep(bars, column_map, tmp_path, max_workers=1, **BROKER).run(param_sets)
+    assert again == base
+    assert len((tmp_path / "runs.jsonl").read_text().splitlines()) == 6
@@ -1 +1,99 @@
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
+import pytest
+
+from cherry_algo_framework.core.event import FillEvent, MarketBarEvent
+from cherry_algo_framework.portfolio_mgt.portfolio import Portfolio
+from cherry_algo_framework.portfolio_mgt.position import Position
+from cherry_algo_framework.portfolio_mgt.position_ledger import PositionLedger
+
+T0 = datetime(2023, 3, 1, 14, 30, tzinfo=timezone.utc)
+
+
+def test_position_view_keeps_per_object_interface():
+    pos = Position("AAA")
+    pos.apply_fill("BUY", 100, 10.0, 1.0)
+    pos.apply_fill("BUY", 100, 12.0, 1.0)
+    assert (pos.quantity, pos.avg_cost, pos.is_open) == (200.0, 11.0, True)
+    assert pos.unrealized_pnl(12.5) == pytest.approx(300.0)
+    pos.apply_fill("SELL", 200, 13.0, 1.0)
+    assert (pos.quantity, pos.avg_cost, pos.realized_pnl, pos.total_commission) == (0.0, 0.0, 400.0, 3.0)
+    with pytest.raises(ValueError):
+        pos.apply_fill("SELL", 1, 13.0, 0.0)
+
+
+def test_ledger_grows_and_tracks_excursions():
+    ledger = PositionLedger(capacity=2)
+    ids = [ledger.symbol_id(f"S{i}") for i in range(5)]
+    assert ids == list(range(5)) and ledger.symbol_id("S3") == 3
+    ledger.apply_fill(3, "BUY", 10, 20.0, 0.0)
+    ledger.mark(3, 21.0, high=22.5, low=19.0)
+    ledger.mark_many(np.array([0, 3]), np.array([5.0, 20.5]), highs=np.array([5.5, 21.0]), lows=np.array([4.5, 18.0]))
+    assert ledger.max_price[3] == 22.5 and ledger.min_price[3] == 18.0
+    assert ledger.mfe()[3] == pytest.approx(25.0) and ledger.mae()[3] == pytest.approx(20.0)
+    assert ledger.mfe()[0] == 0.0  # flat: no excursion, even though it was marked
+    assert ledger.holdings_value() == 10 * 20.5
+    assert ledger.open_ids().tolist() == [3]
+
+
+def _reference_equity(cash, positions, last_close):
+    # The per-object computation the ledger replaces.
+    return cash + sum(qty * last_close[s] for s, qty in positions.items() if s in last_close)
+
+
+def test_vectorised_mark_to_market_matches_per_object_sum():
+    rng = np.random.default_rng(4)
+    symbols = [f"SYM{i:03d}" for i in range(60)]
+    portfolio = Portfolio(symbols, 1_000_000.0)
+    batched = Portfolio(symbols, 1_000_000.0)
+    held = {s: 0.0 for s in symbols}
+    last_close = {}
+    for step in range(200):
+        dt = T0 + timedelta(minutes=step)
+        active = sorted(rng.choice(len(symbols), size=int(rng.integers(1, 40)), replace=False))
+        closes = rng.uniform(1.0, 50.0, len(active)).round(4)
+        for k, price in zip(active, closes):
+            symbol = symbols[k]
+            if rng.random() < 0.1:
+                direction = "SELL" if held[symbol] and rng.random() < 0.5 else "BUY"
+                qty = held[symbol] if direction == "SELL" else float(rng.integers(1, 500))
+                fill = FillEvent(symbol, dt, direction, qty, float(price), commission=1.0)
+                portfolio.on_fill(fill)
+                batched.on_fill(fill)
+                held[symbol] += qty if direction == "BUY" else -qty
+            portfolio.update_timeindex(MarketBarEvent(symbol, dt, close=float(price)))
+            last_close[symbol] = float(price)
+        batched.mark_to_market(dt, [symbols[k] for k in active], closes)
+        expected = _reference_equity(portfolio.cash, held, last_close)
+        assert portfolio.equity_curve[dt] == expected
+        assert batched.equity_curve[dt] == expected
+    assert portfolio.open_positions() == {s: q for s, q in held.items() if q}
+    assert portfolio.last_close == last_close
+
+
+def test_marks_of_flat_symbols_keep_the_cached_holdings_total():
+    symbols = [f"SYM{i:04d}" for i in range(2000)]
+    portfolio = Portfolio(symbols, 100_000.0)
+    ledger = portfolio.ledger
+    portfolio.on_fill(FillEvent("SYM1500", T0, "BUY", 100, 10.0, commission=1.0))
+    portfolio.on_fill(FillEvent("SYM0007", T0, "BUY", 30, 3.3, commission=1.0))
+    held = {"SYM0007": 30.0, "SYM1500": 100.0}
+    last_close = {}
+    rng = np.random.default_rng(8)
+    for step, k in enumerate(rng.integers(0, len(symbols), 500)):
+        dt = T0 + timedelta(minutes=step)
+        symbol = symbols[k] if step % 50 else "SYM1500"
+        price = float(rng.uniform(1.0, 50.0))
+        cached = ledger._holdings
+        portfolio.update_timeindex(MarketBarEvent(symbol, dt, close=price))
+        last_close[symbol] = price
+        if symbol not in held:
+            # Fast path: a flat symbol's mark doesn't touch the cached total.
+            assert ledger._holdings is cached
+        assert portfolio.equity_curve[dt] == _reference_equity(portfolio.cash, held, last_close)
+    assert ledger.open_ids().tolist() == [7, 1500]
+    assert ledger.open_ids() is ledger.open_ids()
+    portfolio.on_fill(FillEvent("SYM0007", T0, "SELL", 30, 3.5, commission=1.0))
+    assert ledger._holdings is None and ledger.open_ids().tolist() == [1500]
+    assert portfolio.holdings_value == 100 * last_close["SYM1500"]
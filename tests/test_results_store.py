@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.core.results_store import ResultsStore, ResultsWriter, RunCache
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+from cherry_algo_framework.main_backtest_runner import run_backtest
+from cherry_algo_framework.utils.telemetry import telemetry
+
+from tests.integration.test_backtest_pipeline import BROKER, _write_synthetic_csv
+
+PARAMS = {"lookback_bars": 3, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100}
+
+
+def _handler(path, symbols):
+    return CSVDataHandler(path, symbols, symbol_column="symbol")
+
+
+def _assert_identical(expected, actual):
+    pd.testing.assert_frame_equal(expected.fills, actual.fills, check_exact=True)
+    pd.testing.assert_series_equal(expected.equity_curve, actual.equity_curve, check_exact=True)
+    assert expected.final_cash == actual.final_cash
+    assert expected.final_positions == actual.final_positions
+    assert expected.metrics == actual.metrics
+
+
+def test_streamed_store_matches_in_memory_result(tmp_path):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    handler = _handler(tmp_path / "bars.csv", symbols)
+    result = run_backtest(handler, "example_momentum", PARAMS, results_dir=tmp_path / "results", **BROKER)
+
+    store = ResultsStore(tmp_path / "results")
+    assert isinstance(store.column("equity", "equity"), np.memmap)
+    assert len(store) == sum(len(b) for b in handler.columnar_data.values())
+    assert len(result.fills) > 0
+    _assert_identical(result, store.to_result())
+
+    # Engines that do not stream are written from the finished result, in bounded chunks.
+    vectorized = run_backtest(_handler(tmp_path / "bars.csv", symbols), "example_momentum", PARAMS,
+                              mode="vectorized", **BROKER)
+    with ResultsWriter(tmp_path / "vectorized", buffer_rows=7) as writer:
+        writer.append_result(vectorized)
+        writer.close(vectorized)
+    _assert_identical(vectorized, ResultsStore(tmp_path / "vectorized").to_result())
+
+
+@pytest.mark.parametrize("mode", ["event", "vectorized"])
+def test_run_cache_returns_stored_result(tmp_path, mode):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    cache = RunCache(tmp_path / "runs")
+    previous = telemetry.enabled
+    telemetry.enable()
+    telemetry.reset()
+    try:
+        first = run_backtest(_handler(tmp_path / "bars.csv", symbols), "example_momentum", PARAMS, mode=mode,
+                             run_cache=cache, **BROKER)
+        second = run_backtest(_handler(tmp_path / "bars.csv", symbols), "example_momentum", PARAMS, mode=mode,
+                              run_cache=cache, **BROKER)
+        run_backtest(_handler(tmp_path / "bars.csv", symbols), "example_momentum", {**PARAMS, "lookback_bars": 4},
+                     mode=mode, run_cache=cache, **BROKER)
+        counters = dict(telemetry.counters)
+    finally:
+        telemetry.enable(previous)
+        telemetry.reset()
+
+    assert counters["backtest.cache_hits"] == 1 and counters["backtest.cache_misses"] == 2
+    assert len(list((tmp_path / "runs").iterdir())) == 2
+    _assert_identical(first, second)
+
+
+def test_resumed_run_store_covers_whole_history(tmp_path):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    full = run_backtest(_handler(tmp_path / "bars.csv", symbols), "example_momentum", PARAMS, **BROKER)
+    run_backtest(_handler(tmp_path / "bars.csv", symbols), "example_momentum", PARAMS,
+                 checkpoint_path=tmp_path / "run.ckpt", checkpoint_at="2023-03-02 16:00", **BROKER)
+    run_backtest(_handler(tmp_path / "bars.csv", symbols), "example_momentum", PARAMS,
+                 resume_from=tmp_path / "run.ckpt", results_dir=tmp_path / "results", **BROKER)
+    _assert_identical(full, ResultsStore(tmp_path / "results").to_result())
@@ -1 +1,103 @@
+import importlib.util
 
+import numpy as np
+import pytest
+
+from cherry_algo_framework.risk_mgt.risk_mgt.risk_engine import (
+    APPROVED, BELOW_MIN_SIZE, BUDGET_EXHAUSTED, INVALID_PRICES, MAX_POSITIONS, RiskEngine, RiskState,
+)
+
+BACKENDS = ['numpy', pytest.param('torch', marks=pytest.mark.skipif(
+    importlib.util.find_spec('torch') is None, reason="torch not installed"))]
+
+
+def _engine(backend, **overrides):
+    kwargs = dict(max_equity_at_risk_pct=0.01, max_allocation_pct=0.25, daily_flow_cap_pct=0.08,
+                  max_open_positions=6, portfolio_liquidity_cap_usd=1_000_000.0,
+                  trade_liquidity_cap_usd=250_000.0, backend=backend, capacity=4)
+    kwargs.update(overrides)
+    return RiskEngine(**kwargs)
+
+
+def _candidates(rng, n):
+    entry = rng.uniform(0.5, 30.0, n).round(2)
+    stop = (entry * (1 - rng.uniform(0.002, 0.3, n))).round(2)
+    stop[rng.random(n) < 0.05] = np.nan          # missing stop
+    stop[rng.random(n) < 0.05] = entry[:1][0] + 1  # stop above entry for some
+    entry[rng.random(n) < 0.03] = 0.0
+    return entry, stop
+
+
+def _sequential(engine, entry, stop, state):
+    return [engine.evaluate(e, None if np.isnan(s) else s, state) for e, s in zip(entry, stop)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(8))
+def test_batch_matches_per_signal_path(backend, seed):
+    rng = np.random.default_rng(seed)
+    engine = _engine(backend, max_open_positions=int(rng.integers(2, 40)),
+                     daily_flow_cap_pct=float(rng.uniform(0.05, 0.6)),
+                     max_allocation_pct=float(rng.uniform(0.002, 0.25)),
+                     trade_liquidity_cap_usd=float(rng.uniform(20.0, 20_000.0)))
+    for _ in range(5):  # several bars so the reused buffers carry stale data
+        entry, stop = _candidates(rng, int(rng.integers(1, 120)))
+        equity = float(rng.uniform(25_000, 400_000))
+        base = RiskState(equity=equity, cash=equity * float(rng.uniform(0.2, 1.0)),
+                         open_positions=int(rng.integers(0, 2)), open_exposure=float(rng.uniform(0, 20_000)),
+                         risk_committed_today=equity * float(rng.uniform(0, 0.02)))
+        seq_state, batch_state = base.copy(), base.copy()
+        expected = _sequential(engine, entry, stop, seq_state)
+        got = engine.evaluate_batch(entry, stop, batch_state).decisions()
+        assert got == expected
+        assert (batch_state.reserved_notional, batch_state.reserved_risk, batch_state.reserved_positions) == \
+            (seq_state.reserved_notional, seq_state.reserved_risk, seq_state.reserved_positions)
+    assert engine.latency_summary()['batches'] == 5
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_budgets_truncate_and_slots_reject(backend):
+    engine = _engine(backend, max_open_positions=3)
+    state = RiskState(equity=25_000.0, cash=10_000.0, open_positions=1)
+    # Risk-sized: 250 / 0.5 = 500 shares, capped at 25% of equity -> 625 @ 10 = 500.
+    entry = [10.0, 10.0, 10.0, 10.0, 5.0, 10.0]
+    stop = [9.5, 9.5, 9.5, 9.5, np.nan, 9.5]
+    result = engine.evaluate_batch(entry, stop, state)
+    # Two free slots; cash 10k covers 500 + 500 shares exactly.
+    assert result.quantity.tolist() == [500.0, 500.0, 0.0, 0.0, 0.0, 0.0]
+    assert result.reason.tolist() == [APPROVED, APPROVED, MAX_POSITIONS, MAX_POSITIONS, INVALID_PRICES,
+                                      MAX_POSITIONS]
+
+    state = RiskState(equity=25_000.0, cash=7_500.0)
+    decisions = engine.evaluate_batch([10.0, 10.0, 400_000.0], [9.5, 9.5, 399_000.0], state).decisions()
+    assert [(d.quantity, d.reason) for d in decisions] == [(500.0, APPROVED), (250.0, APPROVED),
+                                                           (0.0, BELOW_MIN_SIZE)]
+    decisions = engine.evaluate_batch([10.0], [9.5], state).decisions()
+    assert decisions[0].reason == BUDGET_EXHAUSTED
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_buffers_are_reused_and_grow(backend):
+    engine = _engine(backend)
+    first = engine.evaluate_batch([10.0, 11.0], [9.0, 10.0], RiskState(25_000.0, 25_000.0)).quantity
+    buffer = engine._qty
+    assert float(first[0]) == 250.0
+    engine.evaluate_batch([12.0], [10.0], RiskState(25_000.0, 25_000.0))
+    assert engine._qty is buffer
+    assert float(first[0]) == 125.0  # view of the reused buffer: overwritten by the next batch
+    engine.evaluate_batch(np.full(9, 10.0), np.full(9, 9.0), RiskState(25_000.0, 25_000.0))
+    assert engine._capacity == 16
+
+
+@pytest.mark.skipif(importlib.util.find_spec('torch') is None, reason="torch not installed")
+@pytest.mark.parametrize("seed", range(4))
+def test_numpy_and_torch_backends_agree(seed):
+    rng = np.random.default_rng(seed)
+    entry, stop = _candidates(rng, 64)
+    base = RiskState(equity=100_000.0, cash=60_000.0, open_positions=1, risk_committed_today=500.0)
+    states = {backend: base.copy() for backend in ('numpy', 'torch')}
+    decisions = {backend: _engine(backend, max_open_positions=20).evaluate_batch(entry, stop, state).decisions()
+                 for backend, state in states.items()}
+    assert decisions['numpy'] == decisions['torch']
+    assert (states['numpy'].reserved_notional, states['numpy'].reserved_risk) == \
+        (states['torch'].reserved_notional, states['torch'].reserved_risk)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from cherry_algo_framework.data_mgt.columnar_bars import ColumnarBars
+from cherry_algo_framework.data_mgt.screener_index import FEATURE_COLUMNS, ScreenCriteria, ScreenerIndex
+
+PARAMS = dict(premarket_start='09:00', premarket_end='14:30', session_end='21:00', lookback_days=5)
+CRITERIA = ScreenCriteria(min_price=1.0, max_price=30.0, min_float=1e6, max_float=1e7,
+                          min_gap_pct=0.05, min_relative_volume=2.0, min_premarket_volume=1e6)
+
+
+def _universe(seed=11, symbols=12, days=15):
+    # Half-hourly bars 09:00-20:30 UTC on weekdays, with occasional pre-market spikes.
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range("2023-05-01", periods=days, tz="UTC")
+    index = pd.DatetimeIndex([ts for d in sessions for ts in pd.date_range(d + pd.Timedelta(hours=9), periods=24, freq="30min")])
+    bars, floats = {}, {}
+    for k in range(symbols):
+        close = rng.uniform(2, 25) * np.exp(np.cumsum(rng.normal(0, 0.03, len(index))))
+        volume = rng.integers(20_000, 200_000, len(index)).astype(float)
+        spikes = rng.random(len(index)) < 0.05
+        volume[spikes] *= 40
+        close[spikes] *= 1.3
+        frame = pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': volume}, index=index)
+        bars[f"S{k:02d}"] = ColumnarBars.from_frame(frame)
+        floats[f"S{k:02d}"] = float(rng.choice([5e5, 3e6, 8e6, 2e7]))
+    return bars, floats, index
+
+
+def _brute_force(bars, floats, index, day):
+    # Straightforward pandas version of the same screen.
+    hits = []
+    for symbol, b in bars.items():
+        frame = pd.DataFrame(b.columns, index=index)
+        tod = frame.index.time
+        pre = frame[(tod >= pd.Timestamp("09:00").time()) & (tod < pd.Timestamp("14:30").time())]
+        reg = frame[(tod >= pd.Timestamp("14:30").time()) & (tod < pd.Timestamp("21:00").time())]
+        pm_volume = pre['volume'].groupby(pre.index.normalize()).sum()
+        pm_last = pre['close'].groupby(pre.index.normalize()).last()
+        prev_close = reg['close'].groupby(reg.index.normalize()).last().shift()
+        rvol = pm_volume / pm_volume.rolling(5, min_periods=1).mean().shift()
+        d = pd.Timestamp(day, tz="UTC")
+        gap = pm_last[d] / prev_close[d] - 1
+        if (1 <= pm_last[d] <= 30 and 1e6 <= floats[symbol] <= 1e7 and gap > 0.05
+                and rvol[d] > 2 and pm_volume[d] > 1e6):
+            hits.append((gap, symbol))
+    return [s for _, s in sorted(hits, key=lambda h: -h[0])]
+
+
+def test_incremental_updates_match_full_rebuild(tmp_path):
+    bars, floats, index = _universe()
+    full = ScreenerIndex(tmp_path / 'full', **PARAMS)
+    assert full.update(bars, floats) == 12 * 15
+
+    # Daily updates run after the close, so the split falls on a day boundary.
+    cut = index[24 * 8].value
+    first = {s: ColumnarBars(b.timestamps[b.timestamps < cut], {k: v[b.timestamps < cut] for k, v in b.columns.items()})
+             for s, b in bars.items()}
+    staged = ScreenerIndex(tmp_path / 'staged', **PARAMS)
+    assert staged.update(first, floats) == 12 * 8
+    staged.save()
+    staged = ScreenerIndex(tmp_path / 'staged', **PARAMS)
+    assert staged.update(bars.items(), floats) == 12 * 7
+    assert staged.update(bars, floats) == 0
+    assert np.array_equal(staged.day, full.day) and np.array_equal(staged.symbol_id, full.symbol_id)
+    for name in FEATURE_COLUMNS:
+        assert np.array_equal(staged.columns[name], full.columns[name], equal_nan=True), name
+
+
+def test_day_indexed_part_way_is_completed_by_the_next_update(tmp_path):
+    bars, floats, index = _universe()
+    full = ScreenerIndex(tmp_path / 'full', **PARAMS)
+    full.update(bars, floats)
+
+    # An update run mid-session, at 12:00 UTC on the ninth day, then one after the close.
+    cut = index[24 * 8 + 6].value
+    first = {s: ColumnarBars(b.timestamps[b.timestamps < cut], {k: v[b.timestamps < cut] for k, v in b.columns.items()})
+             for s, b in bars.items()}
+    staged = ScreenerIndex(tmp_path / 'staged', **PARAMS)
+    assert staged.update(first, floats) == 12 * 9
+    staged.save()
+    staged = ScreenerIndex(tmp_path / 'staged', **PARAMS)
+    assert staged.update(bars, floats) == 12 * 6
+    assert np.array_equal(staged.day, full.day) and np.array_equal(staged.symbol_id, full.symbol_id)
+    for name in FEATURE_COLUMNS:
+        assert np.array_equal(staged.columns[name], full.columns[name], equal_nan=True), name
+
+
+def test_candidates_match_brute_force_screen(tmp_path):
+    bars, floats, index = _universe()
+    screener = ScreenerIndex(tmp_path / 'idx', **PARAMS)
+    screener.update(bars, floats)
+    screener.save()
+    reopened = ScreenerIndex(tmp_path / 'idx', **PARAMS)
+    total = 0
+    for day in pd.bdate_range("2023-05-02", periods=14):
+        expected = _brute_force(bars, floats, index, day.date())
+        total += len(expected)
+        assert reopened.candidates(day.date(), CRITERIA) == expected, day
+    assert total > 0
+    features = reopened.features("2023-05-03")
+    assert list(features['symbol']) == sorted(bars)
+
+
+def test_changed_settings_discard_the_stored_index(tmp_path):
+    bars, floats, _ = _universe(symbols=2, days=3)
+    screener = ScreenerIndex(tmp_path / 'idx', **PARAMS)
+    screener.update(bars, floats)
+    screener.save()
+    assert len(ScreenerIndex(tmp_path / 'idx', **PARAMS)) == 6
+    assert len(ScreenerIndex(tmp_path / 'idx', **dict(PARAMS, lookback_days=10))) == 0
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.core.sharded_engine import _replay_shard, run_sharded_backtest, session_windows
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+from cherry_algo_framework.main_backtest_runner import run_backtest
+from cherry_algo_framework.strategy.example_momentum_strategy import ExampleMomentumStrategy
+
+from tests.integration.test_backtest_pipeline import BROKER, _write_synthetic_csv
+
+PARAMS = {"lookback_bars": 3, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100}
+
+
+def _assert_identical(event, sharded):
+    pd.testing.assert_frame_equal(event.fills, sharded.fills, check_exact=True)
+    pd.testing.assert_series_equal(event.equity_curve, sharded.equity_curve, check_exact=True)
+    assert event.final_cash == sharded.final_cash
+    assert event.final_positions == sharded.final_positions
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sharded_matches_event_driven(tmp_path, workers):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    handler = CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol")
+    assert len(session_windows(handler.columnar_data, 8)) == 2
+    event = run_backtest(handler, "example_momentum", PARAMS, **BROKER)
+    sharded = run_backtest(handler, "example_momentum", PARAMS, mode="sharded", workers=workers, **BROKER)
+    assert len(event.fills) > 0 and sharded.mode == "sharded"
+    _assert_identical(event, sharded)
+    assert sharded.metrics == event.metrics
+
+
+def test_position_held_overnight_merges_shards(tmp_path):
+    # Day 1 stops at 19:30, before the flatten cutoff, and the thresholds keep
+    # every symbol long, so positions cross the only shard boundary.
+    symbols = _write_synthetic_csv(tmp_path / "full.csv")
+    frame = pd.read_csv(tmp_path / "full.csv", parse_dates=["datetime"])
+    frame[~frame["datetime"].between("2023-03-01 19:30:00+00:00", "2023-03-01 23:59:00+00:00")].to_csv(
+        tmp_path / "bars.csv", index=False)
+    handler = CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol")
+    params = {**PARAMS, "entry_threshold_pct": -0.5, "exit_threshold_pct": -0.9}
+
+    bars, column_map = handler.columnar_data, handler.column_map
+    windows = session_windows(bars, 2)
+    spec = {'strategy_cls': ExampleMomentumStrategy, 'params': params, 'column_map': column_map,
+            'warmup_bars': 4, 'initial_equity': 25000.0, 'commission_per_share': 0.0035,
+            'commission_min_per_order': 0.50, 'slippage_pct': 0.0002}
+    assert not _replay_shard(bars, spec, windows[0])['flat']
+
+    event = run_backtest(handler, "example_momentum", params, **BROKER)
+    sharded = run_sharded_backtest(bars, ExampleMomentumStrategy, params, column_map, max_workers=1, n_shards=2,
+                                   **BROKER)
+    _assert_identical(event, sharded)
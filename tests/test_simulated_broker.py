@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from cherry_algo_framework.core.event import MarketBarEvent, OrderEvent
+from cherry_algo_framework.execution_mgt.simulated_broker import SimulatedBroker
+
+T0 = datetime(2023, 3, 1, 14, 30, tzinfo=timezone.utc)
+
+
+def _bar(i, o, h, l, c, symbol="AAA"):
+    return MarketBarEvent(symbol, T0 + timedelta(minutes=i), o, h, l, c, 1000)
+
+
+def _broker():
+    return SimulatedBroker(commission_per_share=0.0, commission_min_per_order=0.0, slippage_pct=0.0)
+
+
+def _order(order_type, direction, qty=10, symbol="AAA", **kw):
+    return OrderEvent(symbol, T0, order_type, direction, qty, **kw)
+
+
+def test_stops_fill_at_trigger_or_gapped_open_and_limits_at_limit():
+    broker = _broker()
+    broker.execute_order(_order('STP', 'SELL', stop_price=95.0))
+    broker.execute_order(_order('STP', 'SELL', stop_price=90.0))
+    broker.execute_order(_order('LMT', 'BUY', limit_price=97.0))
+    broker.execute_order(_order('STP', 'BUY', stop_price=110.0))
+    assert broker.on_market(_bar(0, 100, 101, 99, 100)) == []
+    fills = broker.on_market(_bar(1, 98, 99, 94, 95))
+    assert [(f.direction, f.fill_price) for f in fills] == [('SELL', 95.0), ('BUY', 97.0)]
+    fills = broker.on_market(_bar(2, 85, 86, 84, 85))  # gaps through the 90 stop
+    assert [f.fill_price for f in fills] == [85.0]
+    fills = broker.on_market(_bar(3, 112, 113, 111, 112))
+    assert [f.fill_price for f in fills] == [112.0]
+    assert broker.resting_count == 0
+
+
+def test_trailing_stop_follows_high_and_never_lowers():
+    broker = _broker()
+    broker.execute_order(_order('TRAIL', 'SELL', trail_pct=0.10))
+    broker.on_market(_bar(0, 100, 100, 99, 100))
+    broker.on_market(_bar(1, 100, 110, 100, 108))
+    broker.on_market(_bar(2, 105, 106, 100, 101))
+    (record,) = broker._resting.values()
+    assert record.price == pytest.approx(99.0)
+    fills = broker.on_market(_bar(3, 100, 100, 98, 98))
+    assert fills[0].fill_price == pytest.approx(99.0)
+
+
+def test_bracket_with_stepped_trail_and_oco_take_profit():
+    broker = _broker()
+    broker.submit_bracket(_order('MKT', 'BUY', 100), stop_loss_pct=0.07, take_profit_pct=0.50,
+                          trail_steps=[(0.10, 0.08), (0.20, 0.05)])
+    fills = broker.on_market(_bar(0, 100, 101, 99, 100))
+    assert fills[0].fill_price == 100.0 and broker.resting_count == 2
+    stop = next(r for r in broker._resting.values() if r.order.order_type == 'STP')
+    assert stop.price == pytest.approx(93.0)
+    broker.on_market(_bar(1, 100, 105, 100, 104))   # below the first step: stop stays at -7%
+    assert stop.price == pytest.approx(93.0)
+    broker.on_market(_bar(2, 104, 112, 104, 111))   # +12%: trail 8% from 112
+    assert stop.price == pytest.approx(112 * 0.92)
+    broker.on_market(_bar(3, 111, 125, 111, 124))   # +25%: trail 5% from 125
+    assert stop.price == pytest.approx(125 * 0.95)
+    fills = broker.on_market(_bar(4, 120, 120, 110, 112))
+    assert [(f.direction, f.fill_price) for f in fills] == [('SELL', pytest.approx(118.75))]
+    assert broker.resting_count == 0  # take-profit cancelled with it
+
+
+def test_intrabar_entry_arms_exits_on_next_bar_and_cancel():
+    broker = _broker()
+    entry_id = broker.submit_bracket(_order('LMT', 'BUY', limit_price=95.0), stop_loss_pct=0.07)
+    fills = broker.on_market(_bar(0, 100, 100, 80, 85))  # entry fills; its stop (88.35) must not fire on this bar
+    assert [f.order_id for f in fills] == [entry_id] and broker.resting_count == 1
+    (stop_id,) = broker._resting
+    assert broker.cancel(stop_id) and not broker.cancel(stop_id)
+    assert broker.on_market(_bar(1, 85, 86, 70, 75)) == []
+
+
+def test_cancelling_a_pending_bracket_entry_drops_its_exits():
+    broker = _broker()
+    entry_id = broker.submit_bracket(_order('MKT', 'BUY', 100), stop_loss_pct=0.07, take_profit_pct=0.5)
+    assert broker.has_working_orders
+    assert broker.cancel(entry_id)
+    assert not broker.has_working_orders
+    assert broker.on_market(_bar(0, 100, 101, 99, 100)) == [] and broker.resting_count == 0
+
+
+def _reference_fills(orders, bar):
+    # Naive scan over every resting order with the broker's priority rules.
+    o, h, l = bar.open, bar.high, bar.low
+    out = []
+    groups = [
+        (lambda r: r.order_type == 'STP' and r.direction == 'SELL' and r.stop_price >= l,
+         lambda r: (-r.stop_price, r.order_id), lambda r: min(o, r.stop_price)),
+        (lambda r: r.order_type == 'STP' and r.direction == 'BUY' and r.stop_price <= h,
+         lambda r: (r.stop_price, r.order_id), lambda r: max(o, r.stop_price)),
+        (lambda r: r.order_type == 'LMT' and r.direction == 'BUY' and r.limit_price >= l,
+         lambda r: (-r.limit_price, r.order_id), lambda r: min(o, r.limit_price)),
+        (lambda r: r.order_type == 'LMT' and r.direction == 'SELL' and r.limit_price <= h,
+         lambda r: (r.limit_price, r.order_id), lambda r: max(o, r.limit_price)),
+    ]
+    for hit, key, price in groups:
+        triggered = sorted((r for r in orders if hit(r)), key=key)
+        for r in triggered:
+            orders.remove(r)
+            out.append((r.order_id, price(r)))
+    return out
+
+
+def test_order_book_matches_naive_scan():
+    rng = np.random.default_rng(11)
+    broker, naive = _broker(), []
+    price = 100.0
+    for i in range(200):
+        for _ in range(rng.integers(0, 6)):
+            kind, side = ('STP', 'LMT')[rng.integers(2)], ('BUY', 'SELL')[rng.integers(2)]
+            level = round(price * (1 + rng.normal(0, 0.03)), 2)
+            order = _order(kind, side, **({'stop_price': level} if kind == 'STP' else {'limit_price': level}))
+            broker.execute_order(order)
+            naive.append(order)
+        o = price * (1 + rng.normal(0, 0.01))
+        c = o * (1 + rng.normal(0, 0.01))
+        bar = _bar(i, o, max(o, c) * (1 + abs(rng.normal(0, 0.005))), min(o, c) * (1 - abs(rng.normal(0, 0.005))), c)
+        assert [(f.order_id, f.fill_price) for f in broker.on_market(bar)] == _reference_fills(naive, bar)
+        price = c
+    assert broker.resting_count == len(naive)
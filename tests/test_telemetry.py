@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from cherry_algo_framework.data_mgt.data_handler import CSVDataHandler
+from cherry_algo_framework.main_backtest_runner import export_results, run_backtest
+from cherry_algo_framework.utils.telemetry import SliceProfiler, Telemetry, telemetry
+
+from tests.integration.test_backtest_pipeline import BROKER, _write_synthetic_csv
+
+
+@pytest.fixture
+def enabled_telemetry():
+    previous = telemetry.enabled
+    telemetry.enable()
+    telemetry.reset()
+    yield telemetry
+    telemetry.enable(previous)
+    telemetry.reset()
+
+
+def test_disabled_telemetry_records_nothing():
+    t = Telemetry(enabled=False)
+    with t.timer('stage'):
+        t.count('events', 5)
+    t.add_time('risk', 1000)
+    assert (t.counters, t.timers) == ({}, {})
+    t.enable()
+    with t.timer('stage'):
+        t.count('events', 5)
+    snapshot = t.snapshot(extra=1)
+    assert snapshot['counters'] == {'events': 5} and snapshot['timers']['stage']['calls'] == 1
+    assert snapshot['extra'] == 1
+
+
+def test_slice_profiler_covers_only_the_slice(tmp_path):
+    profiler = SliceProfiler('cprofile', start_event=3, n_events=4)
+    assert list(profiler.wrap(range(10))) == list(range(10))
+    assert profiler.profiled_events == 4
+    assert {p.name for p in profiler.write(tmp_path)} == {'profile.pstats', 'profile.txt'}
+    with pytest.raises(ValueError):
+        SliceProfiler('perf')
+
+
+def test_backtest_writes_telemetry_json(tmp_path, enabled_telemetry):
+    symbols = _write_synthetic_csv(tmp_path / "bars.csv")
+    handler = CSVDataHandler(tmp_path / "bars.csv", symbols, symbol_column="symbol")
+    params = {"lookback_bars": 3, "entry_threshold_pct": 0.002, "exit_threshold_pct": -0.001, "order_quantity": 100}
+    result = run_backtest(handler, "example_momentum", params, **BROKER)
+    export_results(result, tmp_path / "out")
+
+    report = json.loads((tmp_path / "out" / "telemetry.json").read_text())
+    n_bars = sum(len(b) for b in handler.columnar_data.values())
+    assert report['bars'] == report['counters']['data.bars'] == n_bars
+    assert report['events_by_type']['MARKET'] == n_bars
+    assert report['events_by_type']['FILL'] == report['counters']['broker.fills'] == len(result.fills)
+    assert {'data.load', 'backtest.replay', 'backtest.metrics'} <= set(report['timers'])
+    assert {'ExampleMomentumStrategy', 'Portfolio', 'SimulatedBroker'} <= set(report['handler_time_s'])
+    assert report['bars_per_sec'] > 0
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cherry_algo_framework.data_mgt.array_data_handler import ArrayDataHandler
+from cherry_algo_framework.data_mgt.tick_data_handler import TickBarAggregator, TickDataHandler
+from cherry_algo_framework.main_backtest_runner import run_backtest
+from tests.integration.test_backtest_pipeline import BROKER
+
+
+def _ticks(n=4000, seed=5):
+    # Irregular trades for three symbols, interleaved and globally time sorted, with gaps of several minutes.
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2023-06-01 13:00", tz="UTC") + pd.to_timedelta(np.cumsum(rng.exponential(2.5, n)), unit="s")
+    return pd.DataFrame({
+        'datetime': ts,
+        'symbol': rng.choice(['abc', 'XYZ', 'qqq'], n, p=[0.6, 0.3, 0.1]),
+        'price': np.round(10 + np.cumsum(rng.normal(0, 0.01, n)), 2),
+        'size': rng.integers(1, 500, n).astype(float) * rng.choice([1.0, 0.1], n),
+    })
+
+
+def _reference(ticks, interval):
+    # pandas resample of each symbol, dropping intervals without trades.
+    out = {}
+    for symbol, df in ticks.groupby(ticks['symbol'].str.upper()):
+        df = df.set_index('datetime')
+        r = df.resample(interval)
+        bars = pd.DataFrame({'open': r['price'].first(), 'high': r['price'].max(), 'low': r['price'].min(),
+                             'close': r['price'].last(), 'volume': r['size'].sum(),
+                             'vwap': (df['price'] * df['size']).resample(interval).sum() / r['size'].sum(),
+                             'trades': r['price'].count()})
+        out[symbol] = bars[bars['trades'] > 0]
+    return out
+
+
+@pytest.mark.parametrize("interval,chunk_size", [("1min", 37), ("5min", 1000), ("30s", 100_000)])
+def test_chunked_bars_match_resample(tmp_path, interval, chunk_size):
+    ticks = _ticks()
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+    handler = TickDataHandler(path, interval, symbol_column='symbol', chunk_size=chunk_size)
+    events = [e.data for e in handler.stream_next()]
+
+    times = [(d['datetime'], d['symbol']) for d in events]
+    assert [t for t, _ in times] == sorted(t for t, _ in times)
+    reference = _reference(ticks, interval)
+    assert len(events) == sum(len(b) for b in reference.values())
+    for symbol, expected in reference.items():
+        got = pd.DataFrame([d for d in events if d['symbol'] == symbol])
+        assert list(got['datetime']) == list(expected.index.to_pydatetime())
+        for col in ('open', 'high', 'low', 'close', 'trades'):
+            np.testing.assert_array_equal(got[col], expected[col])
+        np.testing.assert_allclose(got['volume'], expected['volume'], rtol=1e-12)
+        np.testing.assert_allclose(got['vwap'], expected['vwap'], rtol=1e-12)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {'start_date': "2023-06-01 14:00"},
+    {'end_date': "2023-06-01 15:30"},
+    {'symbol_list': ['abc', 'QQQ']},
+    {'start_date': "2023-06-01 13:30", 'end_date': "2023-06-01 15:00", 'symbol_list': ['xyz']},
+])
+def test_date_and_symbol_filters_match_resample_of_filtered_ticks(tmp_path, kwargs):
+    ticks = _ticks()
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+    events = [e.data for e in TickDataHandler(path, "1min", symbol_column='symbol', chunk_size=100,
+                                              **kwargs).stream_next()]
+
+    keep = pd.Series(True, index=ticks.index)
+    if 'start_date' in kwargs:
+        keep &= ticks['datetime'] >= pd.Timestamp(kwargs['start_date'], tz="UTC")
+    if 'end_date' in kwargs:
+        keep &= ticks['datetime'] <= pd.Timestamp(kwargs['end_date'], tz="UTC")
+    if 'symbol_list' in kwargs:
+        keep &= ticks['symbol'].str.upper().isin([s.upper() for s in kwargs['symbol_list']])
+    reference = _reference(ticks[keep], "1min")
+    assert events and len(events) == sum(len(b) for b in reference.values())
+    for symbol, expected in reference.items():
+        got = pd.DataFrame([d for d in events if d['symbol'] == symbol])
+        assert list(got['datetime']) == list(expected.index.to_pydatetime())
+        np.testing.assert_array_equal(got['close'], expected['close'])
+
+
+def test_bar_cache_replay_matches_streaming(tmp_path):
+    ticks = _ticks(n=1500)
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+    streamed = [e.data for e in TickDataHandler(path, "1min", symbol_column='symbol', chunk_size=64).stream_next()]
+
+    TickDataHandler(path, "1min", symbol_column='symbol', chunk_size=64).write_bar_cache(tmp_path / "cache")
+    cached = TickDataHandler(path, "1min", symbol_column='symbol', cache_dir=tmp_path / "cache")
+    assert cached.columnar_data is not None
+    replayed = [e.data for e in cached.stream_next()]
+    assert replayed == streamed
+    # A different interval is a different entry.
+    assert TickDataHandler(path, "5min", symbol_column='symbol', cache_dir=tmp_path / "cache").columnar_data is None
+
+
+def test_unsorted_ticks_are_rejected():
+    aggregator = TickBarAggregator("1min", symbol="ABC")
+    aggregator.push(np.array([120, 180]) * 10**9, [1.0, 1.1], [10, 10])
+    with pytest.raises(ValueError):
+        aggregator.push(np.array([150]) * 10**9, [1.0], [10])
+    with pytest.raises(ValueError):
+        TickBarAggregator("0s")
+
+
+def test_event_backtest_over_a_tick_feed_trades_every_symbol_in_the_file(tmp_path):
+    ticks = _ticks(n=20_000)
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+    handler = TickDataHandler(path, "1min", symbol_column='symbol', chunk_size=1000)
+    assert handler.symbol_list == ['ABC', 'QQQ', 'XYZ']
+
+    params = {"lookback_bars": 1, "entry_threshold_pct": 0.0005, "exit_threshold_pct": -0.0005, "order_quantity": 10}
+    streamed = run_backtest(handler, "example_momentum", params, **BROKER)
+    bars = TickDataHandler(path, "1min", symbol_column='symbol').aggregate()
+    columnar = run_backtest(ArrayDataHandler({s: bars[s] for s in sorted(bars)}), "example_momentum", params, **BROKER)
+    assert set(streamed.fills["symbol"]) == {'ABC', 'QQQ', 'XYZ'}
+    # Bars sharing a timestamp arrive in completion order rather than symbol
+    # order, so compare the fills as sets and the equity to rounding.
+    key = ["datetime", "symbol", "direction"]
+    pd.testing.assert_frame_equal(streamed.fills.sort_values(key, ignore_index=True),
+                                  columnar.fills.sort_values(key, ignore_index=True), check_dtype=False)
+    assert streamed.final_positions == columnar.final_positions
+    np.testing.assert_allclose(streamed.equity_curve.to_numpy(), columnar.equity_curve.to_numpy(), rtol=1e-12)
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+from cherry_algo_framework.execution_mgt.webhook_listener import (
+    ACCEPTED, DUPLICATE, INVALID, REJECTED, WebhookListener, parse_alert,
+)
+from cherry_algo_framework.risk_mgt.risk_mgt.risk_engine import RiskEngine, RiskState
+
+
+def _buy(i, price=10.0, stop=9.3):
+    return {'id': f"a{i}", 'ticker': 'abc', 'action': 'buy', 'price': price, 'stop': stop}
+
+
+def _listener(orders, **kw):
+    engine = RiskEngine(max_equity_at_risk_pct=0.01, max_allocation_pct=0.25, daily_flow_cap_pct=0.08,
+                        max_open_positions=3, portfolio_liquidity_cap_usd=1_000_000.0,
+                        trade_liquidity_cap_usd=250_000.0, backend='numpy')
+    params = dict(queue_size=100, batch_size=16, batch_window_ms=1.0, dedupe_window=100, secret='')
+    params.update(kw)
+    return WebhookListener(engine, lambda: RiskState(100_000.0, 100_000.0), orders.append, **params)
+
+
+def test_parse_alert_validates_and_derives_ids():
+    alert = parse_alert({'ticker': 'abc', 'side': 'LONG', 'price': '10', 'stop': 9.5, 'time': 't1'}, 0)
+    assert (alert.symbol, alert.action, alert.price, alert.alert_id) == ('ABC', 'BUY', 10.0, 'ABC|BUY|10.0|t1')
+    for bad in [[], {'action': 'buy', 'price': 1, 'stop': 0.5}, {'ticker': 'A', 'action': 'hold', 'price': 1},
+                {'ticker': 'A', 'action': 'buy', 'price': 'x', 'stop': 1}, {'ticker': 'A', 'action': 'buy', 'price': 1},
+                {'ticker': 'A', 'action': 'sell', 'price': 1}]:
+        with pytest.raises(ValueError):
+            parse_alert(bad, 0)
+    with pytest.raises(ValueError):
+        parse_alert(_buy(0), 0, secret='s3cret')
+
+
+def test_dedupe_backpressure_and_batched_sizing():
+    async def run():
+        orders = []
+        listener = _listener(orders, queue_size=4)
+        await listener.start()
+        results = [listener.submit(_buy(i))[0] for i in range(5)] + [listener.submit(_buy(0))[0]]
+        assert results == [ACCEPTED] * 4 + [REJECTED, DUPLICATE]
+        await listener.drain()
+        # The rejected alert was not remembered, so a retry after the burst gets in.
+        assert listener.submit(_buy(4))[0] == ACCEPTED
+        assert listener.submit({'ticker': 'abc', 'action': 'sell', 'price': 11.0, 'quantity': 5})[0] == ACCEPTED
+        await listener.drain()
+        await listener.stop()
+        return listener, orders
+
+    listener, orders = asyncio.run(run())
+    # The first batch fills the 3 position slots and the fourth buy is declined; the
+    # second batch sizes against a fresh state.
+    assert [(o.direction, o.quantity) for o in orders] == [('BUY', 1428.0)] * 3 + [('BUY', 1428.0), ('SELL', 5)]
+    summary = listener.latency_summary()
+    assert (summary[ACCEPTED], summary[REJECTED], summary[DUPLICATE], summary['risk_declined']) == (6, 1, 1, 1)
+    assert summary['orders'] == 5 and summary['p99_us'] >= summary['p50_us'] > 0
+
+
+def test_http_roundtrip():
+    async def post(port, payload):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        writer.write(b"POST /webhook HTTP/1.1\r\nConnection: close\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        status = int((await reader.readline()).split()[1])
+        writer.close()
+        return status
+
+    async def run():
+        orders = []
+        listener = _listener(orders)
+        server = await listener.serve('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        statuses = [await post(port, p) for p in (_buy(1), _buy(1), b'not json')]
+        await listener.drain()
+        await listener.stop()
+        return statuses, orders, listener
+
+    statuses, orders, listener = asyncio.run(run())
+    assert statuses == [202, 409, 400]
+    assert len(orders) == 1 and orders[0].symbol == 'ABC'
+    summary = listener.latency_summary()
+    assert (summary[ACCEPTED], summary[DUPLICATE], summary[INVALID]) == (1, 1, 1)
+
+
+def test_secret_from_environment_is_enforced(monkeypatch):
+    monkeypatch.setenv('CHERRY_WEBHOOK_SECRET', 's3cret')
+
+    async def run():
+        orders = []
+        params = dict(queue_size=100, batch_size=16, batch_window_ms=1.0, dedupe_window=100)
+        listener = WebhookListener(RiskEngine(backend='numpy'), lambda: RiskState(100_000.0, 100_000.0),
+                                   orders.append, **params)
+        await listener.start()
+        results = [listener.submit(_buy(1))[0], listener.submit(dict(_buy(2), secret='s3cret'))[0]]
+        await listener.drain()
+        await listener.stop()
+        return listener, results
+
+    listener, results = asyncio.run(run())
+    assert listener.secret == 's3cret'
+    assert results == [INVALID, ACCEPTED]
+    assert listener.latency_summary()[INVALID] == 1